@@ -0,0 +1,310 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from validator import analyze_time_grid
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# MAD * 1.4826 estima o desvio padrão de uma normal
+MAD_SCALE = 1.4826
+MIN_WINDOW = 8
+# Elementos por bloco nas medianas: blocos pequenos ficam no cache
+CHUNK_ELEMENTS = 1 << 17
+
+
+def _window_stats(
+    values: np.ndarray, start: int, window: int, hop: int, has_missing: bool
+) -> tuple[int, np.ndarray, np.ndarray]:
+    # Mediana e MAD das janelas [b - window, b) que terminam nas fronteiras
+    # b múltiplas de hop (posições globais); cada linha usa a última
+    # fronteira <= ela, então a janela nunca contém a própria linha. Custo
+    # O(n * window / hop) em vez de uma mediana por linha. values vem como
+    # (colunas, linhas) e window é ímpar, então a mediana é um partition
+    n_columns, n = values.shape
+    first = max(-(-(start + window) // hop) * hop, hop)
+    boundaries = np.arange(first, start + n, hop)
+    medians = np.empty((n_columns, len(boundaries)))
+    mads = np.empty((n_columns, len(boundaries)))
+    if not len(boundaries):
+        return first, medians, mads
+    windows = sliding_window_view(values, window, axis=-1)
+    offsets = boundaries - start - window
+    middle = window // 2
+    chunk = max(CHUNK_ELEMENTS // (window * n_columns), 1)
+    for i in range(0, len(offsets), chunk):
+        block = windows[:, offsets[i : i + chunk]]
+        if has_missing:
+            median = np.nanmedian(block, axis=-1)
+            mad = np.nanmedian(np.abs(block - median[..., None]), axis=-1)
+        else:
+            block.partition(middle, axis=-1)
+            median = block[..., middle]
+            deviations = np.abs(block - median[..., None])
+            deviations.partition(middle, axis=-1)
+            mad = deviations[..., middle]
+        medians[:, i : i + chunk] = median
+        mads[:, i : i + chunk] = mad
+    return first, medians, mads
+
+
+def _robust_z(
+    values: np.ndarray, start: int, window: int, hop: int, has_missing: bool
+) -> np.ndarray:
+    first, medians, mads = _window_stats(values, start, window, hop, has_missing)
+    # Cada fronteira vale para as hop linhas seguintes: repetir as
+    # estatísticas alinha tudo com as linhas a partir de `first`
+    offset = first - start
+    count = values.shape[1] - offset
+    z = np.full(values.shape, np.nan)
+    if count > 0:
+        median = np.repeat(medians, hop, axis=1)[:, :count]
+        scale = MAD_SCALE * np.repeat(mads, hop, axis=1)[:, :count]
+        # MAD zero (trecho constante) não define escala: sem score
+        scale[scale == 0] = np.nan
+        z[:, offset:] = (values[:, offset:] - median) / scale
+    return z
+
+
+def _median_network(arrays: list) -> np.ndarray:
+    # Mediana elemento a elemento de poucos arrays por ordenação par-ímpar
+    # (min/max vetorizados), bem mais rápida que np.median em eixos curtos
+    arrays = list(arrays)
+    k = len(arrays)
+    for round_ in range(k):
+        for i in range(round_ % 2, k - 1, 2):
+            low = np.minimum(arrays[i], arrays[i + 1])
+            arrays[i + 1] = np.maximum(arrays[i], arrays[i + 1])
+            arrays[i] = low
+    middle = k // 2
+    return arrays[middle] if k % 2 else (arrays[middle - 1] + arrays[middle]) / 2
+
+
+def _seasonal_residual(
+    values: np.ndarray, season: int, seasons: int, has_missing: bool
+) -> np.ndarray:
+    # Resíduo contra a mediana da mesma fase nos `seasons` ciclos anteriores
+    n_columns, n = values.shape
+    lookback = season * seasons
+    residual = np.full(values.shape, np.nan)
+    chunk = max(CHUNK_ELEMENTS // (seasons * n_columns), 1)
+    for i in range(lookback, n, chunk):
+        stop = min(i + chunk, n)
+        previous = [
+            values[:, i - k * season : stop - k * season] for k in range(1, seasons + 1)
+        ]
+        if has_missing:
+            baseline = np.nanmedian(np.stack(previous, axis=-1), axis=-1)
+        else:
+            baseline = _median_network(previous)
+        residual[:, i:stop] = values[:, i:stop] - baseline
+    return residual
+
+
+class AnomalyDetector:
+    # Scores robustos por coluna (zona): z local = (x - mediana) / MAD da
+    # janela anterior, e z sazonal = o mesmo sobre o resíduo contra a
+    # mediana da mesma fase nos ciclos anteriores. O score final é o
+    # sazonal (picos diários normais não contam) ou o local enquanto não há
+    # ciclos suficientes. update() aceita lotes em sequência e guarda só a
+    # cauda necessária, com resultado idêntico ao de uma passada única
+    def __init__(
+        self,
+        columns: list = None,
+        index: str = "Datetime",
+        window: str = "1D",
+        season: str = "1D",
+        seasons: int = 7,
+        hop: int = None,
+        threshold: float = 3.5,
+    ):
+        assert seasons >= 1, "seasons must be at least 1"
+        assert threshold > 0, "threshold must be positive"
+        self.columns = columns
+        self.index = index
+        self.window = pd.Timedelta(window)
+        self.season = pd.Timedelta(season) if season else None
+        self.seasons = seasons
+        self.hop = hop
+        self.threshold = threshold
+        self.step = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.position = 0
+        self._tail = None
+        self._open = {}
+        self._ranges = []
+
+    def _configure(self, batch: pd.DataFrame) -> None:
+        self.columns = self.columns or [
+            col
+            for col in batch.select_dtypes(include=["number"]).columns
+            if col != self.index
+        ]
+        assert self.columns, "No numeric columns to score"
+        grid = analyze_time_grid(batch, self.index)
+        assert grid.step is not None, "Cannot score a series without a time step"
+        self.step = grid.step
+        # Janela ímpar: a mediana é o elemento central, sem média de dois
+        self.window_steps = max(int(self.window // self.step), MIN_WINDOW) | 1
+        self.hop_steps = self.hop or max(self.window_steps // 4, 1)
+        season_steps = int(self.season // self.step) if self.season else 0
+        # Sazonalidade de menos de 2 passos não tem fase para comparar
+        self.season_steps = season_steps if season_steps >= 2 else 0
+        self.lookback = self.season_steps * self.seasons
+        self.history = self.window_steps + self.hop_steps + self.lookback
+        logger.info(
+            f"Anomaly detector: window {self.window_steps}, hop {self.hop_steps}, "
+            f"season {self.season_steps} x {self.seasons} steps"
+        )
+
+    def _score(self, values: np.ndarray, start: int) -> tuple[np.ndarray, ...]:
+        has_missing = bool(np.isnan(values).any())
+        local = _robust_z(values, start, self.window_steps, self.hop_steps, has_missing)
+        if not self.season_steps:
+            return local, np.full(values.shape, np.nan)
+        residual = _seasonal_residual(
+            values, self.season_steps, self.seasons, has_missing
+        )
+        # Resíduos só existem após lookback linhas do buffer
+        seasonal = np.full(values.shape, np.nan)
+        if values.shape[1] > self.lookback:
+            seasonal[:, self.lookback :] = _robust_z(
+                residual[:, self.lookback :],
+                start + self.lookback,
+                self.window_steps,
+                self.hop_steps,
+                has_missing,
+            )
+        return local, seasonal
+
+    def _track_ranges(self, flags: np.ndarray, score: np.ndarray, datetimes) -> None:
+        # Trechos consecutivos de linhas marcadas; um trecho aberto no fim
+        # do lote continua no lote seguinte
+        for j, col in enumerate(self.columns):
+            flagged = flags[j]
+            padded = np.concatenate(([False], flagged, [False]))
+            edges = np.flatnonzero(padded[1:] != padded[:-1])
+            starts, stops = edges[::2], edges[1::2]
+            for first, stop in zip(starts, stops):
+                peak = float(np.nanmax(np.abs(score[j, first:stop])))
+                current = self._open.pop(col, None)
+                if current is not None and first == 0:
+                    current["end"] = datetimes[stop - 1]
+                    current["end_row"] = self.position + stop - 1
+                    current["rows"] += stop
+                    current["max_score"] = max(current["max_score"], peak)
+                else:
+                    if current is not None:
+                        self._ranges.append(current)
+                    current = {
+                        "column": col,
+                        "start": datetimes[first],
+                        "end": datetimes[stop - 1],
+                        "start_row": self.position + first,
+                        "end_row": self.position + stop - 1,
+                        "rows": int(stop - first),
+                        "max_score": peak,
+                    }
+                if stop == len(flagged):
+                    self._open[col] = current
+                else:
+                    self._ranges.append(current)
+            if col in self._open and (not len(flagged) or not flagged[-1]):
+                self._ranges.append(self._open.pop(col))
+
+    @profiled
+    def update(self, batch: pd.DataFrame) -> pd.DataFrame:
+        # Devolve, para as linhas do lote, o score final de cada coluna
+        if self.step is None:
+            self._configure(batch)
+        # Colunas como linhas contíguas: (colunas, linhas)
+        values = batch[self.columns].to_numpy(dtype=np.float64).T
+        tail = self._tail if self._tail is not None else values[:, :0]
+        buffer = np.concatenate([tail, values], axis=1)
+        start = self.position - tail.shape[1]
+
+        local, seasonal = self._score(buffer, start)
+        local = local[:, tail.shape[1] :]
+        seasonal = seasonal[:, tail.shape[1] :]
+        score = np.where(np.isnan(seasonal), local, seasonal)
+        with np.errstate(invalid="ignore"):
+            flags = np.abs(score) > self.threshold
+
+        datetimes = batch[self.index].to_numpy()
+        self._track_ranges(flags, score, datetimes)
+        self._tail = buffer[:, -self.history :]
+        self.position += len(batch)
+
+        scores = pd.DataFrame(score.T, columns=self.columns, index=batch.index)
+        scores.insert(0, self.index, batch[self.index].to_numpy())
+        return scores
+
+    def ranges(self) -> pd.DataFrame:
+        ranges = self._ranges + list(self._open.values())
+        columns = [
+            "column",
+            "start",
+            "end",
+            "start_row",
+            "end_row",
+            "rows",
+            "max_score",
+        ]
+        return (
+            pd.DataFrame(ranges, columns=columns)
+            .sort_values(["column", "start_row"])
+            .reset_index(drop=True)
+        )
+
+
+@profiled
+def detect_anomalies(
+    df: pd.DataFrame,
+    columns: list = None,
+    index: str = "Datetime",
+    window: str = "1D",
+    season: str = "1D",
+    seasons: int = 7,
+    threshold: float = 3.5,
+) -> dict:
+    # Passada única sobre a série inteira: scores por linha e trechos
+    # anômalos (linhas inicial/final e datas) prontos para plotar
+    try:
+        detector = AnomalyDetector(
+            columns, index, window, season, seasons, threshold=threshold
+        )
+        scores = detector.update(df)
+        ranges = detector.ranges()
+        logger.info(
+            f"Found {len(ranges)} anomalous ranges in {len(detector.columns)} "
+            f"columns ({int(ranges['rows'].sum())} rows)"
+        )
+        return {"scores": scores, "ranges": ranges}
+    except AssertionError as ae:
+        logger.error(str(ae))
+        raise
+    except Exception as e:
+        logger.error(f"Error detecting anomalies: {str(e)}")
+        raise
+
+
+def summarize_anomalies(ranges: pd.DataFrame, n_rows: int) -> dict:
+    summary = {}
+    for col, group in ranges.groupby("column", sort=False):
+        rows = int(group["rows"].sum())
+        summary[col] = {
+            "ranges": len(group),
+            "rows": rows,
+            "percent": f"{(rows / n_rows) * 100:.2f}%",
+            "max_score": float(group["max_score"].max()),
+        }
+    return summary
@@ -5,64 +5,149 @@ import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-from importer import load_dataset_from_kaggle
-from checker import check_dataset
-from processor import process_dataframe
+from importer import load_dataset
+from sources import get_dataset_source
+from checker import check_metadata, check_quality, compute_numeric_statistics
+from cache import dataframe_fingerprint
+from processor import process_dataframe, build_aggregation_pyramid
+from correlation import lagged_cross_correlation, correlation_at_lag
+from anomalies import detect_anomalies
+from validator import analyze_time_grid
+from downsampling import downsample_series, DEFAULT_MAX_POINTS
+from profiling import (
+    ProfilingSession,
+    use_session,
+    measure_overhead,
+    enable_profiling,
+    disable_profiling,
+    clear_records,
+    records_to_dataframe,
+    export_json,
+)
 
 
 @st.cache_data
 def load_data():
-    df = load_dataset_from_kaggle(
+    # Source definido por DATASET_SOURCE (Kaggle por padrão, diretório local
+    # ou espelho HTTP); sem mudança na origem nada é transferido nem parseado
+    df = load_dataset(
         dataset_address="fedesoriano/electric-power-consumption",
         file_name="powerconsumption.csv",
+        source=get_dataset_source(),
     )
-    return df
+    return df, dataframe_fingerprint(df)
+
+
+@st.cache_resource
+def load_pyramid(df):
+    return build_aggregation_pyramid(df)
 
 
 @st.cache_data
 def process_data(df, freq):
-    processed_df = process_dataframe(df, freq)
-    return processed_df
+    processed_df = process_dataframe(df, freq, pyramid=load_pyramid(df))
+    # A impressão digital é calculada uma vez por resultado e serve de chave
+    # para os caches das seções do relatório
+    return processed_df, dataframe_fingerprint(processed_df)
+
+
+# Cada seção do relatório tem seu próprio cache, chaveado por impressão
+# digital, frequência (e coluna); o dataframe (_df) não é re-hasheado pelo
+# Streamlit e as entradas mais antigas são descartadas (LRU)
+SECTION_CACHE_ENTRIES = 32
+MAX_CORRELATION_LAG = pd.Timedelta(days=3)
+MIN_CORRELATION_LAGS = 4
+SAMPLE_SIZE = [10, 15, 10]
+ANOMALY_COLUMNS = [f"PowerConsumption_Zone{zone}" for zone in (1, 2, 3)]
+
+
+@st.cache_data(max_entries=SECTION_CACHE_ENTRIES)
+def section_metadata(fingerprint, freq, _df):
+    return check_metadata(_df, SAMPLE_SIZE)
+
+
+@st.cache_data(max_entries=SECTION_CACHE_ENTRIES)
+def section_quality(fingerprint, freq, _df):
+    return check_quality(_df)
+
+
+@st.cache_data(max_entries=SECTION_CACHE_ENTRIES)
+def section_anomalies(fingerprint, _df):
+    # Sobre os dados brutos (passo de 10 min), onde picos diários e picos
+    # locais se distinguem; a agregação semanal apagaria ambos
+    columns = [col for col in ANOMALY_COLUMNS if col in _df.columns]
+    return detect_anomalies(_df, columns, "Datetime")["ranges"]
+
+
+@st.cache_data(max_entries=SECTION_CACHE_ENTRIES)
+def section_statistics(fingerprint, freq, column, _df):
+    stats = compute_numeric_statistics(_df[[column]])[column]
+    return {**stats, "mode": _df[column].mode()[0]}
+
+
+@st.cache_data(max_entries=SECTION_CACHE_ENTRIES)
+def section_correlation(fingerprint, freq, _df):
+    # Correlação cruzada de todos os pares até MAX_CORRELATION_LAG (no mínimo
+    # MIN_CORRELATION_LAGS passos), calculada uma vez por dataset/frequência
+    step = analyze_time_grid(_df, "Datetime").step or pd.Timedelta(freq)
+    max_lag = max(int(MAX_CORRELATION_LAG // step), MIN_CORRELATION_LAGS)
+    numeric_cols = list(_df.select_dtypes(include=[np.number]).columns)
+    return lagged_cross_correlation(_df, max_lag, numeric_cols), step
+
+
+@st.cache_data
+def profiler_overhead():
+    return measure_overhead()
 
 
 st.header("Dashboard")
 
-raw_data = load_data()
+# Instrumentação opcional: desligada, os estágios do pipeline não pagam nada.
+# Cada sessão do navegador tem o seu estado de medição
+if "profiling" not in st.session_state:
+    st.session_state["profiling"] = ProfilingSession()
+use_session(st.session_state["profiling"])
+profiling_enabled = st.sidebar.toggle("Medir desempenho do pipeline")
+if profiling_enabled:
+    enable_profiling()
+    clear_records()
+else:
+    disable_profiling()
+
+raw_data, raw_fingerprint = load_data()
 
-processed_data = process_data(raw_data, "7d")
+freq = "7d"
+processed_data, fingerprint = process_data(raw_data, freq)
 
 if st.checkbox("Show raw data"):
     tab1, tab2 = st.tabs(["Raw Data", "Processed Data"])
 
     with tab1:
-        raw_data = load_data()
         st.write(raw_data)
 
     with tab2:
-        processed_data_report = check_dataset(processed_data, [10, 15, 10])
-
-        # Pre-calcular todos os dados estatísticos necessários para evitar redundância
-        columns_without_datetime = [
-            k for k in processed_data_report["describe"] if k != "Datetime"
-        ]
-        stats_data = {}
-        percentiles_data = {}
-        histograms_data = {}
-
-        for col in columns_without_datetime:
-            stats_data[col] = processed_data_report["describe"][col]
-            percentiles_data[col] = {
-                "q1": np.percentile(processed_data[col], 25),
-                "median": np.median(processed_data[col]),
-                "q3": np.percentile(processed_data[col], 75),
-            }
-            histograms_data[col] = np.histogram(processed_data[col], bins=30)[0]
-
         st.write(processed_data)
 
         if st.checkbox("Show data report"):
-            # 1 - Metadados como expander com column_config para melhor visualização
-            with st.expander("📦 Metadados do Dataset"):
+            # Só a seção selecionada é calculada (e fica em cache)
+            section = st.radio(
+                "Seção",
+                [
+                    "📦 Metadados do Dataset",
+                    "📄 Amostras de Dados",
+                    "🧼 Qualidade de Dados",
+                    "📈 Análise Estatística",
+                    "🔄 Análise de Correlação",
+                ],
+                horizontal=True,
+                label_visibility="collapsed",
+            )
+
+            # 1 - Metadados com column_config para melhor visualização
+            if section == "📦 Metadados do Dataset":
+                processed_data_report = section_metadata(
+                    fingerprint, freq, processed_data
+                )
                 st.header("📦 Metadados do Dataset")
 
                 # Criar um DataFrame para exibir metadados com column_config
@@ -93,8 +178,11 @@ if st.checkbox("Show raw data"):
                     },
                 )
 
-            # 2 - Amostras de Dados como expander
-            with st.expander("📄 Amostras de Dados"):
+            # 2 - Amostras de Dados
+            if section == "📄 Amostras de Dados":
+                processed_data_report = section_metadata(
+                    fingerprint, freq, processed_data
+                )
                 st.header("📄 Amostras de Dados")
                 tab1, tab2, tab3 = st.tabs(["Início", "Meio", "Fim"])
                 with tab1:
@@ -114,7 +202,10 @@ if st.checkbox("Show raw data"):
                     )
 
             # 4 - Qualidade de Dados contendo também os detalhes de outliers
-            with st.expander("🧼 Qualidade de Dados"):
+            if section == "🧼 Qualidade de Dados":
+                processed_data_report = section_quality(
+                    fingerprint, freq, processed_data
+                )
                 st.header("Qualidade de Dados")
 
                 # Seção de Métricas principais - com títulos mais descritivos
@@ -142,89 +233,137 @@ if st.checkbox("Show raw data"):
                             f"Representa {processed_data_report['duplicates'].get('percent', '0%')} do conjunto de dados"
                         )
 
+                anomaly_ranges = section_anomalies(raw_fingerprint, raw_data)
                 with col3:
                     with st.container(border=True):
                         st.metric(
-                            "Colunas com Outliers",
-                            len(processed_data_report["outliers"]),
-                        )
-                        total_outliers = (
-                            sum(
-                                info["outliers"]
-                                for info in processed_data_report["outliers"].values()
-                            )
-                            if processed_data_report["outliers"]
-                            else 0
+                            "Trechos Anômalos",
+                            len(anomaly_ranges),
                         )
                         st.caption(
-                            f"Total de {total_outliers} pontos de dados identificados como outliers"
+                            f"Total de {int(anomaly_ranges['rows'].sum())} leituras "
+                            "fora do padrão local/sazonal nas zonas"
                         )
-                # Se não existirem outliers, informar ao usuário com destaque
-                if len(processed_data_report["outliers"]) == 0:
-                    st.success(
-                        "✅ Não foram encontrados outliers nos dados. Isso sugere uma distribuição adequada dos valores."
+
+                st.subheader("Anomalias por Zona")
+                st.caption(
+                    "Score robusto (mediana/MAD) do resíduo contra a mesma hora "
+                    "dos 7 dias anteriores; picos diários normais não são marcados"
+                )
+                anomaly_columns = [
+                    col for col in ANOMALY_COLUMNS if col in raw_data.columns
+                ]
+                anomaly_col = st.selectbox("Zona", anomaly_columns)
+                zone_ranges = anomaly_ranges[anomaly_ranges["column"] == anomaly_col]
+                anomaly_rows = (
+                    np.concatenate(
+                        [
+                            np.arange(first, last + 1)
+                            for first, last in zip(
+                                zone_ranges["start_row"], zone_ranges["end_row"]
+                            )
+                        ]
                     )
-                else:
-                    # Criar DataFrame para exibir outliers com column_config
-                    outliers_data = []
-                    for col, info in processed_data_report["outliers"].items():
-                        outliers_data.append(
-                            {
-                                "Coluna": col,
-                                "Quantidade": info["outliers"],
-                                "Percentual": info["percent"],
-                                "Limite Inferior": info["limits"][0],
-                                "Limite Superior": info["limits"][1],
-                            }
+                    if len(zone_ranges)
+                    else np.array([], dtype=int)
+                )
+                zone_line = downsample_series(
+                    raw_data, "Datetime", [anomaly_col], n_out=DEFAULT_MAX_POINTS
+                )[anomaly_col]
+                anomaly_fig = go.Figure()
+                anomaly_fig.add_trace(
+                    go.Scattergl(
+                        name=anomaly_col,
+                        x=zone_line.index,
+                        y=zone_line.to_numpy(),
+                        mode="lines",
+                        line=dict(color="steelblue", width=1),
+                    )
+                )
+                anomaly_fig.add_trace(
+                    go.Scattergl(
+                        name="Anomalias",
+                        x=raw_data["Datetime"].to_numpy()[anomaly_rows],
+                        y=raw_data[anomaly_col].to_numpy()[anomaly_rows],
+                        mode="markers",
+                        marker=dict(color="red", size=6),
+                    )
+                )
+                anomaly_fig.update_layout(
+                    xaxis_title="Data",
+                    yaxis_title="Consumo de Energia (kW)",
+                    height=350,
+                )
+                st.plotly_chart(anomaly_fig, use_container_width=True)
+
+                # Limites IQR globais por coluna, mantidos como referência
+                with st.expander("Outliers globais (IQR)"):
+                    # Se não existirem outliers, informar ao usuário com destaque
+                    if len(processed_data_report["outliers"]) == 0:
+                        st.success(
+                            "✅ Não foram encontrados outliers nos dados. Isso sugere uma distribuição adequada dos valores."
                         )
+                    else:
+                        # Criar DataFrame para exibir outliers com column_config
+                        outliers_data = []
+                        for col, info in processed_data_report["outliers"].items():
+                            outliers_data.append(
+                                {
+                                    "Coluna": col,
+                                    "Quantidade": info["outliers"],
+                                    "Percentual": info["percent"],
+                                    "Limite Inferior": info["limits"][0],
+                                    "Limite Superior": info["limits"][1],
+                                }
+                            )
 
-                    if outliers_data:
-                        outliers_df = pd.DataFrame(outliers_data)
+                        if outliers_data:
+                            outliers_df = pd.DataFrame(outliers_data)
 
-                        # Ordenar por quantidade de outliers (decrescente)
-                        outliers_df = outliers_df.sort_values(
-                            by="Quantidade", ascending=False
-                        )
+                            # Ordenar por quantidade de outliers (decrescente)
+                            outliers_df = outliers_df.sort_values(
+                                by="Quantidade", ascending=False
+                            )
 
-                        st.dataframe(
-                            outliers_df,
-                            use_container_width=True,
-                            hide_index=True,
-                            column_config={
-                                "Coluna": st.column_config.TextColumn(
-                                    "Coluna",
-                                    help="Nome da coluna com outliers",
-                                    width="medium",
-                                ),
-                                "Quantidade": st.column_config.NumberColumn(
-                                    "Total",
-                                    help="Número de outliers encontrados",
-                                    format="%d",
-                                    width="small",
-                                ),
-                                "Percentual": st.column_config.NumberColumn(
-                                    "Porcentagem",
-                                    help="Percentual de outliers em relação ao total de dados",
-                                    width="small",
-                                    format="percent",
-                                ),
-                                "Limite Inferior": st.column_config.NumberColumn(
-                                    "Limite Inferior",
-                                    help="Valores abaixo deste limite são considerados outliers",
-                                    format="localized",
-                                    width="small",
-                                ),
-                                "Limite Superior": st.column_config.NumberColumn(
-                                    "Limite Superior",
-                                    help="Valores acima deste limite são considerados outliers",
-                                    format="localized",
-                                    width="small",
-                                ),
-                            },
-                        )
+                            st.dataframe(
+                                outliers_df,
+                                use_container_width=True,
+                                hide_index=True,
+                                column_config={
+                                    "Coluna": st.column_config.TextColumn(
+                                        "Coluna",
+                                        help="Nome da coluna com outliers",
+                                        width="medium",
+                                    ),
+                                    "Quantidade": st.column_config.NumberColumn(
+                                        "Total",
+                                        help="Número de outliers encontrados",
+                                        format="%d",
+                                        width="small",
+                                    ),
+                                    "Percentual": st.column_config.NumberColumn(
+                                        "Porcentagem",
+                                        help="Percentual de outliers em relação ao total de dados",
+                                        width="small",
+                                        format="percent",
+                                    ),
+                                    "Limite Inferior": st.column_config.NumberColumn(
+                                        "Limite Inferior",
+                                        help="Valores abaixo deste limite são considerados outliers",
+                                        format="localized",
+                                        width="small",
+                                    ),
+                                    "Limite Superior": st.column_config.NumberColumn(
+                                        "Limite Superior",
+                                        help="Valores acima deste limite são considerados outliers",
+                                        format="localized",
+                                        width="small",
+                                    ),
+                                },
+                            )
 
-            # 3 - Análise Estatística como expander com duas colunas (info e gráfico)
-            with st.expander("📈 Análise Estatística"):
+            # 3 - Análise Estatística com duas colunas (info e gráfico)
+            if section == "📈 Análise Estatística":
                 col_left, col_right = st.columns([1, 2])
 
                 with col_left:
@@ -242,15 +381,18 @@ if st.checkbox("Show raw data"):
                     )
 
                     if selected_col:
+                        column_stats = section_statistics(
+                            fingerprint, freq, selected_col, processed_data
+                        )
                         stats_dict = {
-                            "🟪 Média": stats_data[selected_col]["mean"],
-                            "🟧 Moda": processed_data[selected_col].mode()[0],
-                            "🟦 Mediana": percentiles_data[selected_col]["median"],
-                            " Desvio Padrão": stats_data[selected_col]["std"],
-                            "🟩 Mínimo": stats_data[selected_col]["min"],
-                            "🟥 Máximo": stats_data[selected_col]["max"],
-                            "🟫 Q1": percentiles_data[selected_col]["q1"],
-                            "🟨 Q3": percentiles_data[selected_col]["q3"],
+                            "🟪 Média": column_stats["mean"],
+                            "🟧 Moda": column_stats["mode"],
+                            "🟦 Mediana": column_stats["median"],
+                            " Desvio Padrão": column_stats["std"],
+                            "🟩 Mínimo": column_stats["min"],
+                            "🟥 Máximo": column_stats["max"],
+                            "🟫 Q1": column_stats["q1"],
+                            "🟨 Q3": column_stats["q3"],
                         }
 
                         stats_df = pd.DataFrame(
@@ -278,25 +420,14 @@ if st.checkbox("Show raw data"):
                 with col_right:
                     # Gráfico ocupando todo o espaço da coluna
                     st.subheader("Distribuição")
-                    hist_data = histograms_data[selected_col]
+                    hist_data = column_stats["histogram"]
 
-                    # Verificando o tipo de dados do histograma e adaptando conforme necessário
-                    if isinstance(hist_data, np.ndarray):
-                        # Se for array numpy, precisamos calcular os bins para o histograma
-                        counts, bins = np.histogram(
-                            processed_data[selected_col].dropna(), bins=20
-                        )
-                        # Usando o centro de cada bin como valor x
-                        bin_centers = 0.5 * (bins[:-1] + bins[1:])
-                        # Criando DataFrame para Plotly
-                        hist_df = pd.DataFrame(
-                            {"valor": bin_centers, "contagem": counts}
-                        )
-                    else:
-                        # Caso já seja um DataFrame ou Series
-                        hist_df = pd.DataFrame(
-                            {"valor": hist_data.index, "contagem": hist_data.values}
-                        )
+                    # Usando o centro de cada bin como valor x
+                    bins = hist_data["edges"]
+                    bin_centers = 0.5 * (bins[:-1] + bins[1:])
+                    hist_df = pd.DataFrame(
+                        {"valor": bin_centers, "contagem": hist_data["counts"]}
+                    )
 
                     fig = make_subplots()
 
@@ -338,12 +469,22 @@ if st.checkbox("Show raw data"):
                     # Exibindo o gráfico
                     st.plotly_chart(fig, use_container_width=True)
 
-            with st.expander("🔄 Análise de Correlação"):
+            if section == "🔄 Análise de Correlação":
                 st.header("Matriz de Correlação de Pearson")
 
-                # Calcular a matriz de correlação apenas para colunas numéricas
-                numeric_cols = processed_data.select_dtypes(include=[np.number]).columns
-                corr_matrix = processed_data[numeric_cols].corr()
+                # Correlação defasada (via FFT) apenas para colunas numéricas;
+                # o slider só escolhe qual lag do resultado em cache exibir
+                correlations, step = section_correlation(
+                    fingerprint, freq, processed_data
+                )
+                lags = correlations.index.get_level_values("lag").unique()
+                lag = st.select_slider(
+                    "Defasagem (linha em t, coluna em t + defasagem)",
+                    options=list(lags),
+                    value=0,
+                    format_func=lambda lag: f"{lag} ({lag * step})",
+                )
+                corr_matrix = correlation_at_lag(correlations, lag)
 
                 # Criar heatmap com plotly
                 fig = go.Figure(
@@ -376,13 +517,49 @@ fig = go.Figure()
 zones = ["Zone1", "Zone2", "Zone3"]
 colors = ["green", "orange", "blue"]
 line_colors = ["darkgreen", "darkorange", "darkblue"]
+
+# O zoom é feito pelo intervalo selecionado: a cada mudança a janela visível é
+# reamostrada no servidor, limitada a max_points pontos por série
+first_date = processed_data["Datetime"].min().to_pydatetime()
+last_date = processed_data["Datetime"].max().to_pydatetime()
+zoom_col, points_col = st.columns([3, 1])
+with zoom_col:
+    period = (
+        st.slider(
+            "Período",
+            min_value=first_date,
+            max_value=last_date,
+            value=(first_date, last_date),
+            format="DD/MM/YYYY",
+        )
+        if first_date < last_date
+        else (first_date, last_date)
+    )
+with points_col:
+    max_points = st.number_input(
+        "Pontos por série",
+        min_value=100,
+        max_value=20_000,
+        value=DEFAULT_MAX_POINTS,
+        step=500,
+    )
+zone_series = downsample_series(
+    processed_data,
+    "Datetime",
+    [f"TotalPowerConsumption_{zone}" for zone in zones],
+    n_out=max_points,
+    start=pd.Timestamp(period[0]),
+    end=pd.Timestamp(period[1]),
+)
+
 # Add mean lines (valores por período)
 for zone, color in zip(zones, line_colors):
+    series = zone_series[f"TotalPowerConsumption_{zone}"]
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             name=f"Média {zone}",
-            x=processed_data["Datetime"],
-            y=processed_data[f"TotalPowerConsumption_{zone}"],  # Coluna corrigida
+            x=series.index,
+            y=series.to_numpy(),
             mode="lines",
             line=dict(color=color, width=1),
             showlegend=True,
@@ -396,3 +573,50 @@ fig.update_layout(
     legend_title="Zonas",
 )
 st.plotly_chart(fig, use_container_width=True)
+
+if profiling_enabled:
+    with st.expander("⏱️ Desempenho"):
+        st.header("Desempenho por Estágio")
+        overhead = profiler_overhead()
+        st.caption(
+            f"Custo do profiler por chamada: "
+            f"{overhead['disabled_overhead_seconds'] * 1e9:.0f} ns desligado, "
+            f"{overhead['enabled_overhead_seconds'] * 1e6:.1f} µs ligado "
+            "(sem contar o rastreamento de memória)"
+        )
+        records_df = records_to_dataframe()
+        if records_df.empty:
+            st.info(
+                "Nenhum estágio executado nesta sessão (resultados vindos do cache do Streamlit)."
+            )
+        else:
+            records_df["stage"] = [
+                "  " * depth + stage
+                for stage, depth in zip(records_df["stage"], records_df["depth"])
+            ]
+            st.dataframe(
+                records_df[
+                    ["stage", "seconds", "rows", "rows_per_second", "peak_bytes"]
+                ],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "stage": st.column_config.TextColumn("Estágio", width="large"),
+                    "seconds": st.column_config.NumberColumn(
+                        "Tempo (s)", format="%.4f"
+                    ),
+                    "rows": st.column_config.NumberColumn("Linhas", format="%d"),
+                    "rows_per_second": st.column_config.NumberColumn(
+                        "Linhas/s", format="%.0f"
+                    ),
+                    "peak_bytes": st.column_config.NumberColumn(
+                        "Pico de Memória (bytes)", format="%d"
+                    ),
+                },
+            )
+            st.download_button(
+                "Exportar JSON",
+                data=export_json(),
+                file_name="pipeline_profile.json",
+                mime="application/json",
+            )
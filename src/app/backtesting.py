@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch import share_dataframe, attach_dataframe
+from cache import DEFAULT_CACHE_DIR, dataframe_fingerprint
+from forecasting import BASELINES, TARGET_COLUMNS
+from processor import process_dataframe
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKTEST_DIR = os.path.join(DEFAULT_CACHE_DIR, "backtests")
+
+DEFAULT_MODELS = [
+    {"model": "seasonal_naive"},
+    {"model": "exponential_smoothing"},
+    {"model": "calendar_regression"},
+]
+
+
+def model_label(config: dict) -> str:
+    params = config.get("params", {})
+    if not params:
+        return config["model"]
+    arguments = ", ".join(f"{key}={value}" for key, value in sorted(params.items()))
+    return f"{config['model']}({arguments})"
+
+
+def make_cutoffs(
+    n_rows: int,
+    horizon: int,
+    n_folds: int = 10,
+    step: int = None,
+    min_train: int = None,
+) -> list:
+    # Cortes walk-forward contados a partir do fim: o último fold termina na
+    # última linha e os anteriores recuam `step` linhas cada
+    step = step or horizon
+    min_train = min_train or horizon
+    cutoffs = [n_rows - horizon - i * step for i in range(n_folds)]
+    return sorted(cutoff for cutoff in cutoffs if cutoff >= min_train)
+
+
+def _fold_key(
+    fingerprint: str, freq: str, config: dict, cutoff: int, horizon: int, targets
+) -> str:
+    raw = json.dumps(
+        [fingerprint, freq, config, cutoff, horizon, list(targets)], sort_keys=True
+    )
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _read_fold(cache_dir: str, key: str) -> dict | None:
+    path = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_fold(cache_dir: str, key: str, result: dict) -> None:
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, path)
+
+
+def fold_errors(predicted: np.ndarray, actual: np.ndarray, targets: list) -> dict:
+    # Somas por alvo em vez de médias, para que folds possam ser agregados
+    # exatamente depois; MAPE ignora valores reais iguais a zero
+    valid = ~(np.isnan(predicted) | np.isnan(actual))
+    error = np.where(valid, predicted - actual, 0.0)
+    relevant = valid & (actual != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = np.where(relevant, np.abs(error / actual), 0.0)
+    return {
+        target: {
+            "n": int(valid[:, i].sum()),
+            "abs": float(np.abs(error[:, i]).sum()),
+            "sq": float((error[:, i] ** 2).sum()),
+            "ape": float(ape[:, i].sum()),
+            "ape_n": int(relevant[:, i].sum()),
+        }
+        for i, target in enumerate(targets)
+    }
+
+
+def _run_fold(shared, config: dict, cutoff: int, horizon: int, targets: list) -> dict:
+    # Treino e real são fatias (views) do dataframe em shared memory
+    df = attach_dataframe(shared)
+    model = BASELINES[config["model"]](
+        targets=targets, index=shared.datetime_col, **config.get("params", {})
+    )
+    predicted = model.fit(df.iloc[:cutoff]).predict(horizon).to_numpy()
+    actual = df[targets].iloc[cutoff : cutoff + horizon].to_numpy(dtype=np.float64)
+    return fold_errors(predicted, actual, targets)
+
+
+def summarize_folds(folds: pd.DataFrame) -> pd.DataFrame:
+    sums = folds.groupby(["freq", "model", "target"], sort=False)[
+        ["n", "abs", "sq", "ape", "ape_n"]
+    ].sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = pd.DataFrame(
+            {
+                "MAE": sums["abs"] / sums["n"],
+                "MAPE": 100 * sums["ape"] / sums["ape_n"],
+                "RMSE": np.sqrt(sums["sq"] / sums["n"]),
+                "folds": folds.groupby(["freq", "model", "target"], sort=False).size(),
+            }
+        )
+    return metrics.reset_index()
+
+
+@profiled
+def run_backtest(
+    df: pd.DataFrame,
+    freqs: tuple = ("h",),
+    horizon: int = 24,
+    n_folds: int = 10,
+    models: list = DEFAULT_MODELS,
+    targets: list = None,
+    step: int = None,
+    min_train: int = None,
+    index: str = "Datetime",
+    cache_dir: str = DEFAULT_BACKTEST_DIR,
+    max_workers: int = None,
+) -> dict:
+    # Para cada frequência o dataframe é processado uma única vez e publicado
+    # em shared memory; os folds rodam num pool de processos e cada resultado
+    # fica em disco, chaveado pela impressão digital dos dados e pela
+    # configuração do modelo. As features compartilhadas são as de
+    # process_dataframe (calendário); os lags/janelas do FeatureGenerator
+    # ficam de fora porque nenhuma baseline os usa: elas preveem o horizonte
+    # inteiro a partir do histórico, e lags das linhas futuras não existem
+    # no momento da previsão
+    os.makedirs(cache_dir, exist_ok=True)
+    for config in models:
+        assert config["model"] in BASELINES, (
+            f"Unknown model {config['model']}, use one of {list(BASELINES)}"
+        )
+    fingerprint = dataframe_fingerprint(df)
+    start = time.perf_counter()
+    segments = {}
+    records = []
+    pending = {}
+    try:
+        for freq in freqs:
+            processed = process_dataframe(df.copy(), freq, index)
+            freq_targets = targets or [
+                col for col in TARGET_COLUMNS if col in processed.columns
+            ]
+            cutoffs = make_cutoffs(len(processed), horizon, n_folds, step, min_train)
+            logger.info(
+                f'Backtesting "{freq}": {len(cutoffs)} folds x {len(models)} models'
+            )
+            for config in models:
+                for cutoff in cutoffs:
+                    key = _fold_key(
+                        fingerprint, freq, config, cutoff, horizon, freq_targets
+                    )
+                    fold = {
+                        "freq": freq,
+                        "model": model_label(config),
+                        "cutoff": cutoff,
+                    }
+                    cached = _read_fold(cache_dir, key)
+                    if cached is not None:
+                        records.append((fold, cached, True))
+                        continue
+                    if freq not in segments:
+                        segments[freq] = share_dataframe(processed, index)
+                    pending[key] = (fold, config, freq, cutoff, freq_targets)
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                for key, (_, config, freq, cutoff, freq_targets) in pending.items():
+                    futures[key] = executor.submit(
+                        _run_fold,
+                        segments[freq][0],
+                        config,
+                        cutoff,
+                        horizon,
+                        freq_targets,
+                    )
+                for key, future in futures.items():
+                    result = future.result()
+                    _write_fold(cache_dir, key, result)
+                    records.append((pending[key][0], result, False))
+    except Exception as e:
+        logger.error(f"Error running backtest: {str(e)}")
+        raise
+    finally:
+        for _, shm in segments.values():
+            shm.close()
+            shm.unlink()
+
+    elapsed = time.perf_counter() - start
+    rows = [
+        {**fold, "target": target, **errors, "cached": cached}
+        for fold, result, cached in records
+        for target, errors in result.items()
+    ]
+    folds = pd.DataFrame(rows)
+    throughput = {
+        "folds": len(records),
+        "computed": len(pending),
+        "cached": len(records) - len(pending),
+        "seconds": elapsed,
+        "folds_per_second": len(records) / elapsed if elapsed else None,
+    }
+    logger.info(
+        f"Backtest finished: {throughput['folds']} folds "
+        f"({throughput['computed']} computed, {throughput['cached']} cached) "
+        f"in {elapsed:.2f}s, {throughput['folds_per_second']:.1f} folds/s"
+    )
+    return {
+        "metrics": summarize_folds(folds) if len(folds) else pd.DataFrame(),
+        "folds": folds,
+        "throughput": throughput,
+    }
@@ -0,0 +1,278 @@
+import os
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from importer import (
+    load_dataset_from_file,
+    load_dataset,
+    save_dataset_to_file,
+    save_dataset_to_partitions,
+)
+from sources import get_dataset_source
+from processor import process_dataframe
+from delta import DeltaProcessor
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    dataset: str
+    freq: str
+    output_path: str
+    file_type: str = "csv"
+    # Com delta_dir, a saída anterior e os hashes de linha ficam em
+    # delta_dir/<dataset>-<hash>/freq=<freq> e só os buckets alterados são
+    # refeitos
+    delta_dir: str = None
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    # Descrição (pequena e serializável) de um dataframe numérico publicado em
+    # shared memory: as colunas ficam em sequência num único segmento
+    name: str
+    columns: tuple
+    dtypes: tuple
+    offsets: tuple
+    length: int
+    datetime_col: str
+    tz: str = None
+
+
+def share_dataframe(
+    df: pd.DataFrame, datetime_col: str = "Datetime"
+) -> tuple[SharedFrame, shared_memory.SharedMemory]:
+    if not pd.api.types.is_datetime64_any_dtype(df[datetime_col]):
+        df = df.assign(**{datetime_col: pd.to_datetime(df[datetime_col])})
+    tz = getattr(df[datetime_col].dtype, "tz", None)
+    datetimes = df[datetime_col]
+    if tz is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+
+    columns = [datetime_col, *df.columns.drop(datetime_col)]
+    arrays = [datetimes.to_numpy().astype("datetime64[ns]").view(np.int64)]
+    for col in columns[1:]:
+        assert pd.api.types.is_numeric_dtype(df[col]), (
+            f"Column {col} must be numeric to be shared"
+        )
+        arrays.append(df[col].to_numpy())
+    offsets = np.concatenate([[0], np.cumsum([values.nbytes for values in arrays])])
+    shm = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]), 1))
+    for values, offset in zip(arrays, offsets):
+        view = np.ndarray(
+            len(values), dtype=values.dtype, buffer=shm.buf, offset=int(offset)
+        )
+        view[:] = values
+    shared = SharedFrame(
+        name=shm.name,
+        columns=tuple(columns),
+        dtypes=tuple(str(values.dtype) for values in arrays),
+        offsets=tuple(int(offset) for offset in offsets[:-1]),
+        length=len(df),
+        datetime_col=datetime_col,
+        tz=str(tz) if tz is not None else None,
+    )
+    return shared, shm
+
+
+_attached = {}
+
+
+def attach_dataframe(shared: SharedFrame) -> pd.DataFrame:
+    # Reconstrói o dataframe com views somente-leitura sobre a shared memory;
+    # o segmento fica aberto enquanto o processo worker existir
+    if shared.name not in _attached:
+        _attached[shared.name] = shared_memory.SharedMemory(name=shared.name)
+    shm = _attached[shared.name]
+    data = {}
+    for col, dtype, offset in zip(shared.columns, shared.dtypes, shared.offsets):
+        values = np.ndarray(shared.length, dtype=dtype, buffer=shm.buf, offset=offset)
+        values.flags.writeable = False
+        data[col] = values
+    df = pd.DataFrame(data, copy=False)
+    datetimes = pd.DatetimeIndex(df[shared.datetime_col].to_numpy().view("M8[ns]"))
+    if shared.tz is not None:
+        datetimes = datetimes.tz_localize("UTC").tz_convert(shared.tz)
+    df[shared.datetime_col] = datetimes
+    return df
+
+
+def delta_state_dir(job: BatchJob) -> str:
+    # O hash do caminho absoluto (ou do endereço, para datasets de um source)
+    # separa arquivos homônimos de diretórios diferentes; o nome fica no
+    # diretório só para facilitar a leitura
+    dataset = job.dataset
+    if os.path.exists(dataset):
+        dataset = os.path.abspath(dataset)
+    digest = hashlib.blake2b(dataset.encode(), digest_size=8).hexdigest()
+    base_name = os.path.basename(job.dataset).rsplit(".", 1)[0]
+    return os.path.join(job.delta_dir, f"{base_name}-{digest}", f"freq={job.freq}")
+
+
+def _run_job(job: BatchJob, shared: SharedFrame) -> dict:
+    start = time.perf_counter()
+    df = attach_dataframe(shared)
+    delta = None
+    if job.delta_dir:
+        processor = DeltaProcessor(delta_state_dir(job), job.freq, shared.datetime_col)
+        processed = processor.update(df)
+        delta = processor.last_delta
+    else:
+        processed = process_dataframe(df, job.freq, shared.datetime_col)
+    if job.file_type == "partitioned":
+        # Buckets refeitos podem cair em partições antigas: com buckets
+        # alterados a frequência é regravada inteira; sem nenhum, "append"
+        # não grava nada
+        rewrite = delta is not None and (delta["buckets"] or delta["removed_buckets"])
+        save_dataset_to_partitions(
+            processed,
+            job.output_path,
+            job.freq,
+            shared.datetime_col,
+            mode="overwrite" if rewrite else "append",
+        )
+    else:
+        save_dataset_to_file(processed, job.output_path, job.file_type)
+    return {
+        "dataset": job.dataset,
+        "freq": job.freq,
+        "output_path": job.output_path,
+        "rows": len(processed),
+        "delta": delta,
+        "seconds": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+def run_batch(
+    jobs: list,
+    max_workers: int = None,
+    datetime_col: str = "Datetime",
+    loader=load_dataset_from_file,
+) -> list:
+    # Cada dataset distinto é carregado uma única vez e publicado em shared
+    # memory; os workers recebem apenas a descrição do segmento
+    segments = {}
+    results = []
+    start = time.perf_counter()
+    try:
+        for dataset in dict.fromkeys(job.dataset for job in jobs):
+            logger.info(f"Loading {dataset} into shared memory")
+            segments[dataset] = share_dataframe(loader(dataset), datetime_col)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_run_job, job, segments[job.dataset][0]): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Job {job.dataset} @ {job.freq} failed: {str(e)}")
+                    result = {"dataset": job.dataset, "freq": job.freq, "error": str(e)}
+                else:
+                    logger.info(
+                        f"Job {job.dataset} @ {job.freq}: {result['rows']} rows "
+                        f"in {result['seconds']:.2f}s"
+                    )
+                results.append(result)
+    finally:
+        for _, shm in segments.values():
+            shm.close()
+            shm.unlink()
+
+    elapsed = time.perf_counter() - start
+    busy = sum(result.get("seconds", 0.0) for result in results)
+    logger.info(
+        f"Batch finished: {len(jobs)} jobs in {elapsed:.2f}s "
+        f"({busy / max(elapsed, 1e-9):.1f}x parallel speedup)"
+    )
+    return results
+
+
+def source_loader(spec: str):
+    # Datasets no formato "owner/nome/arquivo.csv" carregados de um source
+    # (busca condicional + cache), no lugar de caminhos locais
+    source = get_dataset_source(spec)
+
+    def loader(dataset: str) -> pd.DataFrame:
+        dataset_address, file_name = dataset.rsplit("/", 1)
+        return load_dataset(dataset_address, file_name, source)
+
+    return loader
+
+
+def build_jobs(
+    datasets: list,
+    freqs: list,
+    output_dir: str,
+    file_type: str = "csv",
+    delta_dir: str = None,
+) -> list:
+    jobs = []
+    for dataset in datasets:
+        base_name = os.path.basename(dataset).rsplit(".", 1)[0]
+        for freq in freqs:
+            # Particionado: um diretório por dataset, com freq=<freq> dentro
+            if file_type == "partitioned":
+                output_path = os.path.join(output_dir, base_name)
+            else:
+                output_path = os.path.join(
+                    output_dir, f"{base_name}_{freq}.{file_type}"
+                )
+            jobs.append(BatchJob(dataset, freq, output_path, file_type, delta_dir))
+    return jobs
+
+
+def main(argv: list = None) -> list:
+    parser = argparse.ArgumentParser(
+        description="Processa vários datasets e frequências em paralelo"
+    )
+    parser.add_argument("--dataset", nargs="+", required=True)
+    parser.add_argument("--freq", nargs="+", default=["h", "D", "7D"])
+    parser.add_argument("--output-dir", default="processed")
+    parser.add_argument(
+        "--file-type",
+        default="csv",
+        help="csv, parquet, ... ou partitioned (parquet por freq/ano/mês)",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--source",
+        default=None,
+        help="kaggle, diretório local ou URL de espelho; datasets como owner/nome/arquivo",
+    )
+    parser.add_argument(
+        "--delta-dir",
+        default=None,
+        help="estado entre execuções: só os buckets com linhas alteradas são refeitos",
+    )
+    args = parser.parse_args(argv)
+
+    jobs = build_jobs(
+        args.dataset, args.freq, args.output_dir, args.file_type, args.delta_dir
+    )
+    loader = load_dataset_from_file
+    if args.source:
+        loader = source_loader(args.source)
+    return run_batch(jobs, args.workers, loader=loader)
+
+
+if __name__ == "__main__":
+    main()
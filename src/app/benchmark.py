@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from importer import load_dataset_from_file
+from compaction import DATETIME_FORMAT
+from processor import process_dataframe
+from checker import check_dataset
+from validator import validate_dataframe_by_time_range
+from synthetic import write_power_consumption_csv
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [52_416, 1_000_000]
+DEFAULT_FREQS = ["h", "D", "7D", "ME"]
+# Colunas do frame numérico largo usado para medir o checker
+WIDE_COLUMNS = 20
+_MEASURED_KEYS = {"seconds_min", "seconds_median", "peak_bytes", "rows_per_second"}
+
+
+def measure(func, *args, repeat: int = 3, **kwargs) -> dict:
+    # Tempo (mínimo e mediana de repeat execuções) e pico de memória alocada,
+    # medido com tracemalloc numa execução separada para não distorcer o tempo
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": float(np.median(timings)),
+        "peak_bytes": peak,
+    }
+
+
+def _per_column_statistics(df: pd.DataFrame, sample_size=3, bins: int = 30) -> None:
+    # Referência: caminho anterior ao kernel fundido, isto é, o check_dataset
+    # original (describe, duplicated e quartis por coluna) seguido do laço de
+    # percentis e histograma que o dashboard fazia por coluna
+    df.head(sample_size)
+    df.describe(include="all")
+    df.isna().sum()
+    if df.duplicated().sum() > 0:
+        df.duplicated(keep=False)
+    df.duplicated().sum()
+    numeric_cols = df.select_dtypes(include=["number"]).columns
+    for col in numeric_cols:
+        q1 = df[col].quantile(0.25)
+        q3 = df[col].quantile(0.75)
+        iqr = q3 - q1
+        ((df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr)).sum()
+    for col in numeric_cols:
+        values = df[col].dropna().to_numpy()
+        np.percentile(values, [25, 50, 75])
+        np.median(values)
+        np.histogram(values, bins=bins)
+
+
+def _process_copy(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    # process_dataframe converte Datetime no próprio df: cada repetição e
+    # cada freq recebe uma cópia da leitura crua e paga a mesma conversão
+    return process_dataframe(df.copy(), freq)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(
+    sizes: list = DEFAULT_SIZES,
+    freqs: list = DEFAULT_FREQS,
+    repeat: int = 3,
+    data_dir: str = None,
+    seed: int = 0,
+    wide_columns: int = WIDE_COLUMNS,
+) -> dict:
+    data_dir = data_dir or tempfile.mkdtemp(prefix="power_benchmark_")
+    results = []
+
+    def record(name: str, rows: int, stats: dict, **params) -> None:
+        results.append(
+            {
+                "benchmark": name,
+                "rows": rows,
+                **params,
+                **stats,
+                "rows_per_second": rows / stats["seconds_min"]
+                if stats["seconds_min"]
+                else None,
+            }
+        )
+        labels = "".join(f" {key}={value}" for key, value in params.items())
+        logger.info(
+            f"{name}{labels} rows={rows}: {stats['seconds_min']:.4f}s, "
+            f"peak {stats['peak_bytes'] / 1024**2:.1f} MB"
+        )
+
+    for rows in sizes:
+        file_path = os.path.join(data_dir, f"powerconsumption_{rows}_{seed}.csv")
+        if not os.path.exists(file_path):
+            write_power_consumption_csv(file_path, rows, seed=seed)
+
+        record(
+            "load_dataset_from_file",
+            rows,
+            measure(load_dataset_from_file, file_path, repeat=repeat),
+        )
+        record(
+            "load_dataset_from_file",
+            rows,
+            measure(
+                load_dataset_from_file,
+                file_path,
+                date_format=DATETIME_FORMAT,
+                repeat=repeat,
+            ),
+            date_format=DATETIME_FORMAT,
+        )
+        record(
+            "load_dataset_from_file",
+            rows,
+            measure(
+                load_dataset_from_file,
+                file_path,
+                columns=["Datetime", "PowerConsumption_Zone1"],
+                date_format=DATETIME_FORMAT,
+                repeat=repeat,
+            ),
+            columns="Datetime,PowerConsumption_Zone1",
+            date_format=DATETIME_FORMAT,
+        )
+
+        raw = load_dataset_from_file(file_path)
+        # Validator e checker medem o caminho normal, com Datetime já tipado
+        parsed = raw.assign(
+            Datetime=pd.to_datetime(raw["Datetime"], format=DATETIME_FORMAT)
+        )
+
+        record(
+            "validate_dataframe_by_time_range",
+            rows,
+            measure(
+                validate_dataframe_by_time_range,
+                parsed,
+                "Datetime",
+                pd.Timedelta(hours=6),
+                repeat=repeat,
+            ),
+        )
+        record(
+            "check_dataset",
+            rows,
+            measure(check_dataset, parsed, [10, 15, 10], repeat=repeat),
+        )
+
+        # Frame numérico largo: onde o kernel de estatísticas deve ficar ~5x
+        # mais rápido que o laço por coluna
+        rng = np.random.default_rng(seed)
+        wide = pd.DataFrame(
+            rng.normal(size=(rows, wide_columns)),
+            columns=[f"c{i}" for i in range(wide_columns)],
+        )
+        wide.iloc[::97, 0] = np.nan
+        reference = measure(_per_column_statistics, wide, repeat=repeat)
+        record("check_dataset_reference", rows, reference, columns=wide_columns)
+        fused = measure(check_dataset, wide, repeat=repeat)
+        record("check_dataset", rows, fused, columns=wide_columns)
+        logger.info(
+            f"check_dataset columns={wide_columns} rows={rows}: "
+            f"{reference['seconds_min'] / fused['seconds_min']:.1f}x faster "
+            "than the per-column reference"
+        )
+        del wide
+
+        for freq in freqs:
+            record(
+                "process_dataframe",
+                rows,
+                measure(_process_copy, raw, freq, repeat=repeat),
+                freq=freq,
+            )
+
+    return {
+        "metadata": {
+            "commit": _git_commit(),
+            "timestamp": pd.Timestamp.now(tz="UTC").isoformat(),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _result_key(result: dict) -> tuple:
+    # Identifica o resultado por todos os parâmetros registrados (freq,
+    # columns, ...), não só pelos medidos
+    params = {key: value for key, value in result.items() if key not in _MEASURED_KEYS}
+    return tuple(sorted((key, str(value)) for key, value in params.items()))
+
+
+def compare_benchmarks(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    # Lista as variações de tempo e memória entre duas execuções; regressão é
+    # qualquer piora acima de threshold (relativo)
+    baseline_results = {_result_key(r): r for r in baseline["results"]}
+    comparison = []
+    for result in current["results"]:
+        before = baseline_results.get(_result_key(result))
+        if before is None:
+            continue
+        time_ratio = result["seconds_min"] / before["seconds_min"]
+        memory_ratio = result["peak_bytes"] / max(before["peak_bytes"], 1)
+        comparison.append(
+            {
+                "benchmark": result["benchmark"],
+                "rows": result["rows"],
+                "freq": result.get("freq"),
+                "columns": result.get("columns"),
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regression": time_ratio > 1 + threshold
+                or memory_ratio > 1 + threshold,
+            }
+        )
+    return comparison
+
+
+def main(argv: list = None) -> dict:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de importer, processor, checker e validator"
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--freqs", nargs="+", default=DEFAULT_FREQS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wide-columns", type=int, default=WIDE_COLUMNS)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        args.sizes,
+        args.freqs,
+        args.repeat,
+        args.data_dir,
+        args.seed,
+        args.wide_columns,
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Benchmark results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["comparison"] = compare_benchmarks(baseline, report, args.threshold)
+        for row in report["comparison"]:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            logger.info(
+                f"{flag}: {row['benchmark']} rows={row['rows']} freq={row['freq']} "
+                f"time x{row['time_ratio']:.2f} memory x{row['memory_ratio']:.2f}"
+            )
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "DATASET_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "eletric_power_consumption"),
+)
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+# Serializa leitura-modificação-escrita do índice entre threads do processo
+_INDEX_LOCK = threading.Lock()
+
+
+def file_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    # Hash de conteúdo (valores, índice, nomes e dtypes das colunas) para usar
+    # como chave de memoização sem depender da identidade do objeto
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def row_fingerprints(df: pd.DataFrame, columns: list = None) -> np.ndarray:
+    # Hash de 64 bits por linha (vetorizado, sem o índice): base da detecção
+    # de duplicatas e da comparação entre versões de um dataset
+    data = df if columns is None else df[columns]
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+class DatasetCache:
+    # Cache persistente de dataframes já parseados em Arrow IPC (feather sem
+    # compressão), lidos de volta via memory-map. A chave combina endereço do
+    # dataset, nome do arquivo e hash do conteúdo do arquivo de origem.
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(dataset_address: str, file_name: str, content_hash: str) -> str:
+        raw = f"{dataset_address}\0{file_name}\0{content_hash}".encode()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def _read_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache index: {str(e)}")
+            return {}
+
+    @staticmethod
+    def _tmp_path(path: str) -> str:
+        # Processo e thread no nome: escritas concorrentes não dividem o tmp
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _write_index(self, index: dict) -> None:
+        tmp_path = self._tmp_path(self.index_path)
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.arrow")
+
+    def _latest_key(self, index: dict, dataset_address: str, file_name: str):
+        candidates = [
+            (entry["created"], key)
+            for key, entry in index.items()
+            if entry["dataset_address"] == dataset_address
+            and entry["file_name"] == file_name
+        ]
+        return max(candidates)[1] if candidates else None
+
+    def get(
+        self, dataset_address: str, file_name: str, content_hash: str = None
+    ) -> pd.DataFrame | None:
+        # Sem content_hash retorna a versão mais recente (uso offline)
+        index = self._read_index()
+        if content_hash is None:
+            key = self._latest_key(index, dataset_address, file_name)
+        else:
+            key = self.make_key(dataset_address, file_name, content_hash)
+
+        path = self._entry_path(key) if key else None
+        if key not in index or not os.path.exists(path):
+            logger.info(f"Cache miss for {dataset_address}/{file_name}")
+            return None
+
+        import pyarrow as pa
+
+        # read_all sobre o memory-map não copia, e com split_blocks as colunas
+        # numéricas/datetime sem null viram arrays (somente leitura) sobre o
+        # próprio mapa; só strings são materializadas
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas(split_blocks=True)
+
+        # O acesso fica no mtime da entrada: um hit não reescreve o índice
+        try:
+            os.utime(path)
+        except OSError as e:
+            logger.warning(f"Could not touch cache entry {key}: {str(e)}")
+        logger.info(f"Cache hit for {dataset_address}/{file_name} ({key})")
+        return df
+
+    def put(
+        self,
+        df: pd.DataFrame,
+        dataset_address: str,
+        file_name: str,
+        content_hash: str,
+    ) -> str:
+        import pyarrow as pa
+
+        key = self.make_key(dataset_address, file_name, content_hash)
+        path = self._entry_path(key)
+        tmp_path = self._tmp_path(path)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # from_pandas grava NaN de float como null, e null obriga o to_pandas a
+        # copiar a coluna; NaN gravado como valor é lido direto do mapa
+        for i, col in enumerate(df.columns):
+            if isinstance(df[col].dtype, np.dtype) and df[col].dtype.kind == "f":
+                values = pa.array(df[col].to_numpy(), from_pandas=False)
+                table = table.set_column(i, table.field(i), values)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        with _INDEX_LOCK:
+            index = self._read_index()
+            index[key] = {
+                "dataset_address": dataset_address,
+                "file_name": file_name,
+                "content_hash": content_hash,
+                "size": os.path.getsize(path),
+                "created": time.time(),
+            }
+            self._evict(index, keep=key)
+            self._write_index(index)
+        logger.info(f"Cached {dataset_address}/{file_name} as {key}")
+        return key
+
+    def _evict(self, index: dict, keep: str = None) -> None:
+        total = sum(entry["size"] for entry in index.values())
+        by_access = sorted(index, key=lambda k: self._last_access(index, k))
+        for key in by_access:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index[key]["size"]
+            self._remove(index, key)
+            logger.info(f"Evicted cache entry {key}")
+
+    def _last_access(self, index: dict, key: str) -> float:
+        try:
+            return os.path.getmtime(self._entry_path(key))
+        except OSError:
+            return index[key]["created"]
+
+    def _remove(self, index: dict, key: str) -> None:
+        index.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def invalidate(self, dataset_address: str = None, file_name: str = None) -> int:
+        with _INDEX_LOCK:
+            index = self._read_index()
+            keys = [
+                key
+                for key, entry in index.items()
+                if dataset_address in (None, entry["dataset_address"])
+                and file_name in (None, entry["file_name"])
+            ]
+            for key in keys:
+                self._remove(index, key)
+            self._write_index(index)
+        logger.info(f"Invalidated {len(keys)} cache entries")
+        return len(keys)
+
+    def size(self) -> int:
+        return sum(entry["size"] for entry in self._read_index().values())
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# 1970-01-01 foi uma quinta-feira (dayofweek == 3)
+_EPOCH_DAYOFWEEK = 3
+_NS_PER_HOUR = 3_600_000_000_000
+
+# Turno por hora do dia: 06-12 (1), 12-18 (2), 18-24 (3), 00-06 (4)
+SHIFT_BY_HOUR = np.array([4] * 6 + [1] * 6 + [2] * 6 + [3] * 6, dtype=np.int64)
+
+# Estação por mês (índice 0 não é usado): Primavera (1), Verão (2), Outono (3), Inverno (4)
+SEASON_BY_MONTH = np.array([0, 4, 4, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4], dtype=np.int64)
+
+CALENDAR_COLUMNS = ["turno", "dia_semana", "utilidade", "estacao"]
+
+# Mesmos dtypes das funções add_* originais (dayofweek do pandas é int32)
+CALENDAR_DTYPES = {
+    "turno": np.int64,
+    "dia_semana": np.int32,
+    "utilidade": np.int64,
+    "estacao": np.int64,
+}
+
+
+class HolidayCalendar:
+    def __init__(self, name: str, dates=()):
+        self.name = name
+        self._days = np.unique(
+            pd.to_datetime(list(dates)).values.astype("datetime64[D]").astype(np.int64)
+        )
+
+    @property
+    def days(self) -> np.ndarray:
+        return self._days
+
+    def __contains__(self, date) -> bool:
+        day = np.datetime64(pd.Timestamp(date).date(), "D").astype(np.int64)
+        return bool(np.isin(day, self._days))
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def __or__(self, other: "HolidayCalendar") -> "HolidayCalendar":
+        merged = HolidayCalendar(f"{self.name}+{other.name}")
+        merged._days = np.union1d(self._days, other._days)
+        return merged
+
+    def __repr__(self) -> str:
+        return f"HolidayCalendar({self.name!r}, {len(self)} days)"
+
+
+_calendars: dict[str, HolidayCalendar] = {}
+
+
+def register_holiday_calendar(calendar: HolidayCalendar) -> HolidayCalendar:
+    _calendars[calendar.name] = calendar
+    logger.info(f"Registered holiday calendar {calendar!r}")
+    return calendar
+
+
+def get_holiday_calendar(name: str) -> HolidayCalendar:
+    assert name in _calendars, (
+        f"Unknown holiday calendar. Registered calendars: {', '.join(_calendars)}"
+    )
+    return _calendars[name]
+
+
+# Feriados de Tetouan (Marrocos) cobertos pelo dataset original
+register_holiday_calendar(
+    HolidayCalendar(
+        "tetouan-2017",
+        [
+            "2017-01-11",
+            "2017-05-01",
+            "2017-06-26",
+            "2017-08-14",
+            "2017-08-21",
+            "2017-09-01",
+            "2017-09-21",
+            "2017-11-06",
+            "2017-12-01",
+        ],
+    )
+)
+
+DEFAULT_HOLIDAY_CALENDAR = "tetouan-2017"
+
+
+def _resolve_calendar(calendar) -> HolidayCalendar:
+    if calendar is None:
+        return get_holiday_calendar(DEFAULT_HOLIDAY_CALENDAR)
+    if isinstance(calendar, str):
+        return get_holiday_calendar(calendar)
+    if isinstance(calendar, HolidayCalendar):
+        return calendar
+    return HolidayCalendar("custom", calendar)
+
+
+def _wall_clock_ns(datetimes: pd.Series) -> np.ndarray:
+    # Para colunas com fuso horário, hora/dia devem ser os do relógio local
+    if isinstance(datetimes.dtype, pd.DatetimeTZDtype):
+        datetimes = datetimes.dt.tz_localize(None)
+    return datetimes.values.astype("datetime64[ns]").astype(np.int64)
+
+
+def build_day_tables(first_day: int, last_day: int, calendar=None) -> dict:
+    days = np.arange(first_day, last_day + 1, dtype=np.int64)
+    weekday = ((days + _EPOCH_DAYOFWEEK) % 7 + 1).astype(CALENDAR_DTYPES["dia_semana"])
+
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    month = months % 12 + 1
+
+    utility = np.where(weekday >= 6, 2, 1)
+    utility[np.isin(days, _resolve_calendar(calendar).days)] = 3
+
+    return {
+        "dia_semana": weekday,
+        "utilidade": utility,
+        "estacao": SEASON_BY_MONTH[month],
+    }
+
+
+def compute_calendar_features(
+    datetimes: pd.Series, columns: list = CALENDAR_COLUMNS, calendar=None
+) -> dict:
+    ns = _wall_clock_ns(datetimes)
+    features = {}
+    # NaT vira -1 em todas as colunas de calendário
+    valid = ns != np.iinfo(np.int64).min
+    if not valid.any():
+        return {
+            col: np.full(len(ns), -1, dtype=CALENDAR_DTYPES[col]) for col in columns
+        }
+    if not valid.all():
+        ns = np.where(valid, ns, ns[valid][0])
+
+    if "turno" in columns:
+        features["turno"] = SHIFT_BY_HOUR[(ns // _NS_PER_HOUR) % 24]
+
+    day_columns = [col for col in columns if col != "turno"]
+    if day_columns:
+        day = np.floor_divide(ns, 24 * _NS_PER_HOUR)
+        first_day = int(day.min())
+        tables = build_day_tables(first_day, int(day.max()), calendar)
+        offset = day - first_day
+        for col in day_columns:
+            features[col] = tables[col][offset]
+
+    if not valid.all():
+        for col in features:
+            features[col] = np.where(valid, features[col], -1).astype(
+                CALENDAR_DTYPES[col]
+            )
+
+    return {col: features[col] for col in columns}
+
+
+@profiled
+def add_calendar_features(
+    df: pd.DataFrame,
+    datetime_col: str = "Datetime",
+    columns: list = CALENDAR_COLUMNS,
+    calendar=None,
+) -> pd.DataFrame:
+    features = compute_calendar_features(df[datetime_col], columns, calendar)
+    for col, values in features.items():
+        df[col] = values
+    return df
@@ -1,12 +1,155 @@
+import io
+import json
+import numpy as np
 import pandas as pd
 
+from cache import row_fingerprints
+from sketches import QuantileSketch
+from anomalies import detect_anomalies, summarize_anomalies
+from profiling import profiled
 
-def check_dataset(df: pd.DataFrame, sample_size: int = 3) -> dict:
-    report = {}
+QUARTILES = np.array([0.25, 0.5, 0.75])
 
-    report["shape"] = df.shape
-    report["dtypes"] = df.dtypes.astype(str).to_dict()
 
+def _lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    # Mesma interpolação linear usada por np.quantile/Series.quantile
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def _histogram(values: np.ndarray, low, high, bins: int):
+    # Equivalente a np.histogram(values, bins) para valores finitos
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    edges = np.linspace(low, high, bins + 1)
+    norm = bins / (high - low)
+    indices = ((values - low) * norm).astype(np.intp)
+    indices[indices == bins] -= 1
+    indices[values < edges[indices]] -= 1
+    increment = (values >= edges[indices + 1]) & (indices != bins - 1)
+    indices[increment] += 1
+    return np.bincount(indices, minlength=bins), edges
+
+
+@profiled
+def compute_numeric_statistics(df: pd.DataFrame, bins: int = 30) -> dict:
+    # select_dtypes copia o frame; sobre zero linhas só resolve as colunas
+    numeric_cols = df.iloc[:0].select_dtypes(include=["number"]).columns
+    if len(numeric_cols) == 0:
+        return {}
+
+    # Uma linha contígua por coluna para que todas as reduções sejam ao longo
+    # do eixo contíguo. Um frame só de floats é um único bloco (colunas x
+    # linhas) no pandas: a transposta é uma view, sem cópia
+    frame = df if len(numeric_cols) == df.shape[1] else df[numeric_cols]
+    values = np.ascontiguousarray(frame.to_numpy(dtype=np.float64, copy=False).T)
+    n_columns, n_rows = values.shape
+    count = n_rows - np.count_nonzero(np.isnan(values), axis=1)
+    # Só as colunas com NaN pagam as versões mascaradas das reduções
+    with_missing = np.flatnonzero(count < n_rows)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = values.sum(axis=1)
+        if len(with_missing):
+            total[with_missing] = np.nansum(values[with_missing], axis=1)
+        mean = total / count
+        deviations = values - mean[:, None]
+        squares = np.einsum("ij,ij->i", deviations, deviations)
+        if len(with_missing):
+            missing_deviations = deviations[with_missing]
+            squares[with_missing] = np.nansum(missing_deviations**2, axis=1)
+        del deviations
+        # Como no pandas: menos de dois valores não definem desvio
+        std = np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+    # NaN vai para o fim; as posições dos quartis dependem da contagem válida
+    # de cada coluna, então as colunas são particionadas em grupos de mesma
+    # contagem. Mínimo e máximo saem de reduções, fora do partition
+    quartiles = np.full((n_columns, 3), np.nan)
+    minimum = np.full(n_columns, np.nan)
+    maximum = np.full(n_columns, np.nan)
+    for k in np.unique(count[count > 0]):
+        rows = np.flatnonzero(count == k)
+        block = values[rows]
+        # fmin/fmax ignoram NaN
+        minimum[rows] = np.fmin.reduce(block, axis=1)
+        maximum[rows] = np.fmax.reduce(block, axis=1)
+        if k < n_rows:
+            block[np.isnan(block)] = np.inf
+        positions = QUARTILES * (k - 1)
+        lower = np.floor(positions).astype(np.intp)
+        kth = np.unique(lower)
+        block.partition(kth, axis=1)
+        # O vizinho de posto lower + 1 é o menor valor entre lower e a próxima
+        # posição particionada (ou o fim da linha: o infinito fica acima de
+        # tudo). Um min por trecho custa menos que mais três kth no partition
+        upper = np.empty((len(rows), len(lower)))
+        for j, position in enumerate(lower):
+            if position + 1 >= k:
+                upper[:, j] = block[:, position]
+                continue
+            following = kth[kth > position]
+            end = following[0] + 1 if len(following) else block.shape[1]
+            upper[:, j] = block[:, position + 1 : end].min(axis=1)
+        quartiles[rows] = _lerp(block[:, lower], upper, positions - lower)
+
+    q1, median, q3 = quartiles.T
+    iqr = q3 - q1
+    lower_bound = q1 - 1.5 * iqr
+    upper_bound = q3 + 1.5 * iqr
+    outliers = np.count_nonzero(values < lower_bound[:, None], axis=1)
+    outliers += np.count_nonzero(values > upper_bound[:, None], axis=1)
+
+    statistics = {}
+    for i, col in enumerate(numeric_cols):
+        if count[i] > 0:
+            column = (
+                values[i] if count[i] == n_rows else values[i][~np.isnan(values[i])]
+            )
+            counts, edges = _histogram(column, minimum[i], maximum[i], bins)
+        else:
+            counts, edges = np.zeros(bins, dtype=np.intp), np.full(bins + 1, np.nan)
+        statistics[col] = {
+            "count": int(count[i]),
+            "missing": int(n_rows - count[i]),
+            "mean": float(mean[i]),
+            "std": float(std[i]),
+            "min": float(minimum[i]),
+            "q1": float(q1[i]),
+            "median": float(median[i]),
+            "q3": float(q3[i]),
+            "max": float(maximum[i]),
+            "limits": [float(lower_bound[i]), float(upper_bound[i])],
+            "outliers": int(outliers[i]),
+            "histogram": {"counts": counts, "edges": edges},
+        }
+    return statistics
+
+
+def _describe(df: pd.DataFrame, statistics: dict) -> dict:
+    # Mesmo layout de df.describe(include="all"), reaproveitando as estatísticas
+    # numéricas já calculadas
+    other_cols = [col for col in df.columns if col not in statistics]
+    describe = df[other_cols].describe(include="all").to_dict() if other_cols else {}
+    for col, stats in statistics.items():
+        describe[col] = {
+            "count": float(stats["count"]),
+            "mean": stats["mean"],
+            "std": stats["std"],
+            "min": stats["min"],
+            "25%": stats["q1"],
+            "50%": stats["median"],
+            "75%": stats["q3"],
+            "max": stats["max"],
+        }
+    keys = {key for stats in describe.values() for key in stats}
+    for stats in describe.values():
+        for key in keys - stats.keys():
+            stats[key] = np.nan
+    return {col: describe[col] for col in df.columns}
+
+
+def _normalize_sample_size(sample_size) -> list:
     if isinstance(sample_size, int):
         sample_size = [sample_size] * 3
 
@@ -14,6 +157,31 @@ def check_dataset(df: pd.DataFrame, sample_size: int = 3) -> dict:
         raise ValueError(
             "sample_size must be either an integer or a list of 3 integers"
         )
+    return list(sample_size)
+
+
+def _summarize_outliers(statistics: dict, n_rows: int):
+    outliers = {}
+    for col, stats in statistics.items():
+        outliers_count = stats["outliers"]
+        if outliers_count > 0:
+            outliers[col] = {
+                "outliers": outliers_count,
+                "percent": f"{(outliers_count / n_rows) * 100:.2f}%",
+                "limits": stats["limits"],
+            }
+
+    return outliers if outliers else "Nenhum outlier significativo detectado"
+
+
+@profiled
+def check_metadata(df: pd.DataFrame, sample_size: int = 3) -> dict:
+    report = {}
+
+    report["shape"] = df.shape
+    report["dtypes"] = df.dtypes.astype(str).to_dict()
+
+    sample_size = _normalize_sample_size(sample_size)
 
     report["samples"] = {
         "head": df.head(sample_size[0]).to_dict(orient="records"),
@@ -22,8 +190,25 @@ def check_dataset(df: pd.DataFrame, sample_size: int = 3) -> dict:
         ].to_dict(orient="records"),
         "tail": df.tail(sample_size[2]).to_dict(orient="records"),
     }
+    return report
 
-    report["describe"] = df.describe(include="all").to_dict()
+
+@profiled
+def check_quality(
+    df: pd.DataFrame,
+    statistics: dict = None,
+    bins: int = 30,
+    datetime_col: str = None,
+    fingerprints: np.ndarray = None,
+) -> dict:
+    # Ausentes, duplicatas e outliers; reaproveita statistics quando já
+    # calculadas por compute_numeric_statistics e os hashes de linha
+    # (cache.row_fingerprints) quando já calculados. Com datetime_col, as
+    # anomalias locais/sazonais (anomalies.py) entram no relatório; os
+    # limites IQR globais continuam em "outliers"
+    if statistics is None:
+        statistics = compute_numeric_statistics(df, bins)
+    report = {}
 
     missing_values = df.isna().sum()
     report["missing_values"] = {
@@ -31,36 +216,42 @@ def check_dataset(df: pd.DataFrame, sample_size: int = 3) -> dict:
         "by_column": missing_values[missing_values > 0].to_dict(),
     }
 
+    # Duplicatas numa passada sobre os hashes: repetida é toda linha que não
+    # é a primeira do seu hash; exemplos vêm de hashes com mais de uma linha.
+    # factorize agrupa por tabela hash, sem ordenar como np.unique
+    if fingerprints is None:
+        fingerprints = row_fingerprints(df)
+    inverse, uniques = pd.factorize(fingerprints)
+    counts = np.bincount(inverse, minlength=len(uniques))
+    duplicates_total = len(df) - len(uniques)
     report["duplicates"] = {
-        "total": df.duplicated().sum(),
-        "examples": df[df.duplicated(keep=False)]
-        .sample(min(2, df.duplicated().sum()))
+        "total": duplicates_total,
+        "examples": df[counts[inverse] > 1]
+        .sample(min(2, duplicates_total))
         .to_dict(orient="records")
-        if df.duplicated().sum() > 0
+        if duplicates_total > 0
         else None,
     }
 
-    numeric_cols = df.select_dtypes(include=["number"]).columns
-    outliers = {}
+    report["outliers"] = _summarize_outliers(statistics, len(df))
 
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        outliers_count = ((df[col] < lower_bound) | (df[col] > upper_bound)).sum()
+    if datetime_col is not None and datetime_col in df.columns:
+        ranges = detect_anomalies(df, index=datetime_col)["ranges"]
+        report["anomalies"] = summarize_anomalies(ranges, len(df))
+    return report
 
-        if outliers_count > 0:
-            outliers[col] = {
-                "outliers": outliers_count,
-                "percent": f"{(outliers_count / len(df)) * 100:.2f}%",
-                "limits": [float(lower_bound), float(upper_bound)],
-            }
 
-    report["outliers"] = (
-        outliers if outliers else "Nenhum outlier significativo detectado"
-    )
+@profiled
+def check_dataset(
+    df: pd.DataFrame, sample_size: int = 3, bins: int = 30, datetime_col: str = None
+) -> dict:
+    report = check_metadata(df, sample_size)
+
+    statistics = compute_numeric_statistics(df, bins)
+    report["statistics"] = statistics
+    report["describe"] = _describe(df, statistics)
+
+    report.update(check_quality(df, statistics, bins, datetime_col))
 
     return report
 
@@ -99,11 +290,272 @@ def check_dataset(df: pd.DataFrame, sample_size: int = 3) -> dict:
                 'percent': '1.50%',
                 'limits': [12000.0, 98000.0]
             }
+        },
+        'anomalies': {  # só com datetime_col
+            'income': {
+                'ranges': 3,
+                'rows': 4,
+                'percent': '0.40%',
+                'max_score': 12.9
+            }
         }
     }   
     """
 
 
+class IncrementalReport:
+    # Relatório do check_dataset mantido incrementalmente a cada lote de linhas
+    # novas: momentos via Welford/Chan, quartis e limites de outliers via
+    # QuantileSketch, ausentes como totais acumulados e duplicatas via conjunto
+    # de hashes de linha. Colunas datetime são acompanhadas em nanossegundos.
+    def __init__(self, sample_size=3, bins: int = 30, sketch_size: int = 1024):
+        self.sample_size = _normalize_sample_size(sample_size)
+        self.bins = bins
+        self.sketch_size = sketch_size
+        self.rows = 0
+        self.dtypes = {}
+        self.missing = {}
+        self.moments = {}
+        self.sketches = {}
+        self.duplicates = 0
+        self.duplicate_examples = pd.DataFrame()
+        self.head = pd.DataFrame()
+        self.body = pd.DataFrame()
+        self.tail = pd.DataFrame()
+        # Hashes vistos em execuções ordenadas (estilo LSM) para que cada lote
+        # custe O(lote * log(total)) em vez de O(total)
+        self._hash_runs = []
+
+    def _tracked_columns(self, batch: pd.DataFrame) -> list:
+        return list(
+            batch.select_dtypes(include=["number", "datetime", "datetimetz"]).columns
+        )
+
+    def _update_moments(self, col: str, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        n_b = len(values)
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        state = self.moments.setdefault(
+            col, {"n": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf}
+        )
+        n = state["n"] + n_b
+        delta = mean_b - state["mean"]
+        state["mean"] += delta * n_b / n
+        state["m2"] += m2_b + delta**2 * state["n"] * n_b / n
+        state["n"] = n
+        state["min"] = min(state["min"], float(values.min()))
+        state["max"] = max(state["max"], float(values.max()))
+
+    def _is_seen(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self._hash_runs:
+            positions = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            seen |= run[positions] == hashes
+        return seen
+
+    def _add_hashes(self, hashes: np.ndarray) -> None:
+        self._hash_runs.append(np.unique(hashes))
+        while len(self._hash_runs) > 1 and len(self._hash_runs[-2]) <= 2 * len(
+            self._hash_runs[-1]
+        ):
+            last = self._hash_runs.pop()
+            self._hash_runs[-1] = np.union1d(self._hash_runs[-1], last)
+
+    def update(self, batch: pd.DataFrame) -> "IncrementalReport":
+        if batch.empty:
+            return self
+
+        self.rows += len(batch)
+        self.dtypes = batch.dtypes.astype(str).to_dict()
+
+        for col, count in batch.isna().sum().items():
+            self.missing[col] = self.missing.get(col, 0) + int(count)
+
+        for col in self._tracked_columns(batch):
+            series = batch[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                values = series.astype("int64").to_numpy(dtype=np.float64)
+                values[series.isna().to_numpy()] = np.nan
+            else:
+                values = series.to_numpy(dtype=np.float64)
+            self._update_moments(col, values)
+            self.sketches.setdefault(col, QuantileSketch(self.sketch_size)).update(
+                values
+            )
+
+        hashes = row_fingerprints(batch)
+        _, first = np.unique(hashes, return_index=True)
+        is_duplicate = np.ones(len(hashes), dtype=bool)
+        is_duplicate[first] = False
+        is_duplicate |= self._is_seen(hashes)
+        self.duplicates += int(is_duplicate.sum())
+        if len(self.duplicate_examples) < 2 and is_duplicate.any():
+            self.duplicate_examples = pd.concat(
+                [self.duplicate_examples, batch[is_duplicate]]
+            ).head(2)
+        self._add_hashes(hashes)
+
+        head, body, tail = self.sample_size
+        if len(self.head) < head:
+            self.head = pd.concat([self.head, batch.head(head)]).head(head)
+        # Sem histórico completo, o "meio" é o centro do lote mais recente
+        middle = len(batch) // 2
+        self.body = batch.iloc[middle - body // 2 : middle + body // 2]
+        self.tail = pd.concat([self.tail, batch.tail(tail)]).tail(tail)
+        return self
+
+    def _statistics(self) -> dict:
+        statistics = {}
+        for col, state in self.moments.items():
+            if not pd.api.types.is_numeric_dtype(self.dtypes.get(col)):
+                continue
+            sketch = self.sketches[col]
+            q1, median, q3 = sketch.quantile(QUARTILES)
+            iqr = q3 - q1
+            limits = [float(q1 - 1.5 * iqr), float(q3 + 1.5 * iqr)]
+            outliers = sketch.rank(limits[0])[0] + (
+                sketch.n - sketch.rank(limits[1], inclusive=True)[0]
+            )
+            low, high = state["min"], state["max"]
+            if low == high:
+                low, high = low - 0.5, high + 0.5
+            edges = np.linspace(low, high, self.bins + 1)
+            cumulative = sketch.rank(edges, inclusive=True)
+            counts = np.diff(cumulative)
+            counts[0] += cumulative[0]
+            statistics[col] = {
+                "count": int(state["n"]),
+                "missing": int(self.missing.get(col, 0)),
+                "mean": float(state["mean"]),
+                "std": float(np.sqrt(state["m2"] / (state["n"] - 1)))
+                if state["n"] > 1
+                else np.nan,
+                "min": float(state["min"]),
+                "q1": float(q1),
+                "median": float(median),
+                "q3": float(q3),
+                "max": float(state["max"]),
+                "limits": limits,
+                "outliers": int(outliers),
+                "histogram": {"counts": counts, "edges": edges},
+            }
+        return statistics
+
+    def _describe(self, statistics: dict) -> dict:
+        describe = {}
+        for col in self.dtypes:
+            if col in statistics:
+                stats = statistics[col]
+                describe[col] = {
+                    "count": float(stats["count"]),
+                    "mean": stats["mean"],
+                    "std": stats["std"],
+                    "min": stats["min"],
+                    "25%": stats["q1"],
+                    "50%": stats["median"],
+                    "75%": stats["q3"],
+                    "max": stats["max"],
+                }
+            elif col in self.moments:
+                state = self.moments[col]
+                q1, median, q3 = self.sketches[col].quantile(QUARTILES)
+                describe[col] = {
+                    "count": float(state["n"]),
+                    "mean": pd.Timestamp(int(state["mean"])),
+                    "min": pd.Timestamp(int(state["min"])),
+                    "25%": pd.Timestamp(int(q1)),
+                    "50%": pd.Timestamp(int(median)),
+                    "75%": pd.Timestamp(int(q3)),
+                    "max": pd.Timestamp(int(state["max"])),
+                }
+            else:
+                # unique/top/freq exigiriam guardar todos os valores distintos
+                describe[col] = {"count": float(self.rows - self.missing.get(col, 0))}
+        keys = {key for stats in describe.values() for key in stats}
+        for stats in describe.values():
+            for key in keys - stats.keys():
+                stats[key] = np.nan
+        return describe
+
+    def to_report(self) -> dict:
+        report = {}
+        report["shape"] = (self.rows, len(self.dtypes))
+        report["dtypes"] = dict(self.dtypes)
+        report["samples"] = {
+            "head": self.head.to_dict(orient="records"),
+            "body": self.body.to_dict(orient="records"),
+            "tail": self.tail.to_dict(orient="records"),
+        }
+
+        statistics = self._statistics()
+        report["statistics"] = statistics
+        report["describe"] = self._describe(statistics)
+
+        missing_values = pd.Series(self.missing, dtype="int64")
+        report["missing_values"] = {
+            "total": missing_values.sum(),
+            "by_column": missing_values[missing_values > 0].to_dict(),
+        }
+
+        report["duplicates"] = {
+            "total": self.duplicates,
+            "examples": self.duplicate_examples.to_dict(orient="records")
+            if self.duplicates > 0
+            else None,
+        }
+
+        report["outliers"] = _summarize_outliers(statistics, self.rows)
+        return report
+
+    def save(self, path: str) -> None:
+        frames = {
+            name: getattr(self, name).to_json(orient="table", date_unit="ns")
+            for name in ["head", "body", "tail", "duplicate_examples"]
+        }
+        meta = {
+            "sample_size": self.sample_size,
+            "bins": self.bins,
+            "sketch_size": self.sketch_size,
+            "rows": self.rows,
+            "dtypes": self.dtypes,
+            "missing": self.missing,
+            "moments": self.moments,
+            "sketches": {col: s.to_state() for col, s in self.sketches.items()},
+            "duplicates": self.duplicates,
+            "frames": frames,
+        }
+        hashes = self._hash_runs[0] if len(self._hash_runs) == 1 else None
+        if hashes is None:
+            hashes = np.unique(
+                np.concatenate(self._hash_runs or [np.empty(0, np.uint64)])
+            )
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), hashes=hashes)
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalReport":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            hashes = data["hashes"]
+        report = cls(meta["sample_size"], meta["bins"], meta["sketch_size"])
+        report.rows = meta["rows"]
+        report.dtypes = meta["dtypes"]
+        report.missing = meta["missing"]
+        report.moments = meta["moments"]
+        report.sketches = {
+            col: QuantileSketch.from_state(state)
+            for col, state in meta["sketches"].items()
+        }
+        report.duplicates = meta["duplicates"]
+        for name, frame in meta["frames"].items():
+            setattr(report, name, pd.read_json(io.StringIO(frame), orient="table"))
+        report._hash_runs = [hashes] if len(hashes) else []
+        return report
+
+
 def print_report(report: dict) -> None:
     from pprint import pprint
 
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Formato da coluna Datetime do powerconsumption.csv (ex.: "1/1/2017 0:10")
+DATETIME_FORMAT = "%m/%d/%Y %H:%M"
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _fits_float32(values: np.ndarray, rtol: float) -> bool:
+    downcast = values.astype(np.float32)
+    with np.errstate(over="ignore", invalid="ignore"):
+        return bool(np.allclose(downcast, values, rtol=rtol, atol=0.0, equal_nan=True))
+
+
+def compact_dataframe(
+    df: pd.DataFrame,
+    datetime_col: str = "Datetime",
+    date_format: str = None,
+    rtol: float = 1e-6,
+    categorical: list = None,
+) -> pd.DataFrame:
+    before = memory_usage(df)
+    columns = {}
+
+    if datetime_col in df.columns and not pd.api.types.is_datetime64_any_dtype(
+        df[datetime_col]
+    ):
+        columns[datetime_col] = pd.to_datetime(df[datetime_col], format=date_format)
+
+    for col in df.select_dtypes(include=["float"]).columns:
+        values = df[col].to_numpy()
+        if values.dtype != np.float32 and _fits_float32(values, rtol):
+            columns[col] = values.astype(np.float32)
+
+    for col in df.select_dtypes(include=["integer"]).columns:
+        columns[col] = pd.to_numeric(df[col], downcast="integer")
+
+    for col in categorical or []:
+        columns[col] = df[col].astype("category")
+
+    df = df.assign(**columns)
+    after = memory_usage(df)
+    logger.info(
+        f"Memory usage: {before / 1024**2:.2f} MB -> {after / 1024**2:.2f} MB "
+        f"({before / max(after, 1):.1f}x smaller)"
+    )
+    return df
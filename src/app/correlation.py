@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def _fft_length(n: int) -> int:
+    # Potência de 2 >= 2n - 1 evita a correlação circular
+    return 1 << int(2 * n - 1).bit_length()
+
+
+@profiled
+def lagged_cross_correlation(
+    df: pd.DataFrame, max_lag: int, columns: list = None
+) -> pd.DataFrame:
+    # Correlação corr(x_i[t], x_j[t + lag]) para todos os pares de colunas e
+    # lags em [-max_lag, max_lag], via FFT em O(c² n log n). As séries são
+    # padronizadas com média/desvio globais, NaN viram 0 e cada lag é dividido
+    # pelo número de pares válidos sobrepostos; no lag 0 e sem NaN o
+    # resultado é exatamente o Pearson de df.corr().
+    columns = columns or list(df.select_dtypes(include=["number"]).columns)
+    values = df[columns].to_numpy(dtype=np.float64).T
+    n = values.shape[1]
+    max_lag = min(max_lag, n - 1)
+    valid = ~np.isnan(values)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nanmean(values, axis=1, keepdims=True)
+        std = np.nanstd(values, axis=1, keepdims=True)
+        standardized = np.where(valid & (std > 0), (values - mean) / std, 0.0)
+
+    length = _fft_length(n)
+    spectra = np.fft.rfft(standardized, length, axis=1)
+    has_missing = not valid.all()
+    if has_missing:
+        mask_spectra = np.fft.rfft(valid.astype(np.float64), length, axis=1)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    # irfft de conj(F_i) * F_j dá sum_t x_i[t] x_j[t + k] na posição k (mod
+    # length); lags negativos ficam no fim do vetor
+    positions = lags % length
+    # corr(x_j[t], x_i[t + k]) = corr(x_i[t], x_j[t - k]): só os pares j >= i
+    # são calculados e o triângulo inferior é o superior com lags invertidos
+    result = np.empty((len(lags), len(columns), len(columns)))
+    for i in range(len(columns)):
+        products = np.fft.irfft(spectra[i].conj() * spectra[i:], length, axis=1)
+        sums = products[:, positions].T
+        if has_missing:
+            overlaps = np.fft.irfft(
+                mask_spectra[i].conj() * mask_spectra[i:], length, axis=1
+            )
+            counts = np.rint(overlaps[:, positions].T)
+        else:
+            counts = (n - np.abs(lags))[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pairs = np.where(counts > 0, sums / counts, np.nan)
+        result[:, i, i:] = pairs
+        result[::-1, i:, i] = pairs
+
+    constant = (std[:, 0] == 0) | ~valid.any(axis=1)
+    result[:, constant, :] = np.nan
+    result[:, :, constant] = np.nan
+
+    index = pd.MultiIndex.from_product([lags, columns], names=["lag", "column"])
+    return pd.DataFrame(result.reshape(-1, len(columns)), index=index, columns=columns)
+
+
+def correlation_at_lag(correlations: pd.DataFrame, lag: int) -> pd.DataFrame:
+    # Matriz (colunas x colunas) de um lag; linha i, coluna j = corr(x_i[t], x_j[t + lag])
+    return correlations.xs(lag, level="lag")
+
+
+def correlation_by_lag(
+    correlations: pd.DataFrame, column: str, other: str
+) -> pd.Series:
+    return correlations.xs(column, level="column")[other]
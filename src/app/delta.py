@@ -0,0 +1,319 @@
+import os
+import json
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from cache import row_fingerprints
+from calendar_features import add_calendar_features, CALENDAR_COLUMNS
+from processor import (
+    AGG_SCHEMA,
+    NAMING_SCHEMA,
+    aggregate_data_by_time_frequency,
+    process_dataframe,
+    time_bucket_bounds,
+)
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+PROCESSED_FILE = "processed.parquet"
+ROWS_FILE = "rows.npz"
+BUCKETS_FILE = "buckets.npz"
+META_FILE = "meta.json"
+
+# Valor de um bucket sem linhas no resample; as demais agregações dão NaN
+EMPTY_BUCKET_VALUES = {"sum": 0.0, "count": 0, "size": 0}
+
+
+def bucket_digests(
+    hashes: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # Digest de cada bucket = soma (mod 2^64) dos hashes das suas linhas,
+    # independente da ordem; buckets vazios ficam com digest e contagem 0
+    counts = ends - starts
+    digests = np.zeros(len(starts), dtype=np.uint64)
+    filled = counts > 0
+    if filled.any():
+        digests[filled] = np.add.reduceat(hashes, starts[filled])
+    return digests, counts
+
+
+def _contains(sorted_values: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # Pertinência por busca binária num array ordenado (np.isin reordena tudo)
+    if not len(sorted_values):
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_values, values).clip(max=len(sorted_values) - 1)
+    return sorted_values[positions] == values
+
+
+def _bucket_rows(starts: np.ndarray, ends: np.ndarray, buckets: np.ndarray):
+    # Índices das linhas dos buckets escolhidos, em ordem
+    lengths = ends[buckets] - starts[buckets]
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(lengths.sum()) + np.repeat(starts[buckets] - offsets, lengths)
+
+
+def diff_rows(
+    old_ns: np.ndarray,
+    old_hashes: np.ndarray,
+    new_ns: np.ndarray,
+    new_hashes: np.ndarray,
+) -> dict:
+    # Linhas identificadas pelo instante: inseridas, removidas e alteradas
+    # (mesmo instante, hash diferente); os dois lados vêm ordenados
+    inserted = ~_contains(old_ns, new_ns)
+    deleted = ~_contains(new_ns, old_ns)
+    positions = np.searchsorted(old_ns, new_ns[~inserted])
+    updated = old_hashes[positions] != new_hashes[~inserted]
+    return {
+        "inserted": int(inserted.sum()),
+        "updated": int(updated.sum()),
+        "deleted": int(deleted.sum()),
+    }
+
+
+class DeltaProcessor:
+    # Mantém em state_dir a saída de process_dataframe para uma frequência,
+    # junto com o hash de cada linha bruta e o digest de cada bucket. Numa
+    # nova versão do dataset só os buckets cujo digest mudou (linhas
+    # inseridas, alteradas ou removidas) são reagregados e recebem as colunas
+    # de calendário; o resto da saída gravada é reaproveitado
+    def __init__(
+        self,
+        state_dir: str,
+        freq: str,
+        index: str = "Datetime",
+        calendar=None,
+        agg_schema: dict = AGG_SCHEMA,
+        naming_schema: list = NAMING_SCHEMA,
+    ):
+        self.state_dir = state_dir
+        self.freq = freq
+        self.offset = pd.tseries.frequencies.to_offset(freq)
+        self.index = index
+        self.calendar = calendar
+        self.agg_schema = agg_schema
+        self.naming_schema = naming_schema
+        self.columns = [index, *agg_schema]
+        self.last_delta = None
+
+    def _meta(self, origin: pd.Timestamp, rows: int) -> dict:
+        return {
+            "freq": self.freq,
+            "index": self.index,
+            "columns": self.columns,
+            "naming_schema": self.naming_schema,
+            "origin": origin.isoformat(),
+            "rows": rows,
+        }
+
+    def _load_state(self) -> dict | None:
+        meta_path = os.path.join(self.state_dir, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        rows = np.load(os.path.join(self.state_dir, ROWS_FILE))
+        buckets = np.load(os.path.join(self.state_dir, BUCKETS_FILE))
+        return {
+            "meta": meta,
+            "ns": rows["ns"],
+            "hashes": rows["hashes"],
+            "labels": buckets["labels"],
+            "digests": buckets["digests"],
+            "counts": buckets["counts"],
+        }
+
+    def _save_state(
+        self,
+        processed: pd.DataFrame,
+        ns: np.ndarray,
+        hashes: np.ndarray,
+        labels: pd.DatetimeIndex,
+        digests: np.ndarray,
+        counts: np.ndarray,
+        origin: pd.Timestamp,
+    ) -> None:
+        # Diretório temporário trocado no fim, como no store de séries
+        tmp_dir = f"{self.state_dir.rstrip(os.sep)}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        processed.to_parquet(os.path.join(tmp_dir, PROCESSED_FILE), index=False)
+        np.savez(os.path.join(tmp_dir, ROWS_FILE), ns=ns, hashes=hashes)
+        np.savez(
+            os.path.join(tmp_dir, BUCKETS_FILE),
+            labels=labels.asi8,
+            digests=digests,
+            counts=counts,
+        )
+        with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+            json.dump(self._meta(origin, len(ns)), f, indent=2)
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.state_dir)
+
+    def _empty_values(self) -> dict:
+        funcs = [
+            func
+            for value in self.agg_schema.values()
+            for func in ([value] if isinstance(value, str) else value)
+        ]
+        return {
+            col: EMPTY_BUCKET_VALUES.get(func, np.nan)
+            for col, func in zip(self.naming_schema, funcs)
+        }
+
+    def _aggregate_buckets(
+        self,
+        df: pd.DataFrame,
+        buckets: np.ndarray,
+        labels: pd.DatetimeIndex,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        origin: pd.Timestamp,
+    ) -> pd.DataFrame:
+        # Buckets consecutivos são agregados juntos numa fatia contígua das
+        # linhas brutas; buckets sem linhas recebem o valor do resample vazio
+        runs = np.split(buckets, np.flatnonzero(np.diff(buckets) > 1) + 1)
+        parts = []
+        for run in runs:
+            first, last = run[0], run[-1]
+            rows = df.iloc[starts[first] : ends[last]]
+            run_labels = pd.DatetimeIndex(labels[first : last + 1], name=self.index)
+            if len(rows):
+                agg = aggregate_data_by_time_frequency(
+                    rows,
+                    self.freq,
+                    self.index,
+                    self.agg_schema,
+                    self.naming_schema,
+                    origin=origin,
+                ).set_index(self.index)
+                agg = agg.reindex(run_labels)
+            else:
+                agg = pd.DataFrame(np.nan, index=run_labels, columns=self.naming_schema)
+            parts.append(agg.fillna(self._empty_values()).reset_index())
+        return pd.concat(parts, ignore_index=True)
+
+    def _full(self, df: pd.DataFrame) -> pd.DataFrame:
+        return process_dataframe(df, self.freq, self.index, self.calendar)
+
+    @profiled
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df[self.columns]
+        if not pd.api.types.is_datetime64_any_dtype(df[self.index]):
+            df = df.assign(**{self.index: pd.to_datetime(df[self.index])})
+        if not df[self.index].is_monotonic_increasing:
+            df = df.sort_values(self.index, kind="stable")
+        df = df.reset_index(drop=True)
+
+        datetimes = pd.DatetimeIndex(df[self.index])
+        ns = datetimes.asi8
+        origin = datetimes[0].normalize()
+        hashes = row_fingerprints(df)
+        labels, starts, ends = time_bucket_bounds(datetimes, self.offset, origin)
+        digests, counts = bucket_digests(hashes, starts, ends)
+
+        state = self._load_state()
+        reason = None
+        if state is None:
+            reason = "no previous state"
+        elif state["meta"] != self._meta(origin, state["meta"]["rows"]):
+            # Outra configuração ou outra origem dos buckets (primeiro dia
+            # mudou): os rótulos não são comparáveis
+            reason = "state built with another configuration or origin"
+        if reason is not None:
+            logger.info(f"Full processing for {self.freq} ({reason})")
+            processed = self._full(df)
+            self._save_state(processed, ns, hashes, labels, digests, counts, origin)
+            self.last_delta = {
+                "full": True,
+                "inserted": len(df),
+                "updated": 0,
+                "deleted": 0,
+                "buckets": len(labels),
+                "removed_buckets": 0,
+            }
+            return processed
+
+        old_labels = state["labels"]
+        positions = np.searchsorted(old_labels, labels.asi8).clip(
+            max=len(old_labels) - 1
+        )
+        matched = old_labels[positions] == labels.asi8
+        changed = (
+            ~matched
+            | (state["digests"][positions] != digests)
+            | (state["counts"][positions] != counts)
+        )
+        removed_buckets = np.flatnonzero(~_contains(labels.asi8, old_labels))
+        removed = old_labels[removed_buckets]
+        buckets = np.flatnonzero(changed)
+
+        # Só as linhas dos buckets alterados podem diferir entre as versões;
+        # os buckets antigos cobrem as linhas ordenadas em sequência
+        old_ends = np.cumsum(state["counts"])
+        old_starts = old_ends - state["counts"]
+        old_buckets = np.union1d(positions[buckets[matched[buckets]]], removed_buckets)
+        old_rows = _bucket_rows(old_starts, old_ends, old_buckets)
+        new_rows = _bucket_rows(starts, ends, buckets)
+        rows_delta = diff_rows(
+            state["ns"][old_rows],
+            state["hashes"][old_rows],
+            ns[new_rows],
+            hashes[new_rows],
+        )
+        self.last_delta = {
+            "full": False,
+            **rows_delta,
+            "buckets": len(buckets),
+            "removed_buckets": len(removed),
+        }
+        logger.info(
+            f"Delta for {self.freq}: {rows_delta['inserted']} inserted, "
+            f"{rows_delta['updated']} updated, {rows_delta['deleted']} deleted rows; "
+            f"{len(buckets)}/{len(labels)} buckets to recompute"
+        )
+
+        processed = pd.read_parquet(os.path.join(self.state_dir, PROCESSED_FILE))
+        if not len(buckets) and not len(removed):
+            return processed
+        stale = np.sort(np.concatenate([labels.asi8[buckets], removed]))
+        keep = ~_contains(stale, pd.DatetimeIndex(processed[self.index]).asi8)
+        parts = [processed[keep]]
+        if len(buckets):
+            fresh = self._aggregate_buckets(df, buckets, labels, starts, ends, origin)
+            parts.append(
+                add_calendar_features(
+                    fresh, self.index, CALENDAR_COLUMNS, self.calendar
+                )
+            )
+        processed = (
+            pd.concat(parts, ignore_index=True)
+            .sort_values(self.index, kind="stable")
+            .reset_index(drop=True)
+        )
+        self._save_state(processed, ns, hashes, labels, digests, counts, origin)
+        return processed
+
+
+@profiled
+def process_dataframe_delta(
+    df: pd.DataFrame,
+    freq: str,
+    state_dir: str,
+    index: str = "Datetime",
+    calendar=None,
+) -> pd.DataFrame:
+    try:
+        return DeltaProcessor(state_dir, freq, index, calendar).update(df)
+    except Exception as e:
+        logger.error(f"Error processing dataset delta: {str(e)}")
+        raise
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+# Pontos por série enviados ao navegador; ~2x a largura útil de um gráfico
+DEFAULT_MAX_POINTS = 2000
+
+
+def _as_array(values) -> np.ndarray:
+    # Datas com fuso viram datetime64[ns] em UTC (np.asarray daria objetos)
+    if getattr(getattr(values, "dtype", None), "tz", None) is not None:
+        return pd.DatetimeIndex(values).tz_convert("UTC").tz_localize(None).to_numpy()
+    return np.asarray(values)
+
+
+def _as_float(values) -> np.ndarray:
+    # Datetimes viram ns relativos ao primeiro ponto, evitando perda de
+    # precisão do float64 com epochs grandes
+    values = _as_array(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[ns]").view(np.int64)
+        return (values - values[0]).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def _buckets(values: np.ndarray, n_buckets: int) -> np.ndarray:
+    # Agrupa em baldes de mesma largura (o último é completado repetindo o
+    # valor final), para que argmin/argmax por balde sejam uma única operação 2D
+    width = -(-len(values) // n_buckets)
+    n_buckets = -(-len(values) // width)
+    padded = np.empty(n_buckets * width)
+    padded[: len(values)] = values
+    padded[len(values) :] = values[-1]
+    return padded.reshape(n_buckets, width)
+
+
+def minmax_downsample(x, y, n_out: int = DEFAULT_MAX_POINTS) -> np.ndarray:
+    # Mínimo e máximo de cada balde: preserva picos e vales, O(n). Espera y
+    # sem NaN (downsample() já os remove)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    values = _buckets(y, max(n_out // 2, 1))
+    offsets = np.arange(values.shape[0]) * values.shape[1]
+    indices = np.concatenate(
+        [values.argmin(axis=1) + offsets, values.argmax(axis=1) + offsets]
+    )
+    return np.unique(np.minimum(indices, n - 1))
+
+
+def lttb_downsample(
+    x, y, n_out: int = DEFAULT_MAX_POINTS, preselect: int = 4
+) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: em cada balde escolhe o ponto que forma o
+    # maior triângulo com o ponto escolhido no balde anterior e a média do
+    # balde seguinte. Só a escolha é sequencial; áreas e médias são vetorizadas
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+
+    # MinMaxLTTB: com séries muito maiores que n_out, uma pré-seleção min/max
+    # reduz os candidatos a preselect * n_out pontos sem perder os extremos
+    if preselect and n > preselect * n_out:
+        candidates = np.union1d(minmax_downsample(x, y, preselect * n_out), [0, n - 1])
+        return candidates[lttb_downsample(x[candidates], y[candidates], n_out, 0)]
+
+    # Balde 0 = primeiro ponto, último balde = último ponto
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    counts = np.diff(edges)
+    sums_x = np.add.reduceat(x[:-1], edges[:-1])
+    sums_y = np.add.reduceat(y[:-1], edges[:-1])
+    next_x = np.append(sums_x[1:] / counts[1:], x[-1])
+    next_y = np.append(sums_y[1:] / counts[1:], y[-1])
+
+    width = counts.max()
+    positions = edges[:-1, None] + np.arange(width)
+    valid = positions < edges[1:, None]
+    positions = np.minimum(positions, n - 1)
+    bucket_x = x[positions]
+    bucket_y = y[positions]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    ax, ay = x[0], y[0]
+    for i in range(n_out - 2):
+        areas = np.abs(
+            (ax - next_x[i]) * (bucket_y[i] - ay)
+            - (ax - bucket_x[i]) * (next_y[i] - ay)
+        )
+        areas[~valid[i]] = -1
+        best = int(areas.argmax())
+        selected[i + 1] = positions[i, best]
+        ax, ay = bucket_x[i, best], bucket_y[i, best]
+    return selected
+
+
+DOWNSAMPLERS = {"lttb": lttb_downsample, "minmax": minmax_downsample}
+
+
+def downsample(
+    x, y, n_out: int = DEFAULT_MAX_POINTS, method: str = "lttb"
+) -> np.ndarray:
+    # Índices (posicionais) dos pontos mantidos; NaN são ignorados
+    assert method in DOWNSAMPLERS, (
+        f"Unknown downsampling method {method}, use one of {list(DOWNSAMPLERS)}"
+    )
+    x = _as_array(x)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) == len(y):
+        return DOWNSAMPLERS[method](x, y, n_out)
+    return valid[DOWNSAMPLERS[method](x[valid], y[valid], n_out)]
+
+
+def _comparable(values: pd.Series, start, end) -> tuple:
+    # Limites sem fuso são lidos no fuso da coluna
+    tz = getattr(values.dtype, "tz", None)
+    if tz is None:
+        return values.to_numpy(), start, end
+
+    def to_utc(timestamp):
+        if timestamp is None:
+            return None
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize(tz)
+        return timestamp.tz_convert("UTC").tz_localize(None).to_datetime64()
+
+    return _as_array(values), to_utc(start), to_utc(end)
+
+
+def downsample_series(
+    df: pd.DataFrame,
+    x_col: str,
+    y_cols: list,
+    n_out: int = DEFAULT_MAX_POINTS,
+    method: str = "lttb",
+    start=None,
+    end=None,
+) -> dict:
+    # Recorta [start, end] (x ordenado) e reduz cada coluna para no máximo
+    # n_out pontos; chamado de novo a cada zoom, a resolução acompanha o
+    # intervalo visível
+    labels = df[x_col]
+    x, start, end = _comparable(labels, start, end)
+    first = 0 if start is None else np.searchsorted(x, np.asarray(start, x.dtype))
+    last = (
+        len(x)
+        if end is None
+        else np.searchsorted(x, np.asarray(end, x.dtype), side="right")
+    )
+    x = x[first:last]
+    labels = pd.Index(labels)[first:last]
+    series = {}
+    for col in y_cols:
+        y = df[col].to_numpy()[first:last]
+        indices = downsample(x, y, n_out, method)
+        series[col] = pd.Series(y[indices], index=labels[indices], name=col)
+    return series
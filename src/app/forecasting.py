@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from calendar_features import compute_calendar_features, CALENDAR_COLUMNS
+from validator import analyze_time_grid
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+TARGET_COLUMNS = [
+    "TotalPowerConsumption_Zone1",
+    "TotalPowerConsumption_Zone2",
+    "TotalPowerConsumption_Zone3",
+]
+
+
+class BaselineForecaster(ABC):
+    # Base comum: todas as séries alvo (zonas, medidores) ficam numa matriz
+    # (linhas x alvos) e cada modelo é ajustado para todas de uma só vez
+    name = "baseline"
+
+    def __init__(
+        self, targets: list = None, index: str = "Datetime", season: str = "7D"
+    ):
+        self.targets = targets
+        self.index = index
+        self.season = pd.Timedelta(season) if season else None
+        self.step = None
+        self.last = None
+
+    def _prepare(self, df: pd.DataFrame) -> np.ndarray:
+        targets = self.targets or [col for col in TARGET_COLUMNS if col in df.columns]
+        assert targets, "No target columns found in dataframe"
+        self.targets = targets
+        grid = analyze_time_grid(df, self.index)
+        assert grid.step is not None, "Cannot forecast a series without a time step"
+        self.step = grid.step
+        self.last = df[self.index].iloc[-1]
+        return df[targets].to_numpy(dtype=np.float64)
+
+    def _season_steps(self, n_rows: int) -> int:
+        if self.season is None:
+            return 1
+        steps = max(int(self.season // self.step), 1)
+        if steps > n_rows:
+            logger.warning(
+                f"Season {self.season} longer than the series, using no seasonality"
+            )
+            return 1
+        return steps
+
+    def future_index(self, horizon: int) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(
+            self.last + self.step * np.arange(1, horizon + 1), name=self.index
+        )
+
+    def _frame(self, values: np.ndarray, horizon: int) -> pd.DataFrame:
+        return pd.DataFrame(
+            values, index=self.future_index(horizon), columns=self.targets
+        )
+
+    @abstractmethod
+    def fit(self, df: pd.DataFrame) -> "BaselineForecaster": ...
+
+    @abstractmethod
+    def predict(self, horizon: int) -> pd.DataFrame: ...
+
+
+def _seasonal_block(values: np.ndarray, season: int) -> np.ndarray:
+    # Últimos ciclos completos como (ciclos, fase, alvos); a fase 0 é a que
+    # vem logo após o fim da série
+    cycles = len(values) // season
+    return values[len(values) - cycles * season :].reshape(cycles, season, -1)
+
+
+class SeasonalNaiveForecaster(BaselineForecaster):
+    # Repete o último valor observado de cada fase da sazonalidade
+    name = "seasonal_naive"
+
+    def fit(self, df: pd.DataFrame) -> "SeasonalNaiveForecaster":
+        values = self._prepare(df)
+        block = _seasonal_block(values, self._season_steps(len(values)))
+        # Último ciclo com valor válido em cada (fase, alvo)
+        valid = ~np.isnan(block)
+        latest = np.where(valid, np.arange(len(block))[:, None, None], -1).max(axis=0)
+        self.pattern = np.take_along_axis(block, latest.clip(min=0)[None], axis=0)[0]
+        self.pattern[latest < 0] = np.nan
+        return self
+
+    def predict(self, horizon: int) -> pd.DataFrame:
+        phases = np.arange(horizon) % len(self.pattern)
+        return self._frame(self.pattern[phases], horizon)
+
+
+class ExponentialSmoothingForecaster(BaselineForecaster):
+    # Suavização exponencial simples por fase sazonal. O nível final é uma
+    # média com pesos (1 - alpha)^idade, então o ajuste de todos os alvos é
+    # um único produto matricial; NaN apenas saem da média
+    name = "exponential_smoothing"
+
+    def __init__(
+        self,
+        targets: list = None,
+        index: str = "Datetime",
+        season: str = "1D",
+        alpha: float = 0.3,
+    ):
+        assert 0 < alpha <= 1, "alpha must be in (0, 1]"
+        super().__init__(targets, index, season)
+        self.alpha = alpha
+
+    def fit(self, df: pd.DataFrame) -> "ExponentialSmoothingForecaster":
+        values = self._prepare(df)
+        block = _seasonal_block(values, self._season_steps(len(values)))
+        cycles = len(block)
+        weights = (1 - self.alpha) ** np.arange(cycles - 1, -1, -1)
+        valid = ~np.isnan(block)
+        filled = np.where(valid, block, 0.0)
+        with np.errstate(invalid="ignore"):
+            self.level = np.tensordot(weights, filled, axes=1) / np.tensordot(
+                weights, valid, axes=1
+            )
+        return self
+
+    def predict(self, horizon: int) -> pd.DataFrame:
+        phases = np.arange(horizon) % len(self.level)
+        return self._frame(self.level[phases], horizon)
+
+
+class CalendarRegressionForecaster(BaselineForecaster):
+    # Regressão linear sobre one-hot das colunas de calendário. A matriz de
+    # Gram de cada alvo (que só muda com o padrão de NaN) sai de um único
+    # produto máscara.T @ (X ⊗ X) e todos os sistemas são resolvidos juntos
+    name = "calendar_regression"
+
+    def __init__(
+        self,
+        targets: list = None,
+        index: str = "Datetime",
+        columns: list = CALENDAR_COLUMNS,
+        calendar=None,
+        ridge: float = 1e-6,
+    ):
+        super().__init__(targets, index, season=None)
+        self.columns = columns
+        self.calendar = calendar
+        self.ridge = ridge
+        self.categories = {}
+
+    def _codes(self, df: pd.DataFrame) -> dict:
+        missing = [col for col in self.columns if col not in df.columns]
+        codes = {col: df[col].to_numpy() for col in self.columns if col in df.columns}
+        if missing:
+            codes.update(
+                compute_calendar_features(df[self.index], missing, self.calendar)
+            )
+        return codes
+
+    def _design(self, codes: dict) -> np.ndarray:
+        # Intercepto + uma coluna por categoria (exceto a primeira de cada
+        # coluna de calendário, absorvida pelo intercepto)
+        n = len(next(iter(codes.values())))
+        blocks = [np.ones((n, 1))]
+        for col in self.columns:
+            blocks.append(codes[col][:, None] == self.categories[col][None, 1:])
+        return np.hstack(blocks).astype(np.float64)
+
+    def fit(self, df: pd.DataFrame) -> "CalendarRegressionForecaster":
+        values = self._prepare(df)
+        codes = self._codes(df)
+        self.categories = {col: np.unique(codes[col]) for col in self.columns}
+        x = self._design(codes)
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+
+        n_features = x.shape[1]
+        outer = (x[:, :, None] * x[:, None, :]).reshape(len(x), -1)
+        gram = (valid.T.astype(np.float64) @ outer).reshape(-1, n_features, n_features)
+        gram += self.ridge * len(x) * np.eye(n_features)
+        rhs = (x.T @ filled).T[:, :, None]
+        self.coefficients = np.linalg.solve(gram, rhs)[:, :, 0].T
+        return self
+
+    def predict(self, horizon: int) -> pd.DataFrame:
+        future = pd.DataFrame({self.index: self.future_index(horizon)})
+        codes = compute_calendar_features(
+            future[self.index], self.columns, self.calendar
+        )
+        return self._frame(self._design(codes) @ self.coefficients, horizon)
+
+
+BASELINES = {
+    SeasonalNaiveForecaster.name: SeasonalNaiveForecaster,
+    ExponentialSmoothingForecaster.name: ExponentialSmoothingForecaster,
+    CalendarRegressionForecaster.name: CalendarRegressionForecaster,
+}
+
+
+@profiled
+def forecast_baselines(
+    df: pd.DataFrame,
+    horizon: int,
+    targets: list = None,
+    index: str = "Datetime",
+    models: list = None,
+) -> dict:
+    # Ajusta cada baseline (todas por padrão) sobre a saída de
+    # process_dataframe e devolve as previsões de todos os alvos para os
+    # próximos `horizon` passos
+    forecasts = {}
+    for name in models or list(BASELINES):
+        assert name in BASELINES, (
+            f"Unknown baseline {name}, use one of {list(BASELINES)}"
+        )
+        try:
+            model = BASELINES[name](targets, index).fit(df)
+            forecasts[name] = model.predict(horizon)
+        except Exception as e:
+            logger.error(f"Error fitting {name} baseline: {str(e)}")
+            raise
+    return forecasts
@@ -1,9 +1,27 @@
 import os
+import time
+from functools import partial
+
 import kaggle
 import kagglehub
 from kagglehub import KaggleDatasetAdapter
 import zipfile
+import numpy as np
 import pandas as pd
+
+from cache import DatasetCache
+from compaction import DATETIME_FORMAT, compact_dataframe
+from fetcher import DatasetFetcher
+from store import TimeSeriesStore, write_time_series_store
+from partitions import write_partitioned_dataset, read_partitioned_dataset
+from sources import (
+    DEFAULT_SOURCE_DIR,
+    DatasetSource,
+    KaggleSource,
+    get_dataset_source,
+)
+from profiling import profiled
+
 import logging
 
 # Configure logging
@@ -40,6 +58,10 @@ def unzip(unzip_from: str, unzip_to: str, delete: bool = True) -> None:
         raise
 
 
+# download_dataset tem um parâmetro chamado unzip que esconde a função acima
+_unzip = unzip
+
+
 # TODO: move_to está fazendo o download do arquivo na raiz do projeto.
 def download_dataset(
     dataset_address: str,
@@ -55,7 +77,7 @@ def download_dataset(
         if unzip:
             base_name = file_name.rsplit(".", 1)[0]
             zip_file = f"{base_name}.zip"
-            unzip(zip_file, move_to, delete)
+            _unzip(zip_file, move_to, delete)
         else:
             if move_to != ".":
                 os.makedirs(move_to, exist_ok=True)
@@ -67,26 +89,185 @@ def download_dataset(
         raise
 
 
-# TODO: Pode futuramente inferir o tipo com base no caminho do arquivo
+FILE_TYPES = {
+    ".csv": "csv",
+    ".txt": "csv",
+    ".xlsx": "excel",
+    ".xls": "excel",
+    ".json": "json",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".pkl": "pickle",
+    ".pickle": "pickle",
+}
+
+COMPRESSION_EXTENSIONS = (".gz", ".bz2", ".xz", ".zst", ".zip")
+
+
+def infer_file_type(file_path: str) -> str:
+    # Extensão de compressão é ignorada (ex.: dados.csv.gz -> csv)
+    path = str(file_path).lower()
+    if path.endswith(COMPRESSION_EXTENSIONS):
+        path = path.rsplit(".", 1)[0]
+    extension = os.path.splitext(path)[1]
+    if extension not in FILE_TYPES:
+        logger.warning(f"Unknown extension for {file_path}, reading as csv")
+        return "csv"
+    return FILE_TYPES[extension]
+
+
+def _parse_datetime(values: pd.Series, date_format: str) -> pd.Series:
+    # Formato explícito evita a inferência linha a linha; arquivos salvos pelo
+    # próprio app (ISO 8601) caem no parser genérico
+    try:
+        return pd.to_datetime(values, format=date_format)
+    except ValueError:
+        logger.warning(f"Datetime not in format {date_format}, inferring format")
+        return pd.to_datetime(values)
+
+
+def _arrow_type(pa, dtype):
+    # category vira dicionário (o to_pandas devolve category); categorias
+    # fixas e dtypes só do pandas (ex.: Float64) não têm tipo equivalente
+    if isinstance(dtype, str) and dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def _read_csv_arrow(
+    file_path: str,
+    columns: list,
+    dtypes: dict,
+    datetime_col: str,
+    date_format: str,
+) -> pd.DataFrame | None:
+    # Leitor colunar multithread do pyarrow: projeção e tipos são resolvidos
+    # durante o parse, sem materializar colunas descartadas como strings
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return None
+
+    try:
+        column_types = {
+            col: _arrow_type(pa, dtype) for col, dtype in (dtypes or {}).items()
+        }
+    except TypeError as e:
+        logger.warning(f"pyarrow cannot type {file_path} ({e}), using pandas")
+        return None
+    timestamp_parsers = None
+    if date_format:
+        column_types[datetime_col] = pa.timestamp("ns")
+        timestamp_parsers = [date_format, pa_csv.ISO8601]
+    else:
+        # Sem formato a coluna de datas continua texto (ou o dtype pedido),
+        # como no pandas
+        column_types.setdefault(datetime_col, pa.string())
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=columns,
+        column_types=column_types,
+        timestamp_parsers=timestamp_parsers,
+    )
+    try:
+        table = pa_csv.read_csv(file_path, convert_options=convert_options)
+    except pa.ArrowException as e:
+        # Inclui coluna inexistente (ArrowKeyError): o pandas reporta o erro
+        # do mesmo jeito que na leitura padrão
+        logger.warning(f"pyarrow could not parse {file_path} ({e}), using pandas")
+        return None
+    return table.to_pandas()
+
+
+def _read_csv(
+    file_path: str,
+    columns: list = None,
+    dtypes: dict = None,
+    datetime_col: str = "Datetime",
+    date_format: str = None,
+    **kwargs,
+) -> pd.DataFrame:
+    # Leitura tipada (columns, dtypes ou date_format) vai pelo pyarrow; sem
+    # elas, ou com opções específicas do pandas (sep, skiprows...), segue o
+    # read_csv de sempre
+    if (columns or dtypes or date_format) and not kwargs:
+        df = _read_csv_arrow(file_path, columns, dtypes, datetime_col, date_format)
+        if df is not None:
+            return df
+    df = pd.read_csv(file_path, usecols=columns, dtype=dtypes, **kwargs)
+    if (
+        date_format
+        and datetime_col in df.columns
+        and not pd.api.types.is_datetime64_any_dtype(df[datetime_col])
+    ):
+        df[datetime_col] = _parse_datetime(df[datetime_col], date_format)
+    return df
+
+
+def _log_throughput(file_path: str, rows: int, elapsed: float) -> None:
+    elapsed = max(elapsed, 1e-9)
+    message = f"Parsed {rows} rows in {elapsed:.3f}s ({rows / elapsed:,.0f} rows/s"
+    if isinstance(file_path, str) and os.path.isfile(file_path):
+        megabytes = os.path.getsize(file_path) / 1024**2
+        message += f", {megabytes / elapsed:.1f} MB/s"
+    logger.info(f"{message})")
+
+
+@profiled
 def load_dataset_from_file(
-    file_path: str, file_type: str = "csv", **kwargs
+    file_path: str,
+    file_type: str = None,
+    compact: bool = False,
+    datetime_col: str = "Datetime",
+    columns: list = None,
+    dtypes: dict = None,
+    date_format: str = None,
+    **kwargs,
 ) -> pd.DataFrame:
+    # columns limita as colunas lidas já no leitor; dtypes e date_format
+    # (ex.: DATETIME_FORMAT) tipam o parse. Sem date_format a coluna de datas
+    # continua texto, como antes. compact sem date_format assume o formato do
+    # powerconsumption.csv, para a data já sair tipada do leitor
+    if compact and date_format is None:
+        date_format = DATETIME_FORMAT
     try:
+        file_type = (file_type or infer_file_type(file_path)).lower()
         logger.info(f"Loading dataset from {file_path} with type {file_type}")
         readers = {
-            "csv": pd.read_csv,
-            "excel": pd.read_excel,
-            "json": pd.read_json,
-            "parquet": pd.read_parquet,
+            "csv": partial(
+                _read_csv,
+                columns=columns,
+                dtypes=dtypes,
+                datetime_col=datetime_col,
+                date_format=date_format,
+            ),
+            "excel": partial(pd.read_excel, usecols=columns, dtype=dtypes),
+            "json": partial(pd.read_json, dtype=dtypes),
+            "parquet": partial(pd.read_parquet, columns=columns),
+            "feather": partial(pd.read_feather, columns=columns),
             "pickle": pd.read_pickle,
             "sql": pd.read_sql,
         }
 
-        assert file_type.lower() in readers, (
+        assert file_type in readers, (
             f"Unsupported file type. Supported types: {', '.join(readers.keys())}"
         )
 
-        df = readers[file_type.lower()](file_path, **kwargs)
+        start = time.perf_counter()
+        df = readers[file_type](file_path, **kwargs)
+        if columns is not None and file_type in ("json", "pickle", "sql"):
+            df = df[columns]
+        if (
+            date_format
+            and datetime_col in df.columns
+            and df[datetime_col].dtype == object
+        ):
+            df[datetime_col] = _parse_datetime(df[datetime_col], date_format)
+        _log_throughput(file_path, len(df), time.perf_counter() - start)
+
+        if compact:
+            df = compact_dataframe(df, datetime_col, date_format)
         logger.info(f"Successfully loaded dataset with shape {df.shape}")
         return df
     except AssertionError as ae:
@@ -97,6 +278,71 @@ def load_dataset_from_file(
         raise
 
 
+@profiled
+def fetch_datasets(
+    dataset_addresses: list,
+    dest_dir: str = DEFAULT_SOURCE_DIR,
+    max_workers: int = 4,
+    force: bool = False,
+    **fetcher_kwargs,
+) -> dict:
+    try:
+        logger.info(f"Fetching {len(dataset_addresses)} datasets into {dest_dir}")
+        fetcher = DatasetFetcher(dest_dir, max_workers=max_workers, **fetcher_kwargs)
+        entries = fetcher.fetch_all(dataset_addresses, force)
+        downloaded = sum(entry["changed"] for entry in entries.values())
+        logger.info(
+            f"Fetched {len(entries)} datasets ({downloaded} downloaded, "
+            f"{len(entries) - downloaded} unchanged)"
+        )
+        return entries
+    except Exception as e:
+        logger.error(f"Error fetching datasets: {str(e)}")
+        raise
+
+
+def iter_dataset_from_file(
+    file_path: str, chunksize: int = 100_000, file_type: str = None, **kwargs
+):
+    try:
+        file_type = file_type or infer_file_type(file_path)
+        logger.info(
+            f"Streaming dataset from {file_path} with type {file_type} "
+            f"in chunks of {chunksize} rows"
+        )
+        chunked_readers = {
+            "csv": _iter_csv_chunks,
+            "parquet": _iter_parquet_chunks,
+        }
+
+        assert file_type.lower() in chunked_readers, (
+            "Unsupported file type for chunked reading. "
+            f"Supported types: {', '.join(chunked_readers.keys())}"
+        )
+
+        yield from chunked_readers[file_type.lower()](file_path, chunksize, **kwargs)
+    except AssertionError as ae:
+        logger.error(str(ae))
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming dataset: {str(e)}")
+        raise
+
+
+def _iter_csv_chunks(file_path: str, chunksize: int, **kwargs):
+    with pd.read_csv(file_path, chunksize=chunksize, **kwargs) as reader:
+        yield from reader
+
+
+def _iter_parquet_chunks(file_path: str, chunksize: int, usecols=None, **kwargs):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=usecols):
+        yield batch.to_pandas(**kwargs)
+
+
+@profiled
 def save_dataset_to_file(
     df: pd.DataFrame, file_path: str, file_type: str = "csv"
 ) -> None:
@@ -124,18 +370,163 @@ def save_dataset_to_file(
         raise
 
 
-def load_dataset_from_kaggle(dataset_address: str, file_name: str) -> pd.DataFrame:
+@profiled
+def save_dataset_to_store(
+    df: pd.DataFrame, dir_path: str, datetime_col: str = "Datetime", freq: str = None
+) -> TimeSeriesStore:
+    # Store binário em grade fixa (uma coluna .npy por arquivo + header),
+    # lido depois por memory-map com open_dataset_store
+    try:
+        logger.info(f"Saving dataset to time series store {dir_path}")
+        write_time_series_store(df, dir_path, datetime_col, freq=freq)
+        return TimeSeriesStore(dir_path)
+    except AssertionError as ae:
+        logger.error(str(ae))
+        raise
+    except Exception as e:
+        logger.error(f"Error saving dataset to store: {str(e)}")
+        raise
+
+
+def open_dataset_store(dir_path: str) -> TimeSeriesStore:
+    try:
+        store = TimeSeriesStore(dir_path)
+        logger.info(
+            f"Opened time series store {dir_path} with {len(store)} rows "
+            f"({store.start} to {store.end})"
+        )
+        return store
+    except Exception as e:
+        logger.error(f"Error opening time series store: {str(e)}")
+        raise
+
+
+def save_dataset_to_partitions(
+    df: pd.DataFrame,
+    root: str,
+    freq: str = None,
+    datetime_col: str = "Datetime",
+    compression: str = "zstd",
+    mode: str = "append",
+) -> list:
+    # Parquet particionado por frequência/ano/mês; em "append" só as linhas
+    # novas viram arquivos novos, sem reescrever partições existentes
+    try:
+        logger.info(f"Saving dataset to partitioned parquet {root}")
+        return write_partitioned_dataset(
+            df, root, freq, datetime_col, compression=compression, mode=mode
+        )
+    except AssertionError as ae:
+        logger.error(str(ae))
+        raise
+    except Exception as e:
+        logger.error(f"Error saving partitioned dataset: {str(e)}")
+        raise
+
+
+def load_dataset_from_partitions(
+    root: str, freq: str = None, columns: list = None, start=None, end=None
+) -> pd.DataFrame:
+    try:
+        df = read_partitioned_dataset(root, freq, columns, start, end)
+        logger.info(f"Successfully loaded dataset with shape {df.shape}")
+        return df
+    except AssertionError as ae:
+        logger.error(str(ae))
+        raise
+    except Exception as e:
+        logger.error(f"Error loading partitioned dataset: {str(e)}")
+        raise
+
+
+@profiled
+def load_dataset(
+    dataset_address: str,
+    file_name: str,
+    source: DatasetSource = None,
+    use_cache: bool = True,
+    offline: bool = False,
+    cache: DatasetCache = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    # Carrega um arquivo de dataset de qualquer source (Kaggle, diretório
+    # local, espelho HTTP). A busca é condicional e o parse só acontece se o
+    # checksum do arquivo não estiver no cache
+    try:
+        source = source or get_dataset_source()
+        logger.info(
+            f"Loading dataset {dataset_address}/{file_name} from {source.name} source"
+        )
+        cache = cache or DatasetCache()
+        # A versão compacta é cacheada separadamente, já com os dtypes reduzidos
+        cache_name = f"{file_name}#compact" if compact else file_name
+        if offline:
+            df = cache.get(dataset_address, cache_name)
+            assert df is not None, (
+                f"No cached copy of {dataset_address}/{file_name} available offline"
+            )
+            return df
+
+        try:
+            entry = source.fetch(dataset_address, file_name)
+        except Exception as e:
+            df = cache.get(dataset_address, cache_name) if use_cache else None
+            if df is None:
+                raise
+            logger.warning(f"Source unavailable ({str(e)}), using cached copy")
+            return df
+
+        df = (
+            cache.get(dataset_address, cache_name, entry["checksum"])
+            if use_cache
+            else None
+        )
+        if df is None:
+            df = load_dataset_from_file(entry["path"], compact=compact)
+            if use_cache:
+                cache.put(df, dataset_address, cache_name, entry["checksum"])
+        logger.info("Successfully loaded dataset")
+        return df
+    except AssertionError as ae:
+        logger.error(str(ae))
+        raise
+    except Exception as e:
+        logger.error(f"Error loading dataset: {str(e)}")
+        raise
+
+
+@profiled
+def load_dataset_from_kaggle(
+    dataset_address: str,
+    file_name: str,
+    use_cache: bool = True,
+    offline: bool = False,
+    cache: DatasetCache = None,
+    compact: bool = False,
+) -> pd.DataFrame:
     try:
         logger.info(
             f"Loading dataset directly from Kaggle: {dataset_address}/{file_name}"
         )
-        df = kagglehub.load_dataset(
-            KaggleDatasetAdapter.PANDAS,
+        if not use_cache:
+            df = kagglehub.load_dataset(
+                KaggleDatasetAdapter.PANDAS,
+                dataset_address,
+                file_name,
+            )
+            if compact:
+                df = compact_dataframe(df, date_format=DATETIME_FORMAT)
+            logger.info("Successfully loaded Kaggle dataset")
+            return df
+
+        return load_dataset(
             dataset_address,
             file_name,
+            KaggleSource(),
+            offline=offline,
+            cache=cache,
+            compact=compact,
         )
-        logger.info("Successfully loaded Kaggle dataset")
-        return df
     except Exception as e:
         logger.error(f"Error loading dataset from Kaggle: {str(e)}")
         raise
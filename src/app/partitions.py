@@ -0,0 +1,263 @@
+import os
+import json
+import uuid
+import shutil
+
+import pandas as pd
+
+from profiling import profiled
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "_manifest.json"
+
+PARTITION_KEYS = {
+    "year": ["year"],
+    "month": ["year", "month"],
+    "day": ["year", "month", "day"],
+}
+
+
+def _base_dir(root: str, freq: str = None) -> str:
+    return os.path.join(root, f"freq={freq}") if freq else root
+
+
+def _read_manifest(base_dir: str) -> dict | None:
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(base_dir: str, manifest: dict) -> None:
+    path = os.path.join(base_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _ns(timestamp, tz: str = None) -> int:
+    # Instantes comparados em ns UTC (ou ns "de parede" em séries sem fuso)
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None and tz:
+        timestamp = timestamp.tz_localize(tz)
+    return timestamp.value
+
+
+def _values_ns(datetimes: pd.Series):
+    if getattr(datetimes.dtype, "tz", None) is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+    return datetimes.to_numpy().astype("datetime64[ns]").view("i8")
+
+
+def _write_part(table, path: str, compression: str, row_group_size: int) -> None:
+    import pyarrow.parquet as pq
+
+    # Grava com nome temporário e renomeia: o arquivo final nunca fica pela metade
+    tmp_path = f"{path}.tmp"
+    pq.write_table(
+        table,
+        tmp_path,
+        compression=compression,
+        row_group_size=row_group_size,
+        write_statistics=True,
+    )
+    os.replace(tmp_path, path)
+
+
+@profiled
+def write_partitioned_dataset(
+    df: pd.DataFrame,
+    root: str,
+    freq: str = None,
+    datetime_col: str = "Datetime",
+    partition_by: str = "month",
+    compression: str = "zstd",
+    row_group_size: int = 16_384,
+    mode: str = "append",
+) -> list:
+    # Dataset Parquet particionado em root/freq=<freq>/year=YYYY/month=MM/.
+    # Cada escrita cria arquivos novos e só então publica no manifest, que é
+    # a fonte de verdade dos leitores; arquivos fora dele (escrita
+    # interrompida) são ignorados. Em "append" só entram linhas posteriores
+    # à última já gravada; "overwrite" troca o diretório inteiro da frequência
+    import pyarrow as pa
+
+    assert partition_by in PARTITION_KEYS, (
+        f"partition_by must be one of {list(PARTITION_KEYS)}"
+    )
+    assert mode in ("append", "overwrite"), "mode must be 'append' or 'overwrite'"
+    if not pd.api.types.is_datetime64_any_dtype(df[datetime_col]):
+        df = df.assign(**{datetime_col: pd.to_datetime(df[datetime_col])})
+    df = df.sort_values(datetime_col, kind="stable")
+    tz = getattr(df[datetime_col].dtype, "tz", None)
+
+    base_dir = _base_dir(root, freq)
+    target_dir = base_dir
+    manifest = None if mode == "overwrite" else _read_manifest(base_dir)
+    if manifest is None:
+        manifest = {
+            "datetime_col": datetime_col,
+            "partition_by": partition_by,
+            "tz": str(tz) if tz is not None else None,
+            "columns": list(df.columns),
+            "files": [],
+        }
+    else:
+        assert manifest["columns"] == list(df.columns), (
+            "Cannot append a dataframe with different columns"
+        )
+        partition_by = manifest["partition_by"]
+        last_ns = max((entry["max_ns"] for entry in manifest["files"]), default=None)
+        if last_ns is not None:
+            new_rows = _values_ns(df[datetime_col]) > last_ns
+            skipped = len(df) - int(new_rows.sum())
+            if skipped:
+                logger.warning(f"Skipping {skipped} rows already covered by {base_dir}")
+            df = df[new_rows]
+
+    if mode == "overwrite":
+        target_dir = f"{base_dir.rstrip(os.sep)}.tmp"
+        shutil.rmtree(target_dir, ignore_errors=True)
+    os.makedirs(target_dir, exist_ok=True)
+
+    keys = PARTITION_KEYS[partition_by]
+    datetimes = df[datetime_col]
+    groups = [getattr(datetimes.dt, key).rename(key) for key in keys]
+    written = []
+    for values, part in df.groupby(groups, sort=True) if len(df) else ():
+        values = values if isinstance(values, tuple) else (values,)
+        partition = dict(zip(keys, (int(value) for value in values)))
+        relative_dir = os.path.join(
+            *(
+                f"{key}={value:04d}" if key == "year" else f"{key}={value:02d}"
+                for key, value in partition.items()
+            )
+        )
+        os.makedirs(os.path.join(target_dir, relative_dir), exist_ok=True)
+        first = part[datetime_col].iloc[0]
+        last = part[datetime_col].iloc[-1]
+        file_name = f"part-{first.value}-{uuid.uuid4().hex[:8]}.parquet"
+        relative_path = os.path.join(relative_dir, file_name)
+        table = pa.Table.from_pandas(part, preserve_index=False)
+        _write_part(
+            table,
+            os.path.join(target_dir, relative_path),
+            compression,
+            row_group_size,
+        )
+        written.append(
+            {
+                "path": relative_path,
+                **partition,
+                "rows": len(part),
+                "min_ns": int(first.value),
+                "max_ns": int(last.value),
+            }
+        )
+
+    manifest["files"].extend(written)
+    _write_manifest(target_dir, manifest)
+    if mode == "overwrite":
+        shutil.rmtree(base_dir, ignore_errors=True)
+        os.replace(target_dir, base_dir)
+    logger.info(
+        f"Wrote {sum(entry['rows'] for entry in written)} rows in "
+        f"{len(written)} partition files to {base_dir} ({compression})"
+    )
+    return [os.path.join(base_dir, entry["path"]) for entry in written]
+
+
+def _overlaps(stats_min: int, stats_max: int, start_ns, end_ns) -> bool:
+    return (start_ns is None or stats_max >= start_ns) and (
+        end_ns is None or stats_min <= end_ns
+    )
+
+
+@profiled
+def read_partitioned_dataset(
+    root: str,
+    freq: str = None,
+    columns: list = None,
+    start=None,
+    end=None,
+) -> pd.DataFrame:
+    # [start, end] inclusivo. Partições são podadas pelo intervalo de cada
+    # arquivo no manifest e, dentro dos arquivos, os row groups pelas
+    # estatísticas min/max da coluna de datas; só as colunas pedidas são lidas
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    base_dir = _base_dir(root, freq)
+    manifest = _read_manifest(base_dir)
+    assert manifest is not None, f"No partitioned dataset found at {base_dir}"
+    datetime_col = manifest["datetime_col"]
+    tz = manifest["tz"]
+    start_ns = _ns(start, tz) if start is not None else None
+    end_ns = _ns(end, tz) if end is not None else None
+    if columns is not None:
+        missing = set(columns) - set(manifest["columns"])
+        assert not missing, f"Columns {missing} not found in dataset"
+        columns = [datetime_col] + [col for col in columns if col != datetime_col]
+
+    files = [
+        entry
+        for entry in manifest["files"]
+        if _overlaps(entry["min_ns"], entry["max_ns"], start_ns, end_ns)
+    ]
+    tables = []
+    row_groups_read = 0
+    row_groups_total = 0
+    for entry in sorted(files, key=lambda entry: entry["min_ns"]):
+        parquet_file = pq.ParquetFile(os.path.join(base_dir, entry["path"]))
+        metadata = parquet_file.metadata
+        position = parquet_file.schema_arrow.get_field_index(datetime_col)
+        selected = []
+        for i in range(metadata.num_row_groups):
+            statistics = metadata.row_group(i).column(position).statistics
+            if statistics is None or not statistics.has_min_max:
+                selected.append(i)
+                continue
+            if _overlaps(
+                pd.Timestamp(statistics.min).value,
+                pd.Timestamp(statistics.max).value,
+                start_ns,
+                end_ns,
+            ):
+                selected.append(i)
+        row_groups_total += metadata.num_row_groups
+        row_groups_read += len(selected)
+        if selected:
+            tables.append(parquet_file.read_row_groups(selected, columns=columns))
+
+    logger.info(
+        f"Read {len(files)}/{len(manifest['files'])} partition files, "
+        f"{row_groups_read}/{row_groups_total} row groups from {base_dir}"
+    )
+    if not tables:
+        return pd.DataFrame(columns=columns or manifest["columns"])
+    df = pa.concat_tables(tables).to_pandas()
+
+    # Recorte exato dentro dos row groups de borda
+    if start_ns is not None or end_ns is not None:
+        values = df[datetime_col]
+        mask = pd.Series(True, index=df.index)
+        if start_ns is not None:
+            mask &= values >= _timestamp(start_ns, tz)
+        if end_ns is not None:
+            mask &= values <= _timestamp(end_ns, tz)
+        df = df[mask].reset_index(drop=True)
+    return df
+
+
+def _timestamp(ns: int, tz: str = None) -> pd.Timestamp:
+    timestamp = pd.Timestamp(ns, unit="ns")
+    return timestamp.tz_localize("UTC").tz_convert(tz) if tz else timestamp
@@ -1,9 +1,16 @@
 import pandas as pd
 import numpy as np
 
-from importer import load_dataset_from_kaggle, save_dataset_to_file
+from importer import iter_dataset_from_file
 
-from validator import validate_dataframe_by_time_range
+from validator import validate_dataframe_by_time_range, analyze_time_grid, TimeGrid
+from calendar_features import (
+    add_calendar_features,
+    compute_calendar_features,
+    CALENDAR_COLUMNS,
+)
+from compaction import compact_dataframe
+from profiling import profiled, profile_stage
 
 import logging
 
@@ -14,132 +21,659 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+AGG_SCHEMA = {
+    "Temperature": "mean",
+    "Humidity": "mean",
+    "WindSpeed": "mean",
+    "GeneralDiffuseFlows": "mean",
+    "DiffuseFlows": "mean",
+    "PowerConsumption_Zone1": ["sum", "mean"],
+    "PowerConsumption_Zone2": ["sum", "mean"],
+    "PowerConsumption_Zone3": ["sum", "mean"],
+}
+
+NAMING_SCHEMA = [
+    "Temperature",
+    "Humidity",
+    "WindSpeed",
+    "GeneralDiffuseFlows",
+    "DiffuseFlows",
+    "TotalPowerConsumption_Zone1",
+    "AveragePowerConsumption_Zone1",
+    "TotalPowerConsumption_Zone2",
+    "AveragePowerConsumption_Zone2",
+    "TotalPowerConsumption_Zone3",
+    "AveragePowerConsumption_Zone3",
+]
+
+
+@profiled
 def aggregate_data_by_time_frequency(
     df: pd.DataFrame,
     freq: str,
     index: str = "Datetime",
-    agg_schema: dict = {
-        "Temperature": "mean",
-        "Humidity": "mean",
-        "WindSpeed": "mean",
-        "GeneralDiffuseFlows": "mean",
-        "DiffuseFlows": "mean",
-        "PowerConsumption_Zone1": ["sum", "mean"],
-        "PowerConsumption_Zone2": ["sum", "mean"],
-        "PowerConsumption_Zone3": ["sum", "mean"],
-    },
-    naming_schema: list = [
+    agg_schema: dict = AGG_SCHEMA,
+    naming_schema: list = NAMING_SCHEMA,
+    origin="start_day",
+) -> pd.DataFrame:
+    # resample(on=...) evita a cópia completa do dataframe
+    df_agg = df.resample(freq, on=index, origin=origin).agg(agg_schema)
+    df_agg.columns = naming_schema
+    df_agg.reset_index(inplace=True)
+
+    return df_agg
+
+
+class IncrementalAggregator:
+    # Agrega chunks ordenados por tempo. Os buckets completos de cada chunk são
+    # emitidos imediatamente; apenas as linhas do último bucket (que pode
+    # continuar no próximo chunk) ficam retidas e são combinadas com o chunk
+    # seguinte, de modo que cada bucket é reduzido uma única vez sobre todas as
+    # suas linhas e o resultado é idêntico ao da agregação em memória.
+    def __init__(
+        self,
+        freq: str,
+        index: str = "Datetime",
+        agg_schema: dict = AGG_SCHEMA,
+        naming_schema: list = NAMING_SCHEMA,
+    ):
+        self.freq = freq
+        self.index = index
+        self.agg_schema = agg_schema
+        self.naming_schema = naming_schema
+        self.columns = [index, *agg_schema]
+        self.origin = None
+        self._pending = None
+        self._parts = []
+        self.rows = 0
+
+    @profiled
+    def update(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk[self.columns]
+        if chunk.empty:
+            return
+        if not pd.api.types.is_datetime64_any_dtype(chunk[self.index]):
+            chunk = chunk.assign(**{self.index: pd.to_datetime(chunk[self.index])})
+
+        self.rows += len(chunk)
+        if self.origin is None:
+            # Equivalente ao origin="start_day" do resample sobre o dataset inteiro
+            self.origin = chunk[self.index].iloc[0].normalize()
+
+        if self._pending is not None:
+            if chunk[self.index].iloc[0] < self._pending[self.index].iloc[-1]:
+                raise ValueError(
+                    f"Chunks must be sorted by {self.index} for streaming aggregation"
+                )
+            chunk = pd.concat([self._pending, chunk], ignore_index=True)
+
+        bucket = chunk.groupby(
+            pd.Grouper(key=self.index, freq=self.freq, origin=self.origin)
+        ).ngroup()
+        is_open = (bucket == bucket.iloc[-1]).to_numpy()
+        closed = int((~is_open).sum())
+
+        if closed:
+            # A primeira linha pendente entra no resample para que os buckets
+            # vazios entre o último fechado e o pendente também sejam emitidos;
+            # o bucket pendente (parcial) é descartado do resultado
+            agg = self._aggregate(chunk.iloc[: closed + 1])
+            self._parts.append(agg.iloc[:-1])
+        self._pending = chunk[is_open].reset_index(drop=True)
+
+    def _aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        return aggregate_data_by_time_frequency(
+            df,
+            self.freq,
+            self.index,
+            self.agg_schema,
+            self.naming_schema,
+            origin=self.origin,
+        )
+
+    def result(self) -> pd.DataFrame:
+        parts = list(self._parts)
+        if self._pending is not None:
+            parts.append(self._aggregate(self._pending))
+        if not parts:
+            return pd.DataFrame(columns=[self.index, *self.naming_schema])
+        return pd.concat(parts, ignore_index=True)
+
+
+@profiled
+def aggregate_file_by_time_frequency(
+    file_path: str,
+    freq: str,
+    index: str = "Datetime",
+    chunksize: int = 100_000,
+    agg_schema: dict = AGG_SCHEMA,
+    naming_schema: list = NAMING_SCHEMA,
+    file_type: str = "csv",
+) -> pd.DataFrame:
+    aggregator = IncrementalAggregator(freq, index, agg_schema, naming_schema)
+    for chunk in iter_dataset_from_file(
+        file_path, chunksize, file_type, usecols=aggregator.columns
+    ):
+        aggregator.update(chunk)
+    logger.info(f"Aggregated {aggregator.rows} rows from {file_path} in chunks")
+    return aggregator.result()
+
+
+PYRAMID_LEVELS = ["10min", "h", "D", "7D", "ME"]
+
+_MERGEABLE_AGGREGATIONS = {"sum", "mean", "count"}
+
+
+class AggregationPyramid:
+    # Pirâmide de agregados em estado mergeável (soma e contagem por coluna).
+    # Cada nível é obtido do nível mais grosso já construído cujos buckets se
+    # encaixam exatamente nos dele, e qualquer frequência suportada é respondida
+    # a partir do nível cacheado mais próximo em O(buckets).
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        index: str = "Datetime",
+        agg_schema: dict = AGG_SCHEMA,
+        naming_schema: list = NAMING_SCHEMA,
+        levels: list = PYRAMID_LEVELS,
+    ):
+        for funcs in agg_schema.values():
+            funcs = [funcs] if isinstance(funcs, str) else funcs
+            assert set(funcs) <= _MERGEABLE_AGGREGATIONS, (
+                "Pyramid only supports mergeable aggregations: "
+                f"{', '.join(sorted(_MERGEABLE_AGGREGATIONS))}"
+            )
+        self.index = index
+        self.agg_schema = agg_schema
+        self.naming_schema = naming_schema
+        self.origin = df[index].min().normalize()
+        self.levels = {}
+
+        offsets = sorted(
+            (pd.tseries.frequencies.to_offset(level) for level in levels),
+            key=self._span,
+        )
+        base = offsets[0]
+        self.levels[base] = self._state_from_rows(df, base)
+        for offset in offsets[1:]:
+            parent = self._nearest_level(offset)
+            self.levels[offset] = self._roll_up(self.levels[parent], offset)
+        logger.info(
+            f"Built aggregation pyramid with levels {[o.freqstr for o in self.levels]}"
+        )
+
+    @staticmethod
+    def _span(offset) -> pd.Timedelta:
+        if isinstance(offset, pd.offsets.Tick):
+            return pd.Timedelta(offset)
+        # Aproximação só para ordenação dos offsets de calendário
+        return pd.Timestamp("2000-01-01") + offset - pd.Timestamp("2000-01-01")
+
+    def _nests(self, finer, coarser) -> bool:
+        # finer encaixa em coarser quando cada bucket de coarser é a união exata
+        # de buckets de finer (ambos ancorados na mesma origem)
+        if finer == coarser:
+            return True
+        if isinstance(finer, pd.offsets.Tick):
+            finer_ns = pd.Timedelta(finer).value
+            if isinstance(coarser, pd.offsets.Tick):
+                return pd.Timedelta(coarser).value % finer_ns == 0
+            # Offsets de calendário maiores que um dia têm bordas à meia-noite
+            return pd.Timedelta(days=1).value % finer_ns == 0 and self._span(
+                coarser
+            ) >= pd.Timedelta(days=1)
+        return False
+
+    def _nearest_level(self, offset):
+        candidates = [level for level in self.levels if self._nests(level, offset)]
+        if not candidates:
+            return None
+        return max(candidates, key=self._span)
+
+    def _state_from_rows(self, df: pd.DataFrame, offset) -> pd.DataFrame:
+        columns = list(self.agg_schema)
+        state = df.resample(offset, on=self.index, origin=self.origin)[columns].agg(
+            ["sum", "count"]
+        )
+        return state
+
+    def _roll_up(self, state: pd.DataFrame, offset) -> pd.DataFrame:
+        return state.resample(offset, origin=self.origin).sum()
+
+    @profiled
+    def aggregate(self, freq: str) -> pd.DataFrame | None:
+        offset = pd.tseries.frequencies.to_offset(freq)
+        level = self._nearest_level(offset)
+        if level is None:
+            return None
+        state = self.levels[level]
+        if level != offset:
+            state = self._roll_up(state, offset)
+
+        result = {}
+        for col, funcs in self.agg_schema.items():
+            funcs = [funcs] if isinstance(funcs, str) else funcs
+            total = state[(col, "sum")]
+            count = state[(col, "count")]
+            for func in funcs:
+                if func == "sum":
+                    result[len(result)] = total
+                elif func == "count":
+                    result[len(result)] = count
+                else:
+                    result[len(result)] = total / count.where(count > 0)
+
+        df_agg = pd.DataFrame(result)
+        df_agg.columns = self.naming_schema
+        df_agg.index.name = self.index
+        df_agg.reset_index(inplace=True)
+        logger.info(f'Answered "{freq}" from pyramid level "{level.freqstr}"')
+        return df_agg
+
+
+@profiled
+def build_aggregation_pyramid(
+    df: pd.DataFrame,
+    index: str = "Datetime",
+    levels: list = PYRAMID_LEVELS,
+) -> AggregationPyramid:
+    if not pd.api.types.is_datetime64_any_dtype(df[index]):
+        df = df.assign(**{index: pd.to_datetime(df[index])})
+    return AggregationPyramid(df, index, levels=levels)
+
+
+def time_bucket_bounds(datetimes: pd.DatetimeIndex, offset, origin) -> tuple:
+    # Rótulos obtidos do resample sobre apenas o primeiro e o último instante
+    # (mesma origem e bordas do resample completo); as bordas em posições de
+    # linha (datetimes ordenados) saem de buscas binárias
+    offset = pd.tseries.frequencies.to_offset(offset)
+    ns = datetimes.asi8
+    labels = (
+        pd.Series(0, index=datetimes[[0, -1]])
+        .resample(offset, origin=origin)
+        .size()
+        .index
+    )
+    grouper = pd.Grouper(freq=offset)
+    if grouper.closed == "right":
+        edges = labels
+        if not isinstance(offset, pd.offsets.Tick):
+            # Como no resample, bordas de calendário fechadas à direita
+            # cobrem o dia inteiro do rótulo
+            edges = edges + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+        ends = np.searchsorted(ns, edges.asi8, side="right")
+        ends[-1] = len(ns)
+    else:
+        ends = np.append(np.searchsorted(ns, labels[1:].asi8), len(ns))
+    starts = np.concatenate([[0], ends[:-1]])
+    return labels, starts, ends
+
+
+_PREFIX_AGGREGATIONS = {"sum", "mean", "count", "var", "std"}
+
+
+class PrefixSumIndex:
+    # Somas acumuladas (valores, quadrados e contagem de não-NaN) por coluna,
+    # construídas uma vez sobre a série bruta ordenada. Soma, média, variância
+    # e contagem de qualquer janela saem da diferença de dois prefixos, e uma
+    # agregação por frequência custa O(buckets) buscas binárias.
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        index: str = "Datetime",
+        columns: list = None,
+    ):
+        self.index = index
+        self.columns = columns or list(AGG_SCHEMA)
+        datetimes = df[index]
+        if not pd.api.types.is_datetime64_any_dtype(datetimes):
+            datetimes = pd.to_datetime(datetimes)
+        if not datetimes.is_monotonic_increasing:
+            raise ValueError(f"Data must be sorted by {index} to build a prefix index")
+        self.tz = getattr(datetimes.dtype, "tz", None)
+        self.datetimes = pd.DatetimeIndex(datetimes)
+        self.ns = self.datetimes.asi8
+        self.length = len(df)
+
+        # Valores centrados na média da coluna reduzem o cancelamento ao
+        # subtrair prefixos grandes
+        self.centers = {}
+        self.prefix = {}
+        for col in self.columns:
+            values = df[col].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            center = values[valid].mean() if valid.any() else 0.0
+            centered = np.where(valid, values - center, 0.0)
+            self.centers[col] = center
+            self.prefix[col] = (
+                np.concatenate([[0.0], np.cumsum(centered)]),
+                np.concatenate([[0.0], np.cumsum(centered**2)]),
+                np.concatenate([[0], np.cumsum(valid)]),
+            )
+
+    def _positions(self, timestamps, side: str = "left") -> np.ndarray:
+        timestamps = pd.DatetimeIndex(np.atleast_1d(timestamps))
+        if self.tz is not None and timestamps.tz is None:
+            timestamps = timestamps.tz_localize(self.tz)
+        return np.searchsorted(self.ns, timestamps.asi8, side=side)
+
+    def _stats(self, col: str, starts: np.ndarray, ends: np.ndarray) -> dict:
+        total, total_sq, count = self.prefix[col]
+        center = self.centers[col]
+        n = count[ends] - count[starts]
+        centered_sum = total[ends] - total[starts]
+        centered_sq = total_sq[ends] - total_sq[starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, centered_sum / n, np.nan)
+            var = np.where(n > 1, (centered_sq - centered_sum * mean) / (n - 1), np.nan)
+        return {
+            "sum": centered_sum + center * n,
+            "count": n,
+            "mean": mean + center,
+            "var": np.maximum(var, 0.0),
+            "std": np.sqrt(np.maximum(var, 0.0)),
+        }
+
+    def window(self, start=None, end=None, columns: list = None) -> pd.DataFrame:
+        # Estatísticas da janela [start, end) de cada coluna
+        first = 0 if start is None else self._positions(start)
+        last = self.length if end is None else self._positions(end)
+        first, last = np.atleast_1d(first), np.atleast_1d(last)
+        return pd.DataFrame(
+            {
+                col: {
+                    key: value[0]
+                    for key, value in self._stats(col, first, last).items()
+                }
+                for col in columns or self.columns
+            }
+        )
+
+    def _bucket_bounds(self, offset, origin) -> tuple:
+        return time_bucket_bounds(self.datetimes, offset, origin)
+
+    @profiled
+    def aggregate(
+        self,
+        freq: str,
+        agg_schema: dict = AGG_SCHEMA,
+        naming_schema: list = NAMING_SCHEMA,
+        origin="start_day",
+    ) -> pd.DataFrame:
+        offset = pd.tseries.frequencies.to_offset(freq)
+        labels, starts, ends = self._bucket_bounds(offset, origin)
+        result = {self.index: labels}
+        for col, funcs in agg_schema.items():
+            funcs = [funcs] if isinstance(funcs, str) else funcs
+            assert set(funcs) <= _PREFIX_AGGREGATIONS, (
+                f"Prefix index only supports: {', '.join(sorted(_PREFIX_AGGREGATIONS))}"
+            )
+            stats = self._stats(col, starts, ends)
+            for func in funcs:
+                result[len(result)] = stats[func]
+        df_agg = pd.DataFrame(result)
+        df_agg.columns = [self.index, *naming_schema]
+        return df_agg
+
+
+@profiled
+def build_prefix_sum_index(
+    df: pd.DataFrame, index: str = "Datetime", columns: list = None
+) -> PrefixSumIndex:
+    return PrefixSumIndex(df, index, columns)
+
+
+# Lags e janelas são contados em passos da grade (ex.: horas para freq="h").
+# As janelas terminam em t-1 e as interações usam o lag 1, então nenhuma
+# feature da linha t depende do valor observado em t
+FEATURE_SPEC = {
+    "columns": [
+        "TotalPowerConsumption_Zone1",
+        "TotalPowerConsumption_Zone2",
+        "TotalPowerConsumption_Zone3",
         "Temperature",
         "Humidity",
         "WindSpeed",
         "GeneralDiffuseFlows",
         "DiffuseFlows",
-        "TotalPowerConsumption_Zone1",
-        "AveragePowerConsumption_Zone1",
-        "TotalPowerConsumption_Zone2",
-        "AveragePowerConsumption_Zone2",
-        "TotalPowerConsumption_Zone3",
-        "AveragePowerConsumption_Zone3",
     ],
-) -> pd.DataFrame:
-    df_copy = df.copy()
-    df_copy.set_index(index, inplace=True)
+    "lags": [1, 2, 3, 24, 168],
+    "windows": [24, 168],
+    "stats": ["mean", "std", "min", "max"],
+    "interactions": [
+        ("turno", "TotalPowerConsumption_Zone1"),
+        ("turno", "TotalPowerConsumption_Zone2"),
+        ("turno", "TotalPowerConsumption_Zone3"),
+        ("utilidade", "TotalPowerConsumption_Zone1"),
+        ("utilidade", "TotalPowerConsumption_Zone2"),
+        ("utilidade", "TotalPowerConsumption_Zone3"),
+    ],
+}
 
-    df_agg = df_copy.resample(freq).agg(agg_schema)
-    df_agg.columns = naming_schema
-    df_agg.reset_index(inplace=True)
+ROLLING_STATS = ["mean", "std", "min", "max"]
 
-    return df_agg
 
+def _rolling_sums(values: np.ndarray, window: int):
+    # Somas móveis (de valores, quadrados e contagem válida) via soma
+    # acumulada; os valores são centrados para reduzir cancelamento no std
+    valid = ~np.isnan(values)
+    center = values[valid].mean() if valid.any() else 0.0
+    centered = np.where(valid, values - center, 0.0)
+    cumsum = np.concatenate([[0.0], np.cumsum(centered)])
+    cumsum_sq = np.concatenate([[0.0], np.cumsum(centered**2)])
+    cumcount = np.concatenate([[0], np.cumsum(valid)])
+    total = cumsum[window:] - cumsum[:-window]
+    total_sq = cumsum_sq[window:] - cumsum_sq[:-window]
+    count = cumcount[window:] - cumcount[:-window]
+    return center, total, total_sq, count
 
-def add_shift_column(df):
-    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(hours=6))
-    hour = df["Datetime"].dt.hour
-    conditions = [
-        (hour >= 6) & (hour < 12),
-        (hour >= 12) & (hour < 18),
-        (hour >= 18) & (hour < 24),
-        (hour >= 0) & (hour < 6),
-    ]
-    choices = [1, 2, 3, 4]
-    df["turno"] = np.select(conditions, choices, default=-1)
-    return df
-
-
-def add_weekday_column(df):
-    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=1))
-    df["dia_semana"] = df["Datetime"].dt.dayofweek + 1
-    return df
-
-
-holidays = [
-    "2017-01-11",
-    "2017-05-01",
-    "2017-06-26",
-    "2017-08-14",
-    "2017-08-21",
-    "2017-09-01",
-    "2017-09-21",
-    "2017-11-06",
-    "2017-12-01",
-]
-holidays = pd.to_datetime(holidays).date
 
+def _rolling_extreme(values: np.ndarray, window: int, ufunc) -> np.ndarray:
+    # Mínimo/máximo móvel em O(n) (van Herk/Gil-Werman): acumulados por
+    # blocos de tamanho window da esquerda e da direita; a janela [i, i+w-1]
+    # é a combinação do sufixo de i com o prefixo de i+w-1
+    n = len(values)
+    blocks = np.full(-(-n // window) * window, np.nan)
+    blocks[:n] = values
+    blocks = blocks.reshape(-1, window)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[: n - window + 1], prefix[window - 1 : n])
 
-def add_utility_column(df):
-    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=1))
-    if "dia_semana" not in df.columns:
-        df = add_weekday_column(df)
-
-    def classify_day(row):
-        date = row["Datetime"].date()
-        if date in holidays:
-            return 3
-        elif row["dia_semana"] >= 6:
-            return 2
+
+class FeatureGenerator:
+    # Gera lags, estatísticas móveis e interações com o calendário numa única
+    # matriz (features x linhas) preenchida coluna a coluna, sem dataframes
+    # intermediários. Em modo streaming (update) guarda apenas as últimas
+    # `history` linhas e calcula features só para as linhas novas.
+    def __init__(
+        self, spec: dict = FEATURE_SPEC, index: str = "Datetime", calendar=None
+    ):
+        unknown = set(spec.get("stats", [])) - set(ROLLING_STATS)
+        assert not unknown, f"Unknown rolling stats {unknown}, use {ROLLING_STATS}"
+        self.spec = spec
+        self.index = index
+        self.calendar = calendar
+        self.columns = list(spec["columns"])
+        self.lags = sorted(spec.get("lags", []))
+        self.windows = sorted(spec.get("windows", []))
+        self.stats = list(spec.get("stats", ROLLING_STATS))
+        self.interactions = list(spec.get("interactions", []))
+        self.history = max([*self.lags, *(w + 1 for w in self.windows), 1])
+        self._buffer = None
+
+    @property
+    def feature_names(self) -> list:
+        names = []
+        for col in self.columns:
+            names += [f"{col}_lag{lag}" for lag in self.lags]
+            for window in self.windows:
+                names += [f"{col}_roll{window}_{stat}" for stat in self.stats]
+        names += [f"{col}_lag1_x_{cal}" for cal, col in self.interactions]
+        return names
+
+    def _calendar_codes(self, df: pd.DataFrame, cal: str) -> np.ndarray:
+        if cal in df.columns:
+            return df[cal].to_numpy(dtype=np.float64)
+        codes = compute_calendar_features(df[self.index], [cal], self.calendar)
+        return codes[cal].astype(np.float64)
+
+    def _compute(self, df: pd.DataFrame) -> np.ndarray:
+        n = len(df)
+        out = np.full((len(self.feature_names), n), np.nan)
+        row = 0
+        for col in self.columns:
+            values = df[col].to_numpy(dtype=np.float64)
+            for lag in self.lags:
+                if lag < n:
+                    out[row, lag:] = values[:-lag]
+                row += 1
+            for window in self.windows:
+                if window >= n:
+                    row += len(self.stats)
+                    continue
+                center, total, total_sq, count = _rolling_sums(values, window)
+                # Janela [t-window, t-1] vai para a linha t
+                full = count[:-1] == window
+                minimum = _rolling_extreme(values[:-1], window, np.fmin)
+                maximum = _rolling_extreme(values[:-1], window, np.fmax)
+                for stat in self.stats:
+                    target = out[row, window:]
+                    if stat == "mean":
+                        target[:] = center + total[:-1] / window
+                    elif stat == "std":
+                        variance = (total_sq[:-1] - total[:-1] ** 2 / window) / (
+                            window - 1
+                        )
+                        np.sqrt(np.maximum(variance, 0.0), out=target)
+                        # Janelas constantes: evita o resíduo do cancelamento
+                        target[minimum == maximum] = 0.0
+                    else:
+                        target[:] = minimum if stat == "min" else maximum
+                    target[~full] = np.nan
+                    row += 1
+        for cal, col in self.interactions:
+            values = df[col].to_numpy(dtype=np.float64)
+            codes = self._calendar_codes(df, cal)
+            np.multiply(values[:-1], codes[1:], out=out[row, 1:])
+            row += 1
+        return out
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        # A transposta da matriz vira o único bloco do dataframe, sem cópia
+        return pd.DataFrame(
+            self._compute(df).T, index=df.index, columns=self.feature_names
+        )
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Features apenas para as linhas novas, usando as últimas `history`
+        # linhas já vistas como contexto
+        if df.empty:
+            return self.transform(df)
+        needed = [self.index, *self.columns, *(cal for cal, _ in self.interactions)]
+        new = df[[col for col in dict.fromkeys(needed) if col in df.columns]]
+        if self._buffer is not None:
+            if pd.api.types.is_datetime64_any_dtype(new[self.index]) and (
+                new[self.index].iloc[0] <= self._buffer[self.index].iloc[-1]
+            ):
+                raise ValueError("New rows must come after the rows already seen")
+            context = pd.concat([self._buffer, new], ignore_index=True)
         else:
-            return 1
+            context = new.reset_index(drop=True)
+        features = self._compute(context)[:, len(context) - len(new) :]
+        self._buffer = context.iloc[-self.history :]
+        return pd.DataFrame(features.T, index=df.index, columns=self.feature_names)
+
+    def reset(self) -> None:
+        self._buffer = None
+
+
+@profiled
+def add_lag_features(
+    df: pd.DataFrame,
+    spec: dict = FEATURE_SPEC,
+    index: str = "Datetime",
+    calendar=None,
+) -> pd.DataFrame:
+    columns = [col for col in spec["columns"] if col in df.columns]
+    if len(columns) < len(spec["columns"]):
+        missing = set(spec["columns"]) - set(columns)
+        logger.warning(f"Skipping feature columns not found in dataframe: {missing}")
+        spec = {
+            **spec,
+            "columns": columns,
+            "interactions": [
+                (cal, col)
+                for cal, col in spec.get("interactions", [])
+                if col in df.columns
+            ],
+        }
+    features = FeatureGenerator(spec, index, calendar).transform(df)
+    return pd.concat([df, features], axis=1)
+
+
+@profiled
+def add_shift_column(df, grid: TimeGrid = None):
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(hours=6), grid)
+    return add_calendar_features(df, "Datetime", ["turno"])
 
-    df["utilidade"] = df.apply(classify_day, axis=1)
-    return df
 
+@profiled
+def add_weekday_column(df, grid: TimeGrid = None):
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=1), grid)
+    return add_calendar_features(df, "Datetime", ["dia_semana"])
 
-def add_season_column(df):
-    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=90))
 
-    month = df["Datetime"].dt.month
+@profiled
+def add_utility_column(df, calendar=None, grid: TimeGrid = None):
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=1), grid)
+    columns = ["utilidade"]
+    if "dia_semana" not in df.columns:
+        columns = ["dia_semana", "utilidade"]
+    return add_calendar_features(df, "Datetime", columns, calendar)
 
-    conditions = [
-        month.isin([3, 4, 5]),  # Primavera (1)
-        month.isin([6, 7, 8]),  # Verão (2)
-        month.isin([9, 10, 11]),  # Outono (3)
-        month.isin([12, 1, 2]),  # Inverno (4)
-    ]
-    choices = [1, 2, 3, 4]
 
-    df["estacao"] = np.select(conditions, choices, default=0)
-    return df
+@profiled
+def add_season_column(df, grid: TimeGrid = None):
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=90), grid)
+    return add_calendar_features(df, "Datetime", ["estacao"])
 
 
-def process(df):
-    df = add_shift_column(df)
-    df = add_weekday_column(df)
-    df = add_utility_column(df)
-    df = add_season_column(df)
-    return df
+@profiled
+def process(df, calendar=None):
+    # A grade temporal é analisada uma única vez e reaproveitada nas validações
+    grid = analyze_time_grid(df, "Datetime")
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(hours=6), grid)
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=1), grid)
+    validate_dataframe_by_time_range(df, "Datetime", pd.Timedelta(days=90), grid)
+    # turno, dia_semana, utilidade e estacao calculados numa única passada
+    return add_calendar_features(df, "Datetime", CALENDAR_COLUMNS, calendar)
 
 
+@profiled
 def process_dataframe(
-    df: pd.DataFrame, freq: str = "H", index: str = "Datetime"
+    df: pd.DataFrame,
+    freq: str = "H",
+    index: str = "Datetime",
+    calendar=None,
+    pyramid: AggregationPyramid = None,
+    compact: bool = False,
 ) -> pd.DataFrame:
     try:
-        logger.info("Converting Datetime column to datetime type")
-        df["Datetime"] = pd.to_datetime(df["Datetime"])
-        logger.info(f'Aggregating data by "{freq}" using column "{index}" as index')
-        df = aggregate_data_by_time_frequency(df, freq, index)
+        agg = pyramid.aggregate(freq) if pyramid is not None else None
+        if agg is None:
+            if not pd.api.types.is_datetime64_any_dtype(df["Datetime"]):
+                logger.info("Converting Datetime column to datetime type")
+                with profile_stage("processor.to_datetime", len(df)):
+                    df["Datetime"] = pd.to_datetime(df["Datetime"])
+            logger.info(f'Aggregating data by "{freq}" using column "{index}" as index')
+            agg = aggregate_data_by_time_frequency(df, freq, index)
+        df = agg
         logger.info("Data successfully aggregated")
         logger.info("Processing data")
-        process(df)
+        df = process(df, calendar)
+        if compact:
+            df = compact_dataframe(df, index)
         logger.info("Data successfully processed")
         return df
     except Exception as e:
@@ -147,4 +681,24 @@ def process_dataframe(
         raise
 
 
-# TODO: Uma função main() pode ser criada para gerenciar as outras funções de forma a automatizar o processamento e criação de novos datasets.
+@profiled
+def process_dataframe_from_file(
+    file_path: str,
+    freq: str = "H",
+    index: str = "Datetime",
+    chunksize: int = 100_000,
+    calendar=None,
+) -> pd.DataFrame:
+    try:
+        logger.info(
+            f'Aggregating {file_path} by "{freq}" in chunks of {chunksize} rows'
+        )
+        df = aggregate_file_by_time_frequency(file_path, freq, index, chunksize)
+        logger.info("Data successfully aggregated")
+        logger.info("Processing data")
+        process(df, calendar)
+        logger.info("Data successfully processed")
+        return df
+    except Exception as e:
+        logger.error(f"Error processing dataset from file: {str(e)}")
+        raise
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+class ProfilingSession:
+    # Estado de uma sessão de medição (flag, registros e pilha de estágios).
+    # No Streamlit cada sessão guarda o seu em st.session_state e o associa à
+    # thread do script com use_session; fora dele vale a sessão padrão
+    def __init__(self, enabled: bool = False, track_memory: bool = True):
+        self.enabled = enabled
+        self.track_memory = track_memory
+        self.records = []
+        self.stack = []
+
+
+_default_session = ProfilingSession(os.environ.get("PIPELINE_PROFILING", "0") == "1")
+
+
+class _Local(threading.local):
+    # Atributo de classe: threads sem sessão própria leem a padrão sem exceção
+    session = _default_session
+
+
+_local = _Local()
+# tracemalloc é global ao processo: só é parado sem estágios abertos em
+# nenhuma sessão
+_tracing_lock = threading.Lock()
+_tracing_stages = 0
+
+
+def _session() -> ProfilingSession:
+    return _local.session
+
+
+def use_session(session: ProfilingSession = None) -> None:
+    # Associa a sessão à thread atual; None volta para a sessão padrão
+    _local.session = session or _default_session
+
+
+def enable_profiling(track_memory: bool = True) -> None:
+    session = _session()
+    session.enabled = True
+    session.track_memory = track_memory
+
+
+def disable_profiling() -> None:
+    _session().enabled = False
+    with _tracing_lock:
+        if tracemalloc.is_tracing() and not _tracing_stages:
+            tracemalloc.stop()
+
+
+def is_profiling_enabled() -> bool:
+    return _session().enabled
+
+
+def get_records() -> list:
+    return list(_session().records)
+
+
+def clear_records() -> None:
+    _session().records.clear()
+
+
+def export_json(file_path: str = None) -> str:
+    payload = json.dumps(_session().records, indent=2, default=str)
+    if file_path:
+        with open(file_path, "w") as f:
+            f.write(payload)
+    return payload
+
+
+def records_to_dataframe() -> pd.DataFrame:
+    return pd.DataFrame(_session().records)
+
+
+def _count_rows(value) -> int | None:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+@contextmanager
+def profile_stage(stage: str, rows: int = None):
+    global _tracing_stages
+    session = _session()
+    if not session.enabled:
+        yield None
+        return
+
+    # Picos de memória são relativos ao início do estágio; reset_peak zera o
+    # pico global, então cada estágio guarda o maior pico visto pelos filhos
+    frame = {"stage": stage, "rows": rows, "child_peak": 0}
+    track_memory = session.track_memory
+    stack = session.stack
+    if track_memory:
+        with _tracing_lock:
+            _tracing_stages += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        frame["baseline"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    stack.append(frame)
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        yield frame
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        peak_bytes = None
+        if track_memory:
+            if tracemalloc.is_tracing():
+                peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+                peak_bytes = max(peak - frame["baseline"], 0)
+                if stack:
+                    stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+            with _tracing_lock:
+                _tracing_stages -= 1
+        rows = frame["rows"]
+        session.records.append(
+            {
+                "stage": stage,
+                "depth": len(stack),
+                "started_at": started_at,
+                "seconds": seconds,
+                "rows": rows,
+                "rows_per_second": rows / seconds if rows and seconds else None,
+                "peak_bytes": peak_bytes,
+            }
+        )
+
+
+def profiled(func=None, *, stage: str = None):
+    # Decorator que registra tempo, linhas/s e pico de memória de cada chamada.
+    # As linhas vêm do primeiro argumento DataFrame/Series (ou do retorno)
+    if func is None:
+        return functools.partial(profiled, stage=stage)
+
+    name = stage or f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # _session() inline: é o único custo quando desligado
+        if not _local.session.enabled:
+            return func(*args, **kwargs)
+        rows = next(
+            (n for n in map(_count_rows, args) if n is not None),
+            None,
+        )
+        with profile_stage(name, rows) as frame:
+            result = func(*args, **kwargs)
+            if frame["rows"] is None:
+                frame["rows"] = _count_rows(result)
+            return result
+
+    return wrapper
+
+
+def measure_overhead(calls: int = 100_000) -> dict:
+    # Custo médio por chamada de profiled() sobre uma função vazia, desligado
+    # e ligado (sem memória), em segundos; a sessão atual não é alterada
+    def noop():
+        return None
+
+    wrapped = profiled(noop)
+    previous = _session()
+    timings = {}
+    try:
+        for label, session in (
+            ("plain", None),
+            ("disabled", ProfilingSession(enabled=False)),
+            ("enabled", ProfilingSession(enabled=True, track_memory=False)),
+        ):
+            use_session(session)
+            func = noop if session is None else wrapped
+            start = time.perf_counter()
+            for _ in range(calls):
+                func()
+            timings[label] = (time.perf_counter() - start) / calls
+    finally:
+        use_session(previous)
+    return {
+        "seconds_per_call": timings["plain"],
+        "disabled_overhead_seconds": timings["disabled"] - timings["plain"],
+        "enabled_overhead_seconds": timings["enabled"] - timings["plain"],
+    }
@@ -0,0 +1,106 @@
+import numpy as np
+
+
+class QuantileSketch:
+    # Sketch de quantis mergeável no estilo KLL: cada nível h guarda itens com
+    # peso 2**h; quando um nível passa da capacidade ele é ordenado e metade dos
+    # itens (alternando entre pares e ímpares) sobe para o nível seguinte.
+    # Enquanto nada foi compactado os quantis são exatos.
+    def __init__(self, k: int = 256):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._flips = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(int(self.k * (2 / 3) ** depth), 8)
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Com quantidade ímpar o maior item permanece no nível atual
+                keep = items[len(items) - len(items) % 2 :]
+                offset = self._flips % 2
+                self._flips += 1
+                promoted = items[offset : len(items) - len(keep) : 2]
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+                self.levels[level] = keep
+            level += 1
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(items), 2**level) for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q) -> np.ndarray:
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.n == 0:
+            return np.full(len(q), np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+        values, cumulative = self._weighted()
+        ranks = q * (cumulative[-1] - 1)
+        return values[np.searchsorted(cumulative, ranks, side="right")]
+
+    def rank(self, x, inclusive: bool = False) -> np.ndarray:
+        # Quantidade (estimada) de valores < x, ou <= x se inclusive
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        if self.n == 0:
+            return np.zeros(len(x), dtype=np.int64)
+        side = "right" if inclusive else "left"
+        if self.exact:
+            return np.searchsorted(np.sort(self.levels[0]), x, side=side)
+        values, cumulative = self._weighted()
+        positions = np.searchsorted(values, x, side=side)
+        return np.where(positions > 0, cumulative[positions - 1], 0)
+
+    def to_state(self) -> dict:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "flips": self._flips,
+            "levels": [items.tolist() for items in self.levels],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "QuantileSketch":
+        sketch = cls(state["k"])
+        sketch.n = state["n"]
+        sketch._flips = state["flips"]
+        sketch.levels = [
+            np.asarray(items, dtype=np.float64) for items in state["levels"]
+        ]
+        return sketch
@@ -0,0 +1,377 @@
+import os
+import json
+import queue
+import hashlib
+import threading
+import http.client
+import urllib.parse
+import email.utils
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import kagglehub
+
+from cache import DEFAULT_CACHE_DIR, file_content_hash
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE_DIR = os.environ.get(
+    "DATASET_SOURCE_DIR", os.path.join(DEFAULT_CACHE_DIR, "sources")
+)
+
+# Erros de uma conexão keep-alive que o servidor já fechou
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+# Redirecionamentos seguidos por requisição antes de desistir
+MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+# Chaves do manifest que não descrevem o arquivo local completo
+_TRANSIENT_KEYS = ("changed", "partial")
+
+
+class ConnectionPool:
+    # Conexões HTTP(S) keep-alive reaproveitadas entre requisições ao mesmo
+    # host; uma conexão com erro é descartada em vez de devolvida ao pool
+    def __init__(self, max_size: int = 8, timeout: float = 60):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key: tuple) -> queue.LifoQueue:
+        with self._lock:
+            return self._pools.setdefault(key, queue.LifoQueue(self.max_size))
+
+    def _connect(self, parsed) -> http.client.HTTPConnection:
+        connection_class = (
+            http.client.HTTPSConnection
+            if parsed.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_class(parsed.hostname, parsed.port, timeout=self.timeout)
+
+    def _send(self, url: str, method: str, headers: dict) -> tuple:
+        # Uma conexão do pool que o servidor fechou enquanto ociosa é trocada
+        # por uma nova e a requisição repetida
+        parsed = urllib.parse.urlsplit(url)
+        target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        pool = self._pool((parsed.scheme, parsed.hostname, parsed.port))
+        while True:
+            try:
+                conn, reused = pool.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._connect(parsed), False
+            try:
+                conn.request(method, target, headers=headers)
+                return pool, conn, conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                logger.info(f"Stale pooled connection to {parsed.hostname}, retrying")
+            except Exception:
+                conn.close()
+                raise
+
+    @staticmethod
+    def _release(pool: queue.LifoQueue, conn, response) -> None:
+        # Só volta ao pool a conexão cuja resposta foi lida até o fim
+        if not response.isclosed():
+            conn.close()
+            return
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def request(
+        self,
+        url: str,
+        method: str = "GET",
+        headers: dict = None,
+        max_redirects: int = MAX_REDIRECTS,
+    ):
+        # Devolve a resposta final, seguindo redirecionamentos 3xx (a API do
+        # Kaggle responde 302 para o storage). Authorization não segue para
+        # outro host
+        headers = dict(headers or {})
+        for _ in range(max_redirects + 1):
+            pool, conn, response = self._send(url, method, headers)
+            location = response.getheader("Location")
+            if response.status not in _REDIRECT_STATUSES or not location:
+                break
+            response.read()
+            self._release(pool, conn, response)
+            target = urllib.parse.urljoin(url, location)
+            if (
+                urllib.parse.urlsplit(target).netloc
+                != urllib.parse.urlsplit(url).netloc
+            ):
+                headers.pop("Authorization", None)
+            logger.info(f"{url} redirected to {target}")
+            url = target
+        else:
+            raise ConnectionError(f"Too many redirects ({max_redirects}) for {url}")
+        try:
+            yield response
+        except Exception:
+            conn.close()
+            raise
+        self._release(pool, conn, response)
+
+    def close(self) -> None:
+        with self._lock:
+            for pool in self._pools.values():
+                while not pool.empty():
+                    pool.get_nowait().close()
+            self._pools.clear()
+
+
+_connection_pool = ConnectionPool()
+
+
+def _is_range_validator(version: str | None) -> bool:
+    # If-Range só aceita ETag forte ou data HTTP
+    if not version or version.startswith("W/"):
+        return False
+    if version.startswith('"'):
+        return True
+    try:
+        return email.utils.parsedate_to_datetime(version) is not None
+    except (TypeError, ValueError):
+        return False
+
+
+class DatasetSource(ABC):
+    # Origem de arquivos de datasets. fetch() devolve o caminho local do
+    # arquivo e seu checksum, transferindo apenas quando a versão de origem
+    # mudou. Um manifest por source guarda versão, checksum, tamanho e mtime,
+    # então um arquivo local inalterado não é nem re-hasheado.
+    name = "source"
+
+    def __init__(self, dest_dir: str = DEFAULT_SOURCE_DIR):
+        self.dest_dir = dest_dir
+        self.manifest_path = os.path.join(dest_dir, f"{self.name}_manifest.json")
+        self._lock = threading.Lock()
+
+    def _read_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _update_manifest(self, key: str, entry: dict) -> None:
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest[key] = entry
+            os.makedirs(self.dest_dir, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _key(dataset_address: str, file_name: str) -> str:
+        return f"{dataset_address}/{file_name}"
+
+    @staticmethod
+    def _stat(path: str) -> dict:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _entry(
+        self,
+        key: str,
+        path: str,
+        version: str | None,
+        checksum: str = None,
+        **extra,
+    ) -> dict:
+        # Reaproveita o checksum do manifest se o arquivo local não mudou.
+        # "changed" só existe no retorno, nunca no manifest
+        previous = self._read_manifest().get(key) or {}
+        stat = self._stat(path)
+        changed = not (
+            previous.get("path") == path
+            and previous.get("size") == stat["size"]
+            and previous.get("mtime_ns") == stat["mtime_ns"]
+        )
+        if checksum is None:
+            checksum = file_content_hash(path) if changed else previous["checksum"]
+        entry = {
+            **{k: v for k, v in previous.items() if k not in _TRANSIENT_KEYS},
+            "path": path,
+            "version": version,
+            "checksum": checksum,
+            **stat,
+            **extra,
+        }
+        if entry != previous:
+            self._update_manifest(key, entry)
+        return {**entry, "changed": changed}
+
+    @abstractmethod
+    def fetch(self, dataset_address: str, file_name: str) -> dict: ...
+
+
+class KaggleSource(DatasetSource):
+    # kagglehub já mantém a cópia local por versão do dataset; o manifest
+    # evita recalcular o checksum do arquivo a cada carga
+    name = "kaggle"
+
+    def fetch(self, dataset_address: str, file_name: str) -> dict:
+        dataset_dir = kagglehub.dataset_download(dataset_address)
+        path = os.path.join(dataset_dir, file_name)
+        return self._entry(self._key(dataset_address, file_name), path, dataset_dir)
+
+
+class LocalDirectorySource(DatasetSource):
+    # Espelho offline: root/<owner>/<dataset>/<arquivo>. Nada é copiado; a
+    # versão é o par tamanho/mtime do arquivo
+    name = "local"
+
+    def __init__(self, root: str, dest_dir: str = DEFAULT_SOURCE_DIR):
+        super().__init__(dest_dir)
+        self.root = root
+
+    def fetch(self, dataset_address: str, file_name: str) -> dict:
+        path = os.path.join(self.root, *dataset_address.split("/"), file_name)
+        return self.register(self._key(dataset_address, file_name), path)
+
+    def register(self, key: str, path: str) -> dict:
+        assert os.path.exists(path), f"{path} not found in local mirror"
+        stat = self._stat(path)
+        return self._entry(key, path, f"{stat['size']}-{stat['mtime_ns']}")
+
+
+class HttpMirrorSource(DatasetSource):
+    # Espelho HTTP: base_url/<owner>/<dataset>/<arquivo>, baixado para
+    # dest_dir com GET condicional (If-None-Match / If-Modified-Since) sobre
+    # conexões do pool; 304 reaproveita a cópia local sem transferência
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str,
+        dest_dir: str = DEFAULT_SOURCE_DIR,
+        headers: dict = None,
+        chunk_size: int = 1 << 20,
+        pool: ConnectionPool = None,
+    ):
+        super().__init__(dest_dir)
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.chunk_size = chunk_size
+        self.pool = pool or _connection_pool
+
+    def url(self, dataset_address: str, file_name: str) -> str:
+        return f"{self.base_url}/{dataset_address}/{urllib.parse.quote(file_name)}"
+
+    def local_path(self, dataset_address: str, file_name: str) -> str:
+        return os.path.join(
+            self.dest_dir, dataset_address.replace("/", "__"), file_name
+        )
+
+    def fetch(self, dataset_address: str, file_name: str) -> dict:
+        return self.download(
+            self._key(dataset_address, file_name),
+            self.url(dataset_address, file_name),
+            self.local_path(dataset_address, file_name),
+        )
+
+    def _validated_headers(self, previous: dict, path: str, force: bool) -> dict:
+        headers = dict(self.headers)
+        if (
+            not force
+            and previous
+            and os.path.exists(path)
+            and self._stat(path)["size"] == previous.get("size")
+        ):
+            validators = previous.get("validators", {})
+            if "etag" in validators:
+                headers["If-None-Match"] = validators["etag"]
+            if "last_modified" in validators:
+                headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def download(self, key: str, url: str, path: str, force: bool = False) -> dict:
+        # GET condicional (If-None-Match / If-Modified-Since) sobre conexões
+        # do pool; um .part da mesma versão remota é retomado com Range e
+        # If-Range (ETag forte ou data HTTP guardados no manifest)
+        previous = self._read_manifest().get(key) or {}
+        headers = self._validated_headers(previous, path, force)
+        part_path = f"{path}.part"
+        offset = 0
+        partial = previous.get("partial")
+        if os.path.exists(part_path) and _is_range_validator(partial):
+            offset = os.path.getsize(part_path)
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = partial
+
+        with self.pool.request(url, "GET", headers) as response:
+            if response.status == 304:
+                response.read()
+                logger.info(f"{url} not modified, using local copy")
+                return self._entry(key, path, previous["version"])
+            if response.status not in (200, 206):
+                response.read()
+                raise ConnectionError(f"GET {url} returned {response.status}")
+
+            validators = {}
+            if response.getheader("ETag"):
+                validators["etag"] = response.getheader("ETag")
+            if response.getheader("Last-Modified"):
+                validators["last_modified"] = response.getheader("Last-Modified")
+            version = validators.get("etag") or validators.get("last_modified")
+            # Registra a versão do .part antes de transferir, para retomar
+            # um download interrompido
+            self._update_manifest(key, {**previous, "partial": version})
+
+            # Hash calculado durante a transferência (e sobre o trecho já
+            # baixado, quando retomado)
+            resumed = offset and response.status == 206
+            if offset and not resumed:
+                logger.info(f"Server ignored range request, restarting {url}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            digest = hashlib.blake2b(digest_size=16)
+            if resumed:
+                with open(part_path, "rb") as f:
+                    while block := f.read(self.chunk_size):
+                        digest.update(block)
+            with open(part_path, "ab" if resumed else "wb") as f:
+                while block := response.read(self.chunk_size):
+                    digest.update(block)
+                    f.write(block)
+            os.replace(part_path, path)
+
+        if resumed:
+            logger.info(f"Resumed {url} from byte {offset}")
+        logger.info(f"Downloaded {url} ({os.path.getsize(path)} bytes)")
+        return self._entry(
+            key, path, version, digest.hexdigest(), validators=validators
+        )
+
+
+def get_dataset_source(spec: str = None, dest_dir: str = DEFAULT_SOURCE_DIR):
+    # "kaggle" (padrão), "http(s)://espelho" ou um diretório local; por padrão
+    # lido da variável de ambiente DATASET_SOURCE
+    spec = spec or os.environ.get("DATASET_SOURCE", "kaggle")
+    if spec == "kaggle":
+        return KaggleSource(dest_dir)
+    if spec.startswith(("http://", "https://")):
+        return HttpMirrorSource(spec, dest_dir)
+    if spec.startswith("file://"):
+        spec = urllib.parse.urlsplit(spec).path
+    return LocalDirectorySource(spec, dest_dir)
@@ -0,0 +1,187 @@
+import os
+import json
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from validator import analyze_time_grid
+
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+HEADER_FILE = "header.json"
+
+
+def write_time_series_store(
+    df: pd.DataFrame,
+    dir_path: str,
+    datetime_col: str = "Datetime",
+    fill: str = None,
+    freq: str = None,
+) -> str:
+    # Grava cada coluna numérica como um .npy contíguo numa grade regular;
+    # a coluna de datas não é gravada, só início, passo e tamanho no header.
+    # Séries com buracos são reindexadas na grade (NaN ou fill); séries sem
+    # passo fixo (ex.: mensais) ou fora da grade são recusadas
+    if freq is not None:
+        assert isinstance(pd.tseries.frequencies.to_offset(freq), pd.offsets.Tick), (
+            f"Cannot store frequency {freq}: the store needs a fixed time step"
+        )
+    if not pd.api.types.is_datetime64_any_dtype(df[datetime_col]):
+        df = df.assign(**{datetime_col: pd.to_datetime(df[datetime_col])})
+    grid = analyze_time_grid(df, datetime_col)
+    assert grid.step is not None, "Cannot store a series without a regular time step"
+    assert not len(grid.off_grid), (
+        f"Cannot store a series with {len(grid.off_grid)} runs of timestamps "
+        f"off the {grid.step} grid"
+    )
+    if not grid.is_regular:
+        df = grid.repair(df, fill)
+
+    columns = [
+        col
+        for col in df.columns
+        if col != datetime_col and pd.api.types.is_numeric_dtype(df[col])
+    ]
+    skipped = set(df.columns) - set(columns) - {datetime_col}
+    if skipped:
+        logger.warning(f"Skipping non-numeric columns: {skipped}")
+
+    datetimes = df[datetime_col]
+    tz = getattr(datetimes.dtype, "tz", None)
+    if tz is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+
+    # Escreve num diretório temporário e troca no fim, para que leitores
+    # nunca vejam um store pela metade
+    tmp_path = f"{dir_path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    files = {}
+    for i, col in enumerate(columns):
+        file_name = f"{i:04d}.npy"
+        values = df[col].to_numpy()
+        target = np.lib.format.open_memmap(
+            os.path.join(tmp_path, file_name),
+            mode="w+",
+            dtype=values.dtype,
+            shape=values.shape,
+        )
+        target[:] = values
+        target.flush()
+        del target
+        files[col] = {"file": file_name, "dtype": str(values.dtype)}
+
+    header = {
+        "datetime_col": datetime_col,
+        "start_ns": int(datetimes.iloc[0].value) if len(df) else 0,
+        "step_ns": int(grid.step.value),
+        "length": len(df),
+        "tz": str(tz) if tz is not None else None,
+        "columns": files,
+    }
+    with open(os.path.join(tmp_path, HEADER_FILE), "w") as f:
+        json.dump(header, f, indent=2)
+    shutil.rmtree(dir_path, ignore_errors=True)
+    os.replace(tmp_path, dir_path)
+    logger.info(
+        f"Wrote time series store {dir_path}: {len(df)} rows x {len(columns)} "
+        f"columns, step {grid.step}"
+    )
+    return dir_path
+
+
+class TimeSeriesStore:
+    # Leitura de um store gravado por write_time_series_store. Abrir lê só o
+    # header; as colunas são memory-maps abertos sob demanda e os intervalos
+    # viram offsets por aritmética, então cada consulta toca apenas as
+    # páginas do trecho pedido
+    def __init__(self, dir_path: str):
+        self.dir_path = dir_path
+        with open(os.path.join(dir_path, HEADER_FILE)) as f:
+            header = json.load(f)
+        self.datetime_col = header["datetime_col"]
+        self.start_ns = header["start_ns"]
+        self.step_ns = header["step_ns"]
+        self.length = header["length"]
+        self.tz = header["tz"]
+        self._files = header["columns"]
+        self._arrays = {}
+
+    @property
+    def columns(self) -> list:
+        return list(self._files)
+
+    @property
+    def start(self) -> pd.Timestamp:
+        return self._timestamp(self.start_ns)
+
+    @property
+    def end(self) -> pd.Timestamp:
+        return self._timestamp(self.start_ns + (self.length - 1) * self.step_ns)
+
+    @property
+    def step(self) -> pd.Timedelta:
+        return pd.Timedelta(self.step_ns, "ns")
+
+    def __len__(self) -> int:
+        return self.length
+
+    def _timestamp(self, ns: int) -> pd.Timestamp:
+        timestamp = pd.Timestamp(ns, unit="ns")
+        return (
+            timestamp.tz_localize("UTC").tz_convert(self.tz) if self.tz else timestamp
+        )
+
+    def _ns(self, timestamp) -> int:
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None and self.tz:
+            timestamp = timestamp.tz_localize(self.tz)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+        return timestamp.value
+
+    def array(self, column: str) -> np.memmap:
+        assert column in self._files, f"Column {column} not found in store"
+        if column not in self._arrays:
+            path = os.path.join(self.dir_path, self._files[column]["file"])
+            self._arrays[column] = np.load(path, mmap_mode="r")
+        return self._arrays[column]
+
+    def offsets(self, start=None, end=None) -> tuple[int, int]:
+        # [start, end] inclusivo -> fatia [first, last) da grade
+        first = 0
+        last = self.length
+        if start is not None:
+            first = -(-(self._ns(start) - self.start_ns) // self.step_ns)
+        if end is not None:
+            last = (self._ns(end) - self.start_ns) // self.step_ns + 1
+        first = min(max(first, 0), self.length)
+        last = min(max(last, first), self.length)
+        return first, last
+
+    def datetimes(self, first: int = 0, last: int = None) -> pd.DatetimeIndex:
+        last = self.length if last is None else last
+        index = pd.DatetimeIndex(
+            (self.start_ns + self.step_ns * np.arange(first, last)).view("M8[ns]"),
+            name=self.datetime_col,
+        )
+        return index.tz_localize("UTC").tz_convert(self.tz) if self.tz else index
+
+    def get_arrays(self, columns: list = None, start=None, end=None) -> dict:
+        # Views somente-leitura sobre os memory-maps, sem cópia
+        first, last = self.offsets(start, end)
+        return {col: self.array(col)[first:last] for col in columns or self.columns}
+
+    def get_range(self, columns: list = None, start=None, end=None) -> pd.DataFrame:
+        first, last = self.offsets(start, end)
+        data = {self.datetime_col: self.datetimes(first, last)}
+        for col in columns or self.columns:
+            data[col] = self.array(col)[first:last]
+        return pd.DataFrame(data, copy=False)
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+from profiling import profiled
+
 import logging
 
 # Configure logging
@@ -8,13 +11,190 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def is_constant_time_interval(df: pd.DataFrame, datetime_col: str) -> bool:
-    time_diffs = df[datetime_col].diff().dropna()
-    return len(time_diffs.unique()) == 1
+_NAT = np.iinfo(np.int64).min
+
+
+def _runs(positions: np.ndarray) -> np.ndarray:
+    # Agrupa posições consecutivas em intervalos [início, fim]
+    if len(positions) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(positions) != 1)
+    starts = np.concatenate([[positions[0]], positions[breaks + 1]])
+    ends = np.concatenate([positions[breaks], [positions[-1]]])
+    return np.column_stack([starts, ends])
+
+
+class TimeGrid:
+    # Análise da grade temporal feita com uma única varredura da coluna de
+    # datas, reaproveitada por todas as validações sobre o mesmo dataframe.
+    def __init__(self, df: pd.DataFrame, datetime_col: str):
+        self.datetime_col = datetime_col
+        self.length = len(df)
+        self.is_datetime = pd.api.types.is_datetime64_any_dtype(df[datetime_col])
+        self.step = None
+        self.tz = None
+        self.diff_counts = pd.Series(dtype="int64")
+        self.gap_index = np.empty((0, 2), dtype=np.int64)
+        self.gap_missing = np.empty(0, dtype=np.int64)
+        self.duplicates = np.empty((0, 2), dtype=np.int64)
+        self.out_of_order = np.empty((0, 2), dtype=np.int64)
+        self.off_grid = np.empty((0, 2), dtype=np.int64)
+        self._gap_bounds = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.min = None
+        self.max = None
+        if not self.is_datetime or self.length == 0:
+            return
+
+        datetimes = df[datetime_col]
+        self.tz = getattr(datetimes.dtype, "tz", None)
+        if self.tz is not None:
+            datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+        ns = datetimes.to_numpy().astype("datetime64[ns]").view(np.int64)
+        rows = np.flatnonzero(ns != _NAT)
+        if not len(rows):
+            return
+        self.min = self._timestamp(ns[rows].min())
+        self.max = self._timestamp(ns[rows].max())
+
+        # Duplicatas e desordem são apontadas na ordem original das linhas
+        diffs = np.diff(ns)
+        # NaT não participa das diferenças
+        valid = (ns[1:] != _NAT) & (ns[:-1] != _NAT)
+        diffs = diffs[valid]
+        positions = np.flatnonzero(valid) + 1
+        self.diff_counts = pd.Series(diffs).value_counts()
+        self.duplicates = _runs(positions[diffs == 0])
+        self.out_of_order = _runs(positions[diffs < 0])
+
+        # Passo, lacunas e desalinhamentos vêm dos instantes únicos ordenados;
+        # cada instante aponta para sua primeira e sua última linha
+        order = rows[np.argsort(ns[rows], kind="stable")]
+        sorted_ns = ns[order]
+        is_first = np.concatenate([[True], sorted_ns[1:] != sorted_ns[:-1]])
+        is_last = np.concatenate([is_first[1:], [True]])
+        unique_ns = sorted_ns[is_first]
+        first_rows = order[is_first]
+        last_rows = order[is_last]
+        unique_diffs = np.diff(unique_ns)
+        if not len(unique_diffs):
+            return
+        # value_counts usa hash table, então continua linear
+        step = int(pd.Series(unique_diffs).value_counts().index[0])
+        self.step = pd.Timedelta(step, "ns")
+
+        self.off_grid = _runs(np.sort(first_rows[1:][unique_diffs % step != 0]))
+        gap_mask = unique_diffs > step
+        gaps = np.flatnonzero(gap_mask)
+        self.gap_index = np.column_stack([last_rows[gaps], first_rows[gaps + 1]])
+        self.gap_missing = unique_diffs[gap_mask] // step - 1
+        self._gap_bounds = (unique_ns[gaps], unique_ns[gaps + 1])
+
+    def _timestamp(self, ns: int) -> pd.Timestamp:
+        timestamp = pd.Timestamp(int(ns))
+        if self.tz is not None:
+            timestamp = timestamp.tz_localize("UTC").tz_convert(self.tz)
+        return timestamp
+
+    @property
+    def gaps(self) -> list:
+        return [
+            {
+                "index": (int(start_index), int(end_index)),
+                "start": self._timestamp(start),
+                "end": self._timestamp(end),
+                "missing": int(missing),
+            }
+            for (start_index, end_index), start, end, missing in zip(
+                self.gap_index, *self._gap_bounds, self.gap_missing
+            )
+        ]
+
+    @property
+    def is_constant(self) -> bool:
+        return len(self.diff_counts) == 1
+
+    @property
+    def is_regular(self) -> bool:
+        return (
+            self.step is not None
+            and len(self.gap_index) == 0
+            and len(self.duplicates) == 0
+            and len(self.out_of_order) == 0
+            and len(self.off_grid) == 0
+        )
 
+    def report(self) -> dict:
+        return {
+            "step": self.step,
+            "constant": self.is_constant,
+            "gaps": self.gaps,
+            "missing_steps": int(self.gap_missing.sum()),
+            "duplicates": self.duplicates.tolist(),
+            "out_of_order": self.out_of_order.tolist(),
+            "off_grid": self.off_grid.tolist(),
+        }
 
+    @profiled
+    def repair(
+        self,
+        df: pd.DataFrame,
+        fill: str = None,
+        value=None,
+        limit: int = None,
+    ) -> pd.DataFrame:
+        # Reindexa o dataframe na grade regular [min, max] com passo dominante.
+        # fill: None (mantém NaN), "ffill", "bfill", "interpolate" ou "value".
+        assert self.step is not None, "Cannot repair a time grid without a step"
+        assert fill in (None, "ffill", "bfill", "interpolate", "value"), (
+            "fill must be one of None, 'ffill', 'bfill', 'interpolate', 'value'"
+        )
+        col = self.datetime_col
+        repaired = df
+        if len(self.out_of_order):
+            repaired = repaired.sort_values(col, kind="stable")
+        if len(self.duplicates) or len(self.out_of_order):
+            repaired = repaired.drop_duplicates(subset=col, keep="last")
+
+        grid = pd.date_range(self.min, self.max, freq=self.step, name=col)
+        repaired = repaired.set_index(col).reindex(grid)
+
+        if fill == "ffill":
+            repaired = repaired.ffill(limit=limit)
+        elif fill == "bfill":
+            repaired = repaired.bfill(limit=limit)
+        elif fill == "interpolate":
+            numeric = repaired.select_dtypes(include=["number"]).columns
+            repaired[numeric] = repaired[numeric].interpolate(
+                method="time", limit=limit, limit_area="inside"
+            )
+        elif fill == "value":
+            repaired = repaired.fillna(value)
+
+        logger.info(
+            f"Repaired time grid: {len(df)} rows -> {len(repaired)} rows "
+            f"on a {self.step} grid"
+        )
+        return repaired.reset_index()
+
+
+@profiled
+def analyze_time_grid(df: pd.DataFrame, datetime_col: str) -> TimeGrid:
+    return TimeGrid(df, datetime_col)
+
+
+def is_constant_time_interval(
+    df: pd.DataFrame, datetime_col: str, grid: TimeGrid = None
+) -> bool:
+    grid = grid or analyze_time_grid(df, datetime_col)
+    return grid.is_constant
+
+
+@profiled
 def validate_dataframe_by_time_range(
-    df: pd.DataFrame, datetime_col: str, max_interval: pd.Timedelta
+    df: pd.DataFrame,
+    datetime_col: str,
+    max_interval: pd.Timedelta,
+    grid: TimeGrid = None,
 ) -> bool:
     if datetime_col not in df.columns:
         logging.error(f"Column {datetime_col} not found in dataframe")
@@ -24,17 +204,22 @@ def validate_dataframe_by_time_range(
         logging.error(f"Column {datetime_col} must be datetime type")
         # raise ValueError(f"Column {datetime_col} must be datetime type")
 
-    if not is_constant_time_interval(df, datetime_col):
+    grid = grid or analyze_time_grid(df, datetime_col)
+
+    if not grid.is_constant:
         logging.error("Time intervals between records must be constant")
         # raise ValueError("Time intervals between records must be constant")
 
-    time_diff = df[datetime_col].diff().dropna().iloc[0]
-    if time_diff > max_interval:
-        logging.error(f"Time interval ({time_diff}) exceeds maximum allowed ({max_interval})")
+    time_diff = grid.step
+    if time_diff is not None and time_diff > max_interval:
+        logging.error(
+            f"Time interval ({time_diff}) exceeds maximum allowed ({max_interval})"
+        )
         # raise ValueError(
         #     f"Time interval ({time_diff}) exceeds maximum allowed ({max_interval})"
         # )
 
     return True
 
-# TODO: Esse script precisa ser atualizado com mais ferramentas, de forma a conter formas avançadas de validação dos dados expostos.
\ No newline at end of file
+
+# TODO: Esse script precisa ser atualizado com mais ferramentas, de forma a conter formas avançadas de validação dos dados expostos.
@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+
+import pytest
+
+# Os módulos do app são importados pelo nome, como dentro de src/app
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src", "app"))
+
+from synthetic import generate_power_consumption
+
+
+@pytest.fixture
+def power_df():
+    # Três semanas no passo de 10 min do dataset real
+    return generate_power_consumption(3 * 7 * 144)
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    # Espelho mínimo: ETag, 304, Range/If-Range e, opcionalmente, fecha a
+    # conexão keep-alive depois de cada resposta sem avisar o cliente.
+    # /redirect/<caminho> responde 302 para <caminho> em 127.0.0.1 e /loop
+    # redireciona para si mesmo
+    protocol_version = "HTTP/1.1"
+    content = b""
+    etag = '"v1"'
+    requests: ClassVar[list] = []
+    drop_idle = False
+
+    def log_message(self, *args):
+        pass
+
+    def _send_empty(self, status: int, **headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append({"path": self.path, **dict(self.headers)})
+        if self.path.startswith("/redirect/"):
+            port = self.server.server_address[1]
+            location = f"http://127.0.0.1:{port}{self.path[len('/redirect') :]}"
+            self._send_empty(302, Location=location)
+        elif self.path.startswith("/loop"):
+            self._send_empty(302, Location=self.path)
+        elif self.headers.get("If-None-Match") == cls.etag:
+            self._send_empty(304)
+        else:
+            body, status = cls.content, 200
+            requested = self.headers.get("Range")
+            if requested and self.headers.get("If-Range") == cls.etag:
+                offset = int(requested.split("=")[1].rstrip("-"))
+                body, status = cls.content[offset:], 206
+            self.send_response(status)
+            self.send_header("ETag", cls.etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        self.close_connection = cls.drop_idle
+
+
+@pytest.fixture
+def server():
+    # (url base, classe do handler); o conteúdo servido é handler.content
+    handler = type("Handler", (MirrorHandler,), {"requests": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", handler
+    httpd.shutdown()
+    httpd.server_close()
@@ -0,0 +1,61 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from anomalies import MAD_SCALE, AnomalyDetector, _seasonal_residual, detect_anomalies
+
+ZONES = ["PowerConsumption_Zone1", "PowerConsumption_Zone2", "PowerConsumption_Zone3"]
+
+
+@pytest.fixture
+def spiky_df(power_df):
+    df = power_df[["Datetime", *ZONES]].copy()
+    df.loc[1500:1503, "PowerConsumption_Zone1"] *= 3
+    df.loc[2200, "PowerConsumption_Zone3"] = 0.0
+    return df
+
+
+@pytest.mark.parametrize("with_missing", [False, True])
+def test_batches_match_single_pass(spiky_df, with_missing):
+    df = spiky_df
+    if with_missing:
+        df.loc[::53, "PowerConsumption_Zone2"] = np.nan
+    expected = detect_anomalies(df)
+    assert len(expected["ranges"])
+
+    # Cortes no meio de um trecho anômalo e lotes menores que a janela
+    detector = AnomalyDetector()
+    cuts = [0, 100, 1502, 1550, 1600, 2201, len(df)]
+    scores = pd.concat(
+        [detector.update(df.iloc[a:b]) for a, b in itertools.pairwise(cuts)]
+    )
+    pd.testing.assert_frame_equal(scores, expected["scores"])
+    pd.testing.assert_frame_equal(detector.ranges(), expected["ranges"])
+
+
+def test_local_score_matches_rolling_reference(spiky_df):
+    # hop=1 e sem sazonalidade: cada linha contra mediana/MAD das window
+    # linhas anteriores, como um rolling do pandas deslocado
+    detector = AnomalyDetector(ZONES, season=None, hop=1)
+    scores = detector.update(spiky_df)
+    window = detector.window_steps
+    for col in ZONES:
+        rolling = spiky_df[col].rolling(window)
+        median = rolling.median().shift(1)
+        mad = rolling.apply(lambda x: np.median(np.abs(x - np.median(x)))).shift(1)
+        expected = (spiky_df[col] - median) / (MAD_SCALE * mad)
+        np.testing.assert_allclose(scores[col], expected, rtol=1e-9)
+
+
+def test_seasonal_residual_matches_direct_median(spiky_df):
+    season, seasons = 144, 7
+    values = spiky_df[ZONES].to_numpy(dtype=np.float64).T
+    residual = _seasonal_residual(values, season, seasons, has_missing=False)
+    lookback = season * seasons
+    for t in [lookback, lookback + 1, 1500, len(spiky_df) - 1]:
+        previous = values[:, [t - k * season for k in range(1, seasons + 1)]]
+        np.testing.assert_allclose(
+            residual[:, t], values[:, t] - np.median(previous, axis=1)
+        )
+    assert np.isnan(residual[:, :lookback]).all()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import make_cutoffs, model_label, run_backtest
+from forecasting import BASELINES, TARGET_COLUMNS
+from processor import process_dataframe
+
+HORIZON = 24
+MODELS = [
+    {"model": "seasonal_naive", "params": {"season": "1D"}},
+    {"model": "calendar_regression"},
+]
+
+
+def test_make_cutoffs_walk_forward_from_the_end():
+    # O último fold termina na última linha; os anteriores recuam `step`
+    assert make_cutoffs(100, 10, n_folds=3) == [70, 80, 90]
+    assert make_cutoffs(100, 10, n_folds=3, step=5) == [80, 85, 90]
+    # Cortes com menos de min_train linhas de treino são descartados
+    assert make_cutoffs(100, 10, n_folds=10, min_train=60) == [60, 70, 80, 90]
+    assert make_cutoffs(100, 10, n_folds=20) == list(range(10, 100, 10))
+
+
+def _serial_metrics(processed: pd.DataFrame, cutoffs: list) -> dict:
+    # Referência sem pool, cache nem shared memory: erros agregados de todos
+    # os folds de cada modelo
+    targets = [col for col in TARGET_COLUMNS if col in processed.columns]
+    expected = {}
+    for config in MODELS:
+        errors = []
+        for cutoff in cutoffs:
+            model = BASELINES[config["model"]](
+                targets=targets, **config.get("params", {})
+            )
+            predicted = model.fit(processed.iloc[:cutoff]).predict(HORIZON).to_numpy()
+            actual = processed[targets].iloc[cutoff : cutoff + HORIZON].to_numpy()
+            errors.append(predicted - actual)
+        error = np.concatenate(errors)
+        actual = np.concatenate(
+            [processed[targets].iloc[c : c + HORIZON].to_numpy() for c in cutoffs]
+        )
+        for i, target in enumerate(targets):
+            expected[(model_label(config), target)] = {
+                "MAE": np.abs(error[:, i]).mean(),
+                "MAPE": 100 * np.abs(error[:, i] / actual[:, i]).mean(),
+                "RMSE": np.sqrt((error[:, i] ** 2).mean()),
+            }
+    return expected
+
+
+def test_run_backtest_matches_serial_and_reuses_cached_folds(power_df, tmp_path):
+    cache_dir = str(tmp_path / "folds")
+    result = run_backtest(
+        power_df,
+        horizon=HORIZON,
+        n_folds=4,
+        models=MODELS,
+        cache_dir=cache_dir,
+        max_workers=2,
+    )
+
+    processed = process_dataframe(power_df.copy(), "h")
+    cutoffs = make_cutoffs(len(processed), HORIZON, 4)
+    assert cutoffs[-1] + HORIZON == len(processed)
+    folds = result["folds"]
+    for label in map(model_label, MODELS):
+        assert sorted(folds.loc[folds["model"] == label, "cutoff"].unique()) == cutoffs
+    assert result["throughput"]["computed"] == len(MODELS) * len(cutoffs)
+
+    metrics = result["metrics"].set_index(["model", "target"])
+    for key, values in _serial_metrics(processed, cutoffs).items():
+        for name, value in values.items():
+            assert metrics.loc[key, name] == pytest.approx(value, rel=1e-9)
+        assert metrics.loc[key, "folds"] == len(cutoffs)
+
+    # Mesmos dados e configurações: tudo vem do cache, com as mesmas métricas
+    again = run_backtest(
+        power_df, horizon=HORIZON, n_folds=4, models=MODELS, cache_dir=cache_dir
+    )
+    assert again["throughput"]["computed"] == 0
+    assert again["folds"]["cached"].all()
+    pd.testing.assert_frame_equal(again["metrics"], result["metrics"])
+
+    # Um modelo novo só calcula os próprios folds
+    extended = run_backtest(
+        power_df,
+        horizon=HORIZON,
+        n_folds=4,
+        models=[*MODELS, {"model": "exponential_smoothing"}],
+        cache_dir=cache_dir,
+    )
+    computed = extended["folds"].drop_duplicates(["model", "cutoff"])
+    computed = computed.loc[~computed["cached"], "model"]
+    assert set(computed) == {"exponential_smoothing"}
+    assert extended["throughput"]["computed"] == len(cutoffs)
+
+    # Dados diferentes mudam a impressão digital: nada é reaproveitado
+    changed = power_df.assign(Temperature=power_df["Temperature"] + 1)
+    fresh = run_backtest(
+        changed, horizon=HORIZON, n_folds=4, models=MODELS, cache_dir=cache_dir
+    )
+    assert fresh["throughput"]["cached"] == 0
@@ -0,0 +1,44 @@
+from batch import BatchJob, _run_job, delta_state_dir, share_dataframe
+from partitions import read_partitioned_dataset
+
+
+def _files(root):
+    return sorted(p.name for p in root.rglob("*.parquet"))
+
+
+def test_unchanged_delta_run_keeps_partitions(power_df, tmp_path):
+    job = BatchJob(
+        "power.csv", "h", str(tmp_path / "out"), "partitioned", str(tmp_path / "delta")
+    )
+    shared, shm = share_dataframe(power_df)
+    try:
+        first = _run_job(job, shared)
+        files = _files(tmp_path / "out")
+        second = _run_job(job, shared)
+    finally:
+        shm.close()
+        shm.unlink()
+    # Sem buckets alterados, nada é regravado nem duplicado
+    assert first["delta"]["full"] and second["delta"]["buckets"] == 0
+    assert _files(tmp_path / "out") == files
+    assert len(read_partitioned_dataset(str(tmp_path / "out"), "h")) == first["rows"]
+
+
+def test_delta_state_dir_is_keyed_by_absolute_path(tmp_path, monkeypatch):
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "power.csv").write_text("Datetime\n")
+    delta_dir = str(tmp_path / "delta")
+
+    def state(dataset):
+        return delta_state_dir(BatchJob(dataset, "h", "out", "csv", delta_dir))
+
+    # Arquivos homônimos em diretórios diferentes não dividem o estado
+    first = state(str(tmp_path / "a" / "power.csv"))
+    assert first != state(str(tmp_path / "b" / "power.csv"))
+    assert first != state("owner/data/power.csv")
+    assert first.endswith("freq=h")
+
+    # Caminho relativo e absoluto do mesmo arquivo são o mesmo estado
+    monkeypatch.chdir(tmp_path / "a")
+    assert state("power.csv") == first
@@ -0,0 +1,52 @@
+import benchmark
+import pandas as pd
+from benchmark import compare_benchmarks, run_benchmarks
+from processor import process_dataframe
+from validator import validate_dataframe_by_time_range
+
+
+def _result(seconds, **params):
+    return {
+        "benchmark": "load_dataset_from_file",
+        "rows": 1000,
+        **params,
+        "seconds_min": seconds,
+        "seconds_median": seconds,
+        "peak_bytes": 1,
+        "rows_per_second": 1000 / seconds,
+    }
+
+
+def test_compare_keeps_parameterized_runs_apart():
+    # Leitura completa e projetada do mesmo arquivo não podem se sobrepor
+    run = {
+        "results": [
+            _result(1.0),
+            _result(0.2, columns="Datetime,PowerConsumption_Zone1"),
+        ]
+    }
+    comparison = compare_benchmarks(run, run)
+    assert len(comparison) == 2
+    assert not any(entry["regression"] for entry in comparison)
+
+
+def test_stages_see_the_same_input_on_every_call(tmp_path, monkeypatch):
+    # Validator recebe Datetime tipado; process_dataframe sempre a leitura crua
+    seen = {"validate": [], "process": []}
+
+    def validate(df, datetime_col, max_interval):
+        seen["validate"].append(df[datetime_col].dtype)
+        return validate_dataframe_by_time_range(df, datetime_col, max_interval)
+
+    def process(df, freq):
+        seen["process"].append(df["Datetime"].dtype)
+        return process_dataframe(df, freq)
+
+    monkeypatch.setattr(benchmark, "validate_dataframe_by_time_range", validate)
+    monkeypatch.setattr(benchmark, "process_dataframe", process)
+    run_benchmarks([500], ["h", "D"], repeat=2, data_dir=str(tmp_path), wide_columns=2)
+
+    assert seen["validate"]
+    assert all(pd.api.types.is_datetime64_any_dtype(d) for d in seen["validate"])
+    assert len(seen["process"]) == 2 * 3
+    assert not any(pd.api.types.is_datetime64_any_dtype(d) for d in seen["process"])
@@ -0,0 +1,112 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from cache import DatasetCache
+
+
+@pytest.fixture
+def frame():
+    df = pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2017-01-01", periods=500, freq="10min"),
+            "Temperature": np.linspace(5.0, 30.0, 500),
+            "Zone": ["a", "b"] * 250,
+            "Count": np.arange(500),
+        }
+    )
+    df.loc[::9, "Temperature"] = np.nan
+    return df
+
+
+def test_get_and_put_roundtrip(frame, tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    assert cache.get("owner/data", "file.csv", "v1") is None
+
+    key = cache.put(frame, "owner/data", "file.csv", "v1")
+    assert os.path.exists(os.path.join(str(tmp_path), f"{key}.arrow"))
+    loaded = cache.get("owner/data", "file.csv", "v1")
+    pd.testing.assert_frame_equal(loaded, frame)
+
+    # Numéricas (NaN incluído) e datetime saem do memory-map sem cópia
+    for col in ["Datetime", "Temperature", "Count"]:
+        assert not loaded[col].to_numpy().flags.writeable
+
+    # Sem hash vale a versão mais recente; hash desconhecido é miss
+    newer = frame.assign(Count=frame["Count"] * 2)
+    cache.put(newer, "owner/data", "file.csv", "v2")
+    pd.testing.assert_frame_equal(cache.get("owner/data", "file.csv"), newer)
+    assert cache.get("owner/data", "file.csv", "v3") is None
+
+
+def test_hit_does_not_rewrite_index(frame, tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    cache.put(frame, "owner/data", "file.csv", "v1")
+    before = os.stat(cache.index_path)
+
+    cache.get("owner/data", "file.csv", "v1")
+
+    after = os.stat(cache.index_path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+def test_evicts_least_recently_used(frame, tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    first = cache.put(frame, "owner/data", "a.csv", "v1")
+    second = cache.put(frame, "owner/data", "b.csv", "v1")
+    entry_size = cache.size() // 2
+
+    # a.csv acessado por último: b.csv é o menos recente
+    past = os.path.getmtime(cache._entry_path(first)) - 10
+    os.utime(cache._entry_path(first), (past, past))
+    os.utime(cache._entry_path(second), (past - 10, past - 10))
+    cache.get("owner/data", "a.csv", "v1")
+
+    cache.max_bytes = 2 * entry_size
+    third = cache.put(frame, "owner/data", "c.csv", "v1")
+
+    assert cache.get("owner/data", "b.csv", "v1") is None
+    assert not os.path.exists(cache._entry_path(second))
+    assert cache.get("owner/data", "a.csv", "v1") is not None
+    assert cache.get("owner/data", "c.csv", "v1") is not None
+    assert set(cache._read_index()) == {first, third}
+
+
+def test_invalidate(frame, tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    cache.put(frame, "owner/data", "a.csv", "v1")
+    cache.put(frame, "owner/data", "a.csv", "v2")
+    cache.put(frame, "owner/data", "b.csv", "v1")
+    cache.put(frame, "owner/other", "a.csv", "v1")
+
+    assert cache.invalidate("owner/data", "a.csv") == 2
+    assert cache.get("owner/data", "a.csv") is None
+    assert cache.get("owner/data", "b.csv", "v1") is not None
+
+    assert cache.invalidate("owner/other") == 1
+    assert cache.invalidate() == 1
+    assert cache.size() == 0
+    assert [name for name in os.listdir(str(tmp_path)) if name.endswith(".arrow")] == []
+
+
+def test_concurrent_puts_from_threads(frame, tmp_path):
+    # Mesmo processo, mesma chave e chaves diferentes: nenhum tmp é
+    # compartilhado e o índice não perde entradas
+    cache = DatasetCache(str(tmp_path))
+    barrier = threading.Barrier(8)
+
+    def put(i):
+        barrier.wait()
+        return cache.put(frame, "owner/data", f"{i % 4}.csv", "v1")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        keys = set(pool.map(put, range(8)))
+
+    assert set(cache._read_index()) == keys
+    assert len(keys) == 4
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith(".tmp")]
+    for i in range(4):
+        pd.testing.assert_frame_equal(cache.get("owner/data", f"{i}.csv", "v1"), frame)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor import (
+    add_season_column,
+    add_shift_column,
+    add_utility_column,
+    add_weekday_column,
+    process,
+)
+
+HOLIDAYS = pd.to_datetime(["2017-01-11", "2017-05-01", "2017-12-01"]).date
+
+
+# Implementações originais (antes do motor vetorizado), sem as validações
+def _baseline_shift(df):
+    hour = df["Datetime"].dt.hour
+    conditions = [
+        (hour >= 6) & (hour < 12),
+        (hour >= 12) & (hour < 18),
+        (hour >= 18) & (hour < 24),
+        (hour >= 0) & (hour < 6),
+    ]
+    df["turno"] = np.select(conditions, [1, 2, 3, 4], default=-1)
+    return df
+
+
+def _baseline_weekday(df):
+    df["dia_semana"] = df["Datetime"].dt.dayofweek + 1
+    return df
+
+
+def _baseline_utility(df):
+    def classify_day(row):
+        date = row["Datetime"].date()
+        if date in HOLIDAYS:
+            return 3
+        elif row["dia_semana"] >= 6:
+            return 2
+        else:
+            return 1
+
+    df["utilidade"] = df.apply(classify_day, axis=1)
+    return df
+
+
+def _baseline_season(df):
+    month = df["Datetime"].dt.month
+    conditions = [
+        month.isin([3, 4, 5]),
+        month.isin([6, 7, 8]),
+        month.isin([9, 10, 11]),
+        month.isin([12, 1, 2]),
+    ]
+    df["estacao"] = np.select(conditions, [1, 2, 3, 4], default=0)
+    return df
+
+
+def _baseline(df):
+    for add in [
+        _baseline_shift,
+        _baseline_weekday,
+        _baseline_utility,
+        _baseline_season,
+    ]:
+        df = add(df)
+    return df
+
+
+@pytest.fixture(params=[None, "Africa/Casablanca"], ids=["naive", "tz-aware"])
+def calendar_df(request, power_df):
+    # Três semanas com o feriado de 11/01 e mais um trecho em maio
+    df = pd.concat(
+        [
+            power_df,
+            power_df.assign(Datetime=power_df["Datetime"] + pd.Timedelta("118D")),
+        ],
+        ignore_index=True,
+    )[["Datetime", "Temperature"]]
+    if request.param:
+        df["Datetime"] = df["Datetime"].dt.tz_localize(request.param)
+    return df
+
+
+def test_process_matches_baseline(calendar_df):
+    expected = _baseline(calendar_df.copy())
+    pd.testing.assert_frame_equal(process(calendar_df.copy()), expected)
+
+
+def test_single_columns_match_baseline(calendar_df):
+    expected = _baseline(calendar_df.copy())
+    df = calendar_df.copy()
+    df = add_shift_column(df)
+    df = add_weekday_column(df)
+    df = add_utility_column(df)
+    df = add_season_column(df)
+    pd.testing.assert_frame_equal(df, expected)
+    # add_utility_column sozinho também cria dia_semana
+    pd.testing.assert_frame_equal(
+        add_utility_column(calendar_df.copy()),
+        expected[[*calendar_df.columns, "dia_semana", "utilidade"]],
+    )
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from checker import IncrementalReport, check_dataset, compute_numeric_statistics
+
+
+@pytest.fixture
+def dirty_df(power_df):
+    # NaN e linhas repetidas, inclusive entre lotes diferentes
+    df = power_df.copy()
+    df.loc[::41, "Humidity"] = np.nan
+    return pd.concat([df, df.iloc[[5, 6, 2500]]], ignore_index=True)
+
+
+def test_incremental_report_matches_check_dataset(dirty_df, tmp_path):
+    expected = check_dataset(dirty_df)
+
+    # Lotes de tamanhos diferentes, com o estado salvo e recarregado no meio
+    path = str(tmp_path / "report.npz")
+    report = IncrementalReport()
+    for start, end in [(0, 700), (700, 1500), (1500, 2600), (2600, None)]:
+        report.update(dirty_df.iloc[start:end])
+        report.save(path)
+        report = IncrementalReport.load(path)
+    result = report.to_report()
+
+    assert result["shape"] == expected["shape"]
+    assert result["dtypes"] == expected["dtypes"]
+    assert result["missing_values"] == expected["missing_values"]
+    assert result["duplicates"]["total"] == expected["duplicates"]["total"] == 3
+    for sample in ["head", "tail"]:
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(result["samples"][sample]),
+            pd.DataFrame(expected["samples"][sample]),
+        )
+
+    n = len(dirty_df)
+    for col, stats in expected["statistics"].items():
+        incremental = result["statistics"][col]
+        for key in ["count", "missing", "mean", "std", "min", "max"]:
+            assert incremental[key] == pytest.approx(stats[key], rel=1e-9)
+        # Quartis vêm do sketch: o erro é medido em posto (empates incluídos),
+        # não em valor
+        values = np.sort(dirty_df[col].dropna().to_numpy())
+        for key, q in [("q1", 0.25), ("median", 0.5), ("q3", 0.75)]:
+            low = np.searchsorted(values, incremental[key], "left")
+            high = np.searchsorted(values, incremental[key], "right")
+            assert low / len(values) - 0.01 <= q <= high / len(values) + 0.01
+        assert incremental["histogram"]["counts"].sum() == stats["count"]
+        assert abs(incremental["outliers"] - stats["outliers"]) <= 0.01 * n
+
+
+def test_numeric_statistics_match_describe_and_histogram():
+    # Referência independente: df.describe() e np.histogram, com NaN, coluna
+    # toda NaN, coluna de um só valor, coluna constante e inteiros
+    rng = np.random.default_rng(7)
+    n = 1001
+    df = pd.DataFrame(
+        {
+            "normal": rng.normal(size=n),
+            "gaps": rng.normal(size=n).round(1),
+            "empty": np.full(n, np.nan),
+            "single": np.nan,
+            "constant": 3.0,
+            "ints": rng.integers(0, 50, size=n),
+            "label": "x",
+        }
+    )
+    df.loc[::7, "gaps"] = np.nan
+    df.loc[5, "single"] = 2.5
+
+    statistics = compute_numeric_statistics(df, bins=12)
+    describe = df.describe()
+
+    assert list(statistics) == list(describe.columns)
+    for col, stats in statistics.items():
+        expected = describe[col]
+        got = [stats[key] for key in ["count", "mean", "std", "min"]]
+        got += [stats[key] for key in ["q1", "median", "q3", "max"]]
+        np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-12, equal_nan=True)
+        assert stats["missing"] == n - expected["count"]
+
+        values = df[col].dropna().to_numpy()
+        if len(values) == 0:
+            assert stats["histogram"]["counts"].sum() == 0
+            continue
+        counts, edges = np.histogram(values, bins=12)
+        np.testing.assert_array_equal(stats["histogram"]["counts"], counts)
+        np.testing.assert_allclose(stats["histogram"]["edges"], edges)
+
+    # Sem valores não há média nem desvio (NaN, não -0.0); um valor só não
+    # define desvio
+    assert np.isnan(statistics["empty"]["mean"])
+    assert np.isnan(statistics["empty"]["std"])
+    assert np.isnan(statistics["single"]["std"])
+    assert statistics["single"]["median"] == 2.5
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from correlation import correlation_at_lag, correlation_by_lag, lagged_cross_correlation
+
+COLUMNS = [
+    "Temperature",
+    "Humidity",
+    "PowerConsumption_Zone1",
+    "PowerConsumption_Zone2",
+]
+
+
+def _direct(df: pd.DataFrame, lags) -> np.ndarray:
+    # Mesmo estimador em laço direto: padronização global e média dos
+    # produtos sobre os pares válidos sobrepostos
+    values = df[COLUMNS].to_numpy(dtype=np.float64).T
+    z = (values - np.nanmean(values, axis=1, keepdims=True)) / np.nanstd(
+        values, axis=1, keepdims=True
+    )
+    n = z.shape[1]
+    result = np.empty((len(lags), len(COLUMNS), len(COLUMNS)))
+    for k, lag in enumerate(lags):
+        for i in range(len(COLUMNS)):
+            for j in range(len(COLUMNS)):
+                if lag >= 0:
+                    products = z[i, : n - lag] * z[j, lag:]
+                else:
+                    products = z[i, -lag:] * z[j, : n + lag]
+                result[k, i, j] = np.nanmean(products)
+    return result
+
+
+def test_lag_zero_is_pearson(power_df):
+    result = correlation_at_lag(lagged_cross_correlation(power_df, 5, COLUMNS), 0)
+    pd.testing.assert_frame_equal(
+        result, power_df[COLUMNS].corr(), check_names=False, rtol=1e-9
+    )
+
+
+@pytest.mark.parametrize("with_missing", [False, True])
+def test_fft_matches_direct_sum(power_df, with_missing):
+    df = power_df.copy()
+    if with_missing:
+        df.loc[::29, "Temperature"] = np.nan
+        df.loc[100:180, "PowerConsumption_Zone2"] = np.nan
+    lags = np.arange(-12, 13)
+    result = lagged_cross_correlation(df, 12, COLUMNS)
+    np.testing.assert_allclose(
+        result.to_numpy().reshape(len(lags), len(COLUMNS), len(COLUMNS)),
+        _direct(df, lags),
+        rtol=1e-7,
+        atol=1e-9,
+    )
+
+
+def test_lag_orientation_matches_shift(power_df):
+    # corr(x_i[t], x_j[t + lag]) ~ corr de x_i com x_j deslocada para trás
+    series = correlation_by_lag(
+        lagged_cross_correlation(power_df, 144, COLUMNS), "Temperature", "Humidity"
+    )
+    for lag in [-144, -36, 6, 72]:
+        shifted = power_df["Temperature"].corr(power_df["Humidity"].shift(-lag))
+        assert series[lag] == pytest.approx(shifted, abs=0.05)
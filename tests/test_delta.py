@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+from delta import DeltaProcessor
+from processor import process_dataframe
+
+
+def _versions(df: pd.DataFrame) -> list:
+    # Sequência de edições da série bruta, cada uma sobre a anterior
+    base = df.iloc[:2500]
+    appended = df
+    updated = appended.copy()
+    updated.loc[1000:1005, "PowerConsumption_Zone1"] += 100.0
+    deleted = updated.drop(updated.index[1500:1700])
+    truncated = deleted.iloc[:-300]
+    shuffled = truncated.sample(frac=1, random_state=0)
+    return [
+        ("base", base, {}),
+        ("append", appended, {"inserted": len(df) - 2500, "updated": 0}),
+        ("update", updated, {"updated": 6, "inserted": 0, "deleted": 0}),
+        ("delete", deleted, {"deleted": 200, "inserted": 0}),
+        ("truncate", truncated, {"deleted": 300, "inserted": 0}),
+        ("reorder", shuffled, {"inserted": 0, "updated": 0, "deleted": 0}),
+    ]
+
+
+@pytest.mark.parametrize("freq", ["h", "D", "7D", "ME"])
+def test_delta_matches_full_processing(power_df, tmp_path, freq):
+    processor = DeltaProcessor(str(tmp_path / "state"), freq)
+    for name, version, expected_delta in _versions(power_df):
+        result = processor.update(version)
+        expected = process_dataframe(
+            version.sort_values("Datetime").reset_index(drop=True), freq
+        )
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-9, obj=name)
+        for key, value in expected_delta.items():
+            assert processor.last_delta[key] == value, (name, key)
+
+
+def test_unchanged_input_recomputes_nothing(power_df, tmp_path):
+    processor = DeltaProcessor(str(tmp_path / "state"), "h")
+    processor.update(power_df)
+    processor.update(power_df)
+    assert (
+        processor.last_delta["buckets"] == processor.last_delta["removed_buckets"] == 0
+    )
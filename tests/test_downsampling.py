@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from downsampling import downsample, downsample_series
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_tz_aware_matches_naive(power_df, method):
+    naive = power_df[["Datetime", "PowerConsumption_Zone1"]]
+    aware = naive.assign(Datetime=naive["Datetime"].dt.tz_localize("Africa/Casablanca"))
+    np.testing.assert_array_equal(
+        downsample(aware["Datetime"], aware["PowerConsumption_Zone1"], 200, method),
+        downsample(
+            naive["Datetime"].dt.tz_localize("Africa/Casablanca").dt.tz_convert(None),
+            naive["PowerConsumption_Zone1"],
+            200,
+            method,
+        ),
+    )
+
+
+def test_tz_aware_series_keeps_timezone_and_window(power_df):
+    df = power_df.assign(Datetime=power_df["Datetime"].dt.tz_localize("UTC"))
+    start, end = "2017-01-03", "2017-01-05 23:50"
+    series = downsample_series(
+        df, "Datetime", ["PowerConsumption_Zone1"], 100, start=start, end=end
+    )["PowerConsumption_Zone1"]
+    assert str(series.index.tz) == "UTC"
+    assert series.index[0] == pd.Timestamp(start, tz="UTC")
+    assert series.index[-1] == pd.Timestamp(end, tz="UTC")
+    assert len(series) == 100
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor import (
+    FEATURE_SPEC,
+    FeatureGenerator,
+    add_lag_features,
+    process_dataframe,
+)
+
+
+@pytest.fixture
+def hourly_df(power_df):
+    df = process_dataframe(power_df.copy(), "h")
+    df.loc[[30, 200, 201], "Temperature"] = np.nan
+    return df
+
+
+def _reference(df: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    # shift/rolling do pandas; janelas terminam em t-1
+    features = {}
+    for col in spec["columns"]:
+        series = df[col]
+        for lag in spec["lags"]:
+            features[f"{col}_lag{lag}"] = series.shift(lag)
+        for window in spec["windows"]:
+            rolling = series.rolling(window)
+            for stat in spec["stats"]:
+                features[f"{col}_roll{window}_{stat}"] = getattr(rolling, stat)().shift(
+                    1
+                )
+    for cal, col in spec["interactions"]:
+        features[f"{col}_lag1_x_{cal}"] = df[col].shift(1) * df[cal]
+    return pd.DataFrame(features)
+
+
+def test_lag_features_match_pandas(hourly_df):
+    result = add_lag_features(hourly_df)
+    expected = _reference(hourly_df, FEATURE_SPEC)
+    pd.testing.assert_frame_equal(
+        result[expected.columns], expected, rtol=2e-9, atol=1e-9
+    )
+
+
+def test_streaming_matches_batch(hourly_df):
+    generator = FeatureGenerator()
+    batch = generator.transform(hourly_df)
+    generator.reset()
+    chunks = [
+        hourly_df.iloc[start : start + 50] for start in range(0, len(hourly_df), 50)
+    ]
+    streamed = pd.concat([generator.update(chunk) for chunk in chunks])
+    pd.testing.assert_frame_equal(streamed, batch, rtol=2e-9, atol=1e-9)
+
+
+def test_streaming_rejects_rows_already_seen(hourly_df):
+    generator = FeatureGenerator()
+    generator.update(hourly_df.iloc[:100])
+    with pytest.raises(ValueError):
+        generator.update(hourly_df.iloc[50:150])
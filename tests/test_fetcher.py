@@ -0,0 +1,70 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+from fetcher import DatasetFetcher
+from sources import ConnectionPool
+
+CSV = b"Datetime,value\n2017-01-01 00:00:00,1\n2017-01-01 00:10:00,2\n"
+
+
+def _archive() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("power.csv", CSV)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fetcher(server, tmp_path):
+    server[1].content = _archive()
+    fetcher = DatasetFetcher(str(tmp_path), server[0], headers={})
+    fetcher.source.pool = ConnectionPool()
+    yield fetcher
+    fetcher.source.pool.close()
+
+
+def test_fetch_and_open_member(server, fetcher):
+    first = fetcher.fetch("owner/dataset")
+    second = fetcher.fetch("owner/dataset")
+    assert first["changed"] and not second["changed"]
+    assert first["path"] == fetcher.archive_path("owner/dataset")
+    with fetcher.open_member("owner/dataset", "power.csv") as member:
+        assert member.read() == CSV
+
+
+def test_fetch_all_downloads_each_address_once(server, fetcher):
+    entries = fetcher.fetch_all(["owner/a", "owner/b", "owner/a"])
+    assert list(entries) == ["owner/a", "owner/b"]
+    assert sorted(r["path"] for r in server[1].requests) == ["/owner/a", "/owner/b"]
+    for address in entries:
+        with fetcher.open_member(address, "power.csv") as member:
+            assert member.read() == CSV
+
+
+def test_redirect_to_storage_drops_credentials(server, fetcher):
+    # Como a API do Kaggle: 302 para outro host (localhost -> 127.0.0.1)
+    port = server[0].rsplit(":", 1)[1]
+    fetcher.base_url = f"http://localhost:{port}/redirect"
+    fetcher.source.headers = {"Authorization": "Basic secret"}
+    fetcher.fetch("owner/dataset")
+    api, storage = server[1].requests
+    assert api["path"] == "/redirect/owner/dataset" and "Authorization" in api
+    assert storage["path"] == "/owner/dataset" and "Authorization" not in storage
+    assert fetcher.load("owner/dataset", "power.csv").equals(
+        pd.read_csv(io.BytesIO(CSV))
+    )
+
+
+def test_file_mirror_is_read_in_place(tmp_path):
+    mirror = tmp_path / "mirror" / "owner"
+    mirror.mkdir(parents=True)
+    (mirror / "dataset").write_bytes(_archive())
+    fetcher = DatasetFetcher(str(tmp_path / "dest"), (tmp_path / "mirror").as_uri())
+
+    first = fetcher.fetch("owner/dataset")
+    assert first["path"] == str(mirror / "dataset")
+    assert not fetcher.fetch_all(["owner/dataset"])["owner/dataset"]["changed"]
+    with fetcher.open_member("owner/dataset", "power.csv") as member:
+        assert member.read() == CSV
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from calendar_features import compute_calendar_features
+from forecasting import (
+    BASELINES,
+    TARGET_COLUMNS,
+    BaselineForecaster,
+    CalendarRegressionForecaster,
+    ExponentialSmoothingForecaster,
+    SeasonalNaiveForecaster,
+    forecast_baselines,
+)
+from processor import process_dataframe
+
+
+def test_base_forecaster_is_abstract():
+    with pytest.raises(TypeError):
+        BaselineForecaster()
+
+
+def test_forecast_baselines_defaults_to_every_model(power_df):
+    hourly = process_dataframe(power_df, "h")
+    forecasts = forecast_baselines(hourly, horizon=24)
+    assert list(forecasts) == list(BASELINES)
+    for forecast in forecasts.values():
+        assert forecast.shape == (24, 3)
+        assert (
+            forecast.index[0]
+            == hourly["Datetime"].iloc[-1] + hourly["Datetime"].diff().iloc[-1]
+        )
+
+
+def _daily_series(datetimes: pd.Series) -> pd.DataFrame:
+    # Padrão diário fixo por zona: sazonal com período de 1 dia (e de 7)
+    hours = datetimes.dt.hour.to_numpy()
+    return pd.DataFrame(
+        {
+            target: 1000.0 * (i + 1) + 50.0 * np.sin(2 * np.pi * hours / 24) + hours
+            for i, target in enumerate(TARGET_COLUMNS)
+        }
+    )
+
+
+def _calendar_series(datetimes: pd.Series) -> pd.DataFrame:
+    # Soma de efeitos por código de calendário: exatamente representável pela
+    # regressão sobre o one-hot
+    codes = compute_calendar_features(datetimes)
+    effect = 10.0 * codes["turno"] + 3.0 * codes["dia_semana"] ** 2
+    effect = effect + 7.0 * codes["utilidade"] + 5.0 * codes["estacao"]
+    return pd.DataFrame(
+        {target: 1000.0 * (i + 1) + effect for i, target in enumerate(TARGET_COLUMNS)}
+    )
+
+
+@pytest.mark.parametrize(
+    ("model", "series"),
+    [
+        (SeasonalNaiveForecaster(), _daily_series),
+        (SeasonalNaiveForecaster(season="1D"), _daily_series),
+        (ExponentialSmoothingForecaster(alpha=0.5), _daily_series),
+        (CalendarRegressionForecaster(ridge=0.0), _calendar_series),
+    ],
+)
+def test_baselines_recover_a_known_seasonal_series(model, series):
+    # Série determinística com resposta conhecida: a previsão deve ser a
+    # própria continuação da série, mesmo com buracos no histórico. A
+    # regressão roda sem ridge, que encolheria os efeitos exatos
+    datetimes = pd.Series(pd.date_range("2017-03-01", periods=28 * 24 + 48, freq="h"))
+    full = series(datetimes)
+    full.insert(0, "Datetime", datetimes)
+    train, future = full.iloc[:-48].copy(), full.iloc[-48:]
+    train.iloc[-30:-20, 1:] = np.nan
+
+    forecast = model.fit(train).predict(48)
+
+    assert list(forecast.index) == list(future["Datetime"])
+    np.testing.assert_allclose(
+        forecast.to_numpy(), future[TARGET_COLUMNS].to_numpy(), rtol=1e-6
+    )
@@ -0,0 +1,97 @@
+import importer
+import numpy as np
+import pandas as pd
+import pytest
+from compaction import DATETIME_FORMAT, memory_usage
+from importer import load_dataset_from_file
+from processor import process_dataframe
+from synthetic import write_power_consumption_csv
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    return write_power_consumption_csv(str(tmp_path / "power.csv"), 2000)
+
+
+def test_default_load_matches_read_csv(csv_path):
+    # Sem opções tipadas o resultado é o do read_csv, inclusive os dtypes
+    pd.testing.assert_frame_equal(
+        load_dataset_from_file(csv_path), pd.read_csv(csv_path)
+    )
+
+
+def test_typed_load_matches_parsed_read_csv(csv_path):
+    columns = ["Datetime", "PowerConsumption_Zone1", "Temperature"]
+    df = load_dataset_from_file(csv_path, columns=columns, date_format=DATETIME_FORMAT)
+    expected = pd.read_csv(csv_path, usecols=columns, float_precision="round_trip")
+    expected["Datetime"] = pd.to_datetime(expected["Datetime"], format=DATETIME_FORMAT)
+    assert list(df.columns) == columns
+    pd.testing.assert_frame_equal(df, expected[columns])
+
+
+def test_projection_keeps_datetime_text_without_format(csv_path):
+    df = load_dataset_from_file(csv_path, columns=["Datetime", "Humidity"])
+    pd.testing.assert_frame_equal(
+        df, pd.read_csv(csv_path, usecols=["Datetime", "Humidity"])
+    )
+
+
+def test_compact_load_roundtrip(csv_path, monkeypatch):
+    # A data sai tipada do leitor (DATETIME_FORMAT), sem inferência posterior
+    formats = []
+    read_csv_arrow = importer._read_csv_arrow
+
+    def spy(file_path, columns, dtypes, datetime_col, date_format):
+        formats.append(date_format)
+        return read_csv_arrow(file_path, columns, dtypes, datetime_col, date_format)
+
+    monkeypatch.setattr(importer, "_read_csv_arrow", spy)
+    compact = load_dataset_from_file(csv_path, compact=True)
+    assert formats == [DATETIME_FORMAT]
+
+    full = pd.read_csv(csv_path)
+    full["Datetime"] = pd.to_datetime(full["Datetime"], format=DATETIME_FORMAT)
+    assert list(compact.columns) == list(full.columns)
+    assert compact["Datetime"].dtype == "datetime64[ns]"
+    assert (compact.drop(columns="Datetime").dtypes == np.float32).all()
+    pd.testing.assert_series_equal(compact["Datetime"], full["Datetime"])
+    for col in full.columns.drop("Datetime"):
+        np.testing.assert_allclose(compact[col], full[col], rtol=1e-6)
+
+    # Alvo do modo compacto: 3x menos memória que a carga padrão
+    assert memory_usage(load_dataset_from_file(csv_path)) >= 3 * memory_usage(compact)
+
+    # Códigos de calendário em int8 depois do processamento
+    processed = process_dataframe(compact, "h", compact=True)
+    for col in ["turno", "dia_semana", "utilidade", "estacao"]:
+        assert processed[col].dtype == np.int8
+
+
+def test_category_dtype_is_read_as_dictionary(csv_path, monkeypatch):
+    read_csv_arrow = importer._read_csv_arrow
+    results = []
+
+    def spy(*args):
+        results.append(read_csv_arrow(*args))
+        return results[-1]
+
+    monkeypatch.setattr(importer, "_read_csv_arrow", spy)
+    dtypes = {"Datetime": "category", "Temperature": "float32"}
+    df = load_dataset_from_file(csv_path, dtypes=dtypes)
+    # Lido pelo pyarrow, sem cair no pandas
+    assert results[0] is not None
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_path, dtype=dtypes))
+
+
+def test_dtype_without_arrow_type_falls_back_to_pandas(csv_path):
+    dtypes = {"Temperature": "Float64"}
+    df = load_dataset_from_file(csv_path, dtypes=dtypes)
+    pd.testing.assert_frame_equal(df, pd.read_csv(csv_path, dtype=dtypes))
+
+
+def test_missing_column_raises_like_read_csv(csv_path):
+    columns = ["Datetime", "NoSuchColumn"]
+    with pytest.raises(ValueError, match="NoSuchColumn"):
+        pd.read_csv(csv_path, usecols=columns)
+    with pytest.raises(ValueError, match="NoSuchColumn"):
+        load_dataset_from_file(csv_path, columns=columns, date_format=DATETIME_FORMAT)
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+from partitions import read_partitioned_dataset, write_partitioned_dataset
+
+
+@pytest.mark.parametrize("tz", [None, "Africa/Casablanca"])
+def test_roundtrip_and_ranges_match_filtering(power_df, tmp_path, tz):
+    df = power_df.copy()
+    if tz:
+        df["Datetime"] = df["Datetime"].dt.tz_localize(tz)
+    root = str(tmp_path)
+    write_partitioned_dataset(df, root, "10min", partition_by="day", row_group_size=50)
+
+    pd.testing.assert_frame_equal(read_partitioned_dataset(root, "10min"), df)
+
+    # Bordas no meio de row groups e de partições; sem fuso na consulta vale
+    # o fuso do dataset
+    start, end = "2017-01-03 07:15", "2017-01-09 13:00"
+    times = df["Datetime"]
+    low = pd.Timestamp(start, tz=tz)
+    high = pd.Timestamp(end, tz=tz)
+    columns = ["Datetime", "PowerConsumption_Zone1"]
+    expected = df.loc[(times >= low) & (times <= high), columns]
+    result = read_partitioned_dataset(
+        root, "10min", columns=["PowerConsumption_Zone1"], start=start, end=end
+    )
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+
+
+def test_append_matches_single_write(power_df, tmp_path):
+    once, twice = str(tmp_path / "once"), str(tmp_path / "twice")
+    write_partitioned_dataset(power_df, once, "10min")
+    write_partitioned_dataset(power_df.iloc[:1000], twice, "10min")
+    # Linhas já gravadas são ignoradas no append
+    write_partitioned_dataset(power_df.iloc[800:], twice, "10min")
+    pd.testing.assert_frame_equal(
+        read_partitioned_dataset(twice, "10min"),
+        read_partitioned_dataset(once, "10min"),
+    )
+
+
+def test_overwrite_replaces_dataset(power_df, tmp_path):
+    root = str(tmp_path)
+    write_partitioned_dataset(power_df, root, "10min")
+    write_partitioned_dataset(power_df.iloc[:100], root, "10min", mode="overwrite")
+    pd.testing.assert_frame_equal(
+        read_partitioned_dataset(root, "10min"), power_df.iloc[:100]
+    )
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor import aggregate_data_by_time_frequency, build_prefix_sum_index
+
+SCHEMA = {
+    "Temperature": ["mean", "std", "count"],
+    "PowerConsumption_Zone1": ["sum", "var"],
+}
+NAMES = ["t_mean", "t_std", "t_count", "z1_sum", "z1_var"]
+
+
+@pytest.fixture
+def gappy_df(power_df):
+    df = power_df.iloc[40:].drop(power_df.index[500:800]).reset_index(drop=True)
+    df.loc[::37, "Temperature"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("freq", ["10min", "h", "3h", "D", "7D", "W", "ME"])
+def test_aggregate_matches_resample(gappy_df, freq):
+    index = build_prefix_sum_index(gappy_df)
+    expected = aggregate_data_by_time_frequency(
+        gappy_df, freq, "Datetime", SCHEMA, NAMES
+    )
+    result = index.aggregate(freq, agg_schema=SCHEMA, naming_schema=NAMES)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9, atol=1e-6)
+
+
+def test_window_matches_slice(gappy_df):
+    index = build_prefix_sum_index(gappy_df)
+    start, end = pd.Timestamp("2017-01-02 03:10"), pd.Timestamp("2017-01-09 17:00")
+    window = index.window(start, end)
+    times = gappy_df["Datetime"]
+    rows = gappy_df[(times >= start) & (times < end)]
+    for col in index.columns:
+        assert window.loc["sum", col] == pytest.approx(rows[col].sum(), rel=1e-9)
+        assert window.loc["count", col] == rows[col].count()
+        assert window.loc["mean", col] == pytest.approx(rows[col].mean(), rel=1e-9)
+        assert window.loc["std", col] == pytest.approx(rows[col].std(), rel=1e-7)
+
+
+def test_unsorted_input_is_rejected(power_df):
+    with pytest.raises(ValueError):
+        build_prefix_sum_index(power_df.iloc[::-1])
@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+from processor import aggregate_data_by_time_frequency, aggregate_file_by_time_frequency
+from synthetic import generate_power_consumption
+
+
+@pytest.mark.parametrize("freq", ["10min", "h", "D"])
+def test_chunked_aggregation_matches_in_memory_across_gap(tmp_path, freq):
+    # Lacuna que começa no fim de um chunk e continua no seguinte
+    df = generate_power_consumption(12_000)
+    df = df.drop(index=range(4990, 5290)).reset_index(drop=True)
+    path = tmp_path / "gap.csv"
+    df.to_csv(path, index=False)
+
+    chunked = aggregate_file_by_time_frequency(str(path), freq, chunksize=5000)
+    expected = aggregate_data_by_time_frequency(
+        pd.read_csv(path, parse_dates=["Datetime"]), freq
+    )
+    pd.testing.assert_frame_equal(chunked, expected)
@@ -0,0 +1,46 @@
+import threading
+
+import profiling
+from profiling import ProfilingSession, profiled, use_session
+
+
+@profiled(stage="work")
+def _work(n):
+    return sum(range(n))
+
+
+def _run_session(session, calls, barrier):
+    use_session(session)
+    profiling.enable_profiling(track_memory=False)
+    barrier.wait()
+    for _ in range(calls):
+        _work(100)
+
+
+def test_sessions_do_not_share_state():
+    # Duas sessões (threads do Streamlit) ligadas ao mesmo tempo
+    sessions = [ProfilingSession(), ProfilingSession()]
+    barrier = threading.Barrier(2)
+    threads = [
+        threading.Thread(target=_run_session, args=(session, calls, barrier))
+        for session, calls in zip(sessions, (3, 5))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [len(session.records) for session in sessions] == [3, 5]
+    assert not profiling.is_profiling_enabled()
+    assert profiling.get_records() == []
+
+
+def test_measure_overhead_keeps_current_session():
+    session = ProfilingSession(enabled=True)
+    use_session(session)
+    try:
+        overhead = profiling.measure_overhead(1000)
+        assert profiling._session() is session and session.records == []
+    finally:
+        use_session(None)
+    assert overhead["seconds_per_call"] > 0
+    assert overhead["enabled_overhead_seconds"] > overhead["disabled_overhead_seconds"]
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processor import build_aggregation_pyramid, process_dataframe
+
+
+@pytest.fixture
+def gappy_df(power_df):
+    # Começa no meio do dia, com lacuna e NaN, para exercitar origem e
+    # buckets vazios
+    df = power_df.iloc[40:].drop(power_df.index[500:800]).reset_index(drop=True)
+    df.loc[::37, "Temperature"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("freq", ["10min", "30min", "h", "2h", "D", "7D", "ME"])
+def test_pyramid_matches_resample(gappy_df, freq):
+    pyramid = build_aggregation_pyramid(gappy_df)
+    expected = process_dataframe(gappy_df.copy(), freq)
+    result = process_dataframe(gappy_df.copy(), freq, pyramid=pyramid)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9)
+
+
+def test_pyramid_falls_back_when_level_does_not_nest(gappy_df):
+    # 7min não é união de buckets de nenhum nível: resample direto
+    pyramid = build_aggregation_pyramid(gappy_df)
+    assert pyramid.aggregate("7min") is None
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+from cache import file_content_hash
+from sources import MAX_REDIRECTS, ConnectionPool, HttpMirrorSource
+
+CONTENT = b"Datetime,value\n" + b"".join(
+    f"2017-01-01 00:{i % 60:02d}:00,{i}\n".encode() for i in range(5000)
+)
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def source(server, tmp_path):
+    server[1].content = CONTENT
+    pool = ConnectionPool()
+    yield HttpMirrorSource(server[0], str(tmp_path), pool=pool)
+    pool.close()
+
+
+def test_conditional_fetch_skips_unchanged(server, source):
+    first = source.fetch("owner/dataset", "power.csv")
+    second = source.fetch("owner/dataset", "power.csv")
+    assert first["changed"] and not second["changed"]
+    assert server[1].requests[1]["If-None-Match"] == ETAG
+    assert first["checksum"] == second["checksum"] == file_content_hash(first["path"])
+    with open(first["path"], "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_manifest_does_not_persist_transient_keys(source):
+    source.fetch("owner/dataset", "power.csv")
+    with open(source.manifest_path) as f:
+        entry = json.load(f)["owner/dataset/power.csv"]
+    assert "changed" not in entry and "partial" not in entry
+    assert entry["validators"] == {"etag": ETAG}
+
+
+def test_stale_pooled_connection_is_retried(server, source):
+    server[1].drop_idle = True
+    source.fetch("owner/dataset", "power.csv")
+    entry = source.fetch("owner/dataset", "power.csv")
+    assert not entry["changed"]
+    assert len(server[1].requests) == 2
+
+
+def test_partial_download_resumes_with_if_range(server, source):
+    path = source.local_path("owner/dataset", "power.csv")
+    os.makedirs(os.path.dirname(path))
+    with open(f"{path}.part", "wb") as f:
+        f.write(CONTENT[:1000])
+    source._update_manifest("owner/dataset/power.csv", {"partial": ETAG})
+
+    entry = source.fetch("owner/dataset", "power.csv")
+    request = server[1].requests[0]
+    assert request["Range"] == "bytes=1000-" and request["If-Range"] == ETAG
+    with open(path, "rb") as f:
+        assert f.read() == CONTENT
+    assert entry["checksum"] == file_content_hash(path)
+
+
+def test_redirect_is_followed(server, source):
+    source.base_url = f"{server[0]}/redirect"
+    entry = source.fetch("owner/dataset", "power.csv")
+    with open(entry["path"], "rb") as f:
+        assert f.read() == CONTENT
+    assert [r["path"] for r in server[1].requests] == [
+        "/redirect/owner/dataset/power.csv",
+        "/owner/dataset/power.csv",
+    ]
+
+
+def test_redirect_loop_is_bounded(server, source):
+    source.base_url = f"{server[0]}/loop"
+    with pytest.raises(ConnectionError, match="Too many redirects"):
+        source.fetch("owner/dataset", "power.csv")
+    assert len(server[1].requests) == MAX_REDIRECTS + 1
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from store import TimeSeriesStore, write_time_series_store
+
+
+def test_store_range_matches_frame(tmp_path, power_df):
+    store = TimeSeriesStore(write_time_series_store(power_df, str(tmp_path / "store")))
+    start, end = power_df["Datetime"].iloc[[100, 400]]
+    result = store.get_range(["PowerConsumption_Zone1"], start, end)
+    expected = power_df.iloc[100:401].reset_index(drop=True)
+    np.testing.assert_array_equal(
+        result["Datetime"].to_numpy(), expected["Datetime"].to_numpy()
+    )
+    np.testing.assert_array_equal(
+        result["PowerConsumption_Zone1"].to_numpy(),
+        expected["PowerConsumption_Zone1"].to_numpy(),
+    )
+
+
+def test_store_rejects_series_without_fixed_step(tmp_path, power_df):
+    monthly = pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2017-01-31", periods=12, freq="ME"),
+            "value": np.arange(12.0),
+        }
+    )
+    with pytest.raises(AssertionError):
+        write_time_series_store(monthly, str(tmp_path / "monthly"))
+    with pytest.raises(AssertionError):
+        write_time_series_store(power_df, str(tmp_path / "monthly"), freq="ME")
+    assert not (tmp_path / "monthly").exists()
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from validator import analyze_time_grid
+
+DAY = "2017-01-01"
+
+
+def _frame(times):
+    datetimes = pd.to_datetime([f"{DAY} {time}" for time in times])
+    return pd.DataFrame({"Datetime": datetimes, "value": range(len(times))})
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        _frame([]),
+        _frame(["00:00"]),
+        _frame(["00:00"] * 3),
+        pd.DataFrame({"Datetime": ["a", "b", "c"], "value": [1, 2, 3]}),
+    ],
+    ids=["empty", "single-row", "identical", "not-datetime"],
+)
+def test_report_without_step(df):
+    grid = analyze_time_grid(df, "Datetime")
+    report = grid.report()
+    assert grid.step is None
+    assert report["gaps"] == []
+    assert report["missing_steps"] == 0
+
+
+def test_single_row_bounds():
+    grid = analyze_time_grid(_frame(["00:10"]), "Datetime")
+    assert grid.min == grid.max == pd.Timestamp(f"{DAY} 00:10")
+
+
+def test_gaps_on_sorted_input():
+    df = _frame(["00:00", "00:10", "00:40", "00:50", "01:20"])
+    grid = analyze_time_grid(df, "Datetime")
+    assert grid.step == pd.Timedelta("10min")
+    assert [gap["index"] for gap in grid.gaps] == [(1, 2), (3, 4)]
+    assert grid.report()["missing_steps"] == 4
+
+
+def test_gaps_on_out_of_order_input():
+    # Só 00:30 falta; a desordem não pode virar lacunas
+    df = _frame(["00:00", "00:20", "00:10", "00:40", "00:50"])
+    grid = analyze_time_grid(df, "Datetime")
+    report = grid.report()
+    assert report["missing_steps"] == 1
+    assert [gap["index"] for gap in grid.gaps] == [(1, 3)]
+    assert grid.gaps[0]["start"] == pd.Timestamp(f"{DAY} 00:20")
+    assert report["out_of_order"] == [[2, 2]]
+
+
+def test_duplicates_do_not_hide_gaps():
+    df = _frame(["00:00", "00:10", "00:10", "00:30"])
+    grid = analyze_time_grid(df, "Datetime")
+    assert grid.step == pd.Timedelta("10min")
+    assert grid.duplicates.tolist() == [[2, 2]]
+    assert [gap["index"] for gap in grid.gaps] == [(2, 3)]
+
+
+def test_repair_matches_regular_grid():
+    df = _frame(["00:00", "00:20", "00:10", "00:40"])
+    repaired = analyze_time_grid(df, "Datetime").repair(df)
+    assert repaired["Datetime"].tolist() == list(
+        pd.date_range(f"{DAY} 00:00", f"{DAY} 00:40", freq="10min")
+    )
+    assert repaired["value"].tolist()[:3] == [0, 2, 1]